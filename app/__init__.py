@@ -1,20 +1,40 @@
 import logging
+import time
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.configuration.settings import Configuration
-from app.database import init_db
+from app.middleware.db_session import SessionLeakMiddleware
 from app.tasks.websockets import routes as websocket_routes
 from app.api.routes import register_routes
+from app.cache.invalidation import cache_invalidator
+from app.cache.warmup import cache_warmer
+from app.database.write_behind import write_behind
+from app.gateway.http_client import http_client
 
 configuration = Configuration()
 logging.info(f"AMBIENTE URL: >>> {str(configuration.base_url)}")
 
 
-def create_app():
-    app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Escuta as invalidações de cache publicadas pelos outros workers
+    cache_invalidator.start()
+    # Aquece o cache das empresas ativas em background; /ready responde 503 até terminar
+    cache_warmer.start()
+    yield
+    await cache_warmer.stop()
+    cache_invalidator.stop()
+    # Grava os turnos de chat ainda na fila antes de encerrar
+    await write_behind.stop()
+    # Fecha o pool de conexões HTTP compartilhado pelos provedores de IA
+    await http_client.aclose()
+
 
-    logging.info("SISTEMA >>> Inicializando o banco de dados...")
-    init_db()
+def create_app():
+    # Schema (Alembic) e seed ficam fora do startup: python -m app.database migrate|seed
+    started = time.perf_counter()
+    app = FastAPI(lifespan=lifespan)
 
     origins = (
         ["https://firecloud.vercel.app", "https://firecloud-admin.vercel.app", "https://sandbox-gv21.onrender.com", "https://leonanthomaz-sanbox.vercel.app"]
@@ -30,8 +50,12 @@ def create_app():
         allow_headers=["*"],
         expose_headers=["X-Filename"],
     )
+    app.add_middleware(SessionLeakMiddleware)
 
     register_routes(app)
     app.include_router(websocket_routes.router)
 
+    app.state.startup_seconds = time.perf_counter() - started
+    logging.info(f"SISTEMA >>> Aplicação criada em {app.state.startup_seconds * 1000:.1f} ms")
+
     return app
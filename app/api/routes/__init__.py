@@ -2,6 +2,9 @@ from app.auth.auth import AuthRouter
 from app.api.routes.admin.lab import LabRouter
 from app.api.routes.company.home import HomeRouter
 from app.api.routes.admin.users import AdminRouter
+from app.api.routes.admin.database import DatabaseRouter
+from app.api.routes.admin.cache import CacheRouter
+from app.api.routes.admin.ai import AIRouter
 from app.api.routes.company.company import CompanyRouter
 from app.api.routes.company.register import RegisterRouter
 from app.api.routes.user.users import UserRouter
@@ -31,6 +34,9 @@ def register_routes(app):
     app.include_router(LabRouter())
     
     app.include_router(AdminRouter())
+    app.include_router(DatabaseRouter())
+    app.include_router(CacheRouter())
+    app.include_router(AIRouter())
     app.include_router(UserRouter())
     app.include_router(CompanyRouter())
     app.include_router(RegisterRouter())
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends
+from app.auth.auth import AuthRouter
+from app.gateway.chatbot.providers.chatbot_provider_factory import provider_registry
+from app.gateway.circuit_breaker import circuit_breakers
+from app.gateway.http_client import http_client
+from app.middleware.admin import is_admin
+from app.models.user.user import User
+
+get_current_user = AuthRouter().get_current_user
+
+class AIRouter(APIRouter):
+    """
+    Roteador interno para observabilidade dos provedores de IA.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(prefix="/admin/ai", *args, **kwargs)
+        self.add_api_route("/stats", self.ai_stats, methods=["GET"], response_model=dict)
+
+    def ai_stats(self, current_user: User = Depends(get_current_user)):
+        """Retorna o estado do circuit breaker de cada provedor (taxa de falha, p95, timeout atual, retries, aberturas), o pool HTTP compartilhado e os provedores instanciados."""
+        is_admin(current_user)
+        return {"breakers": circuit_breakers.stats(), "http": http_client.stats(), "providers": provider_registry.stats()}
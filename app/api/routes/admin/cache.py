@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends
+from app.auth.auth import AuthRouter
+from app.cache.cache_manager import cache, single_flight, snapshots
+from app.cache.invalidation import cache_invalidator
+from app.cache.response_cache import response_cache
+from app.cache.versions import data_versions
+from app.cache.warmup import cache_warmer
+from app.middleware.admin import is_admin
+from app.models.user.user import User
+
+get_current_user = AuthRouter().get_current_user
+
+class CacheRouter(APIRouter):
+    """
+    Roteador interno para observabilidade do cache em memória.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(prefix="/admin/cache", *args, **kwargs)
+        self.add_api_route("/stats", self.cache_stats, methods=["GET"], response_model=dict)
+
+    def cache_stats(self, current_user: User = Depends(get_current_user)):
+        """Retorna ocupação do L1, contadores do L2 Redis, das invalidações (com latência entre workers), das leituras de versão, dos snapshots por empresa, das cargas coalescidas, do warm-up e do cache de respostas da IA."""
+        is_admin(current_user)
+        return {**cache.stats(), "invalidation": cache_invalidator.stats(), "versions": data_versions.stats(), "snapshots": snapshots.stats(), "single_flight": single_flight.stats(), "warmup": cache_warmer.stats(), "responses": response_cache.stats()}
@@ -1,21 +1,25 @@
-from typing import List
 import uuid
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlmodel import Session, select
 
 from app.auth.auth import AuthRouter
+from app.cache.invalidation import ASSISTANT_INFO, COMPANY_INFO, SCHEDULE_SLOTS, SERVICE_DATA, cache_invalidator
+from app.cache.versions import bump_data_version
 from app.configuration.settings import Configuration
 from app.middleware.admin import is_admin
 from app.models.company.address import Address
 from app.models.company.company import Company
 from app.models.user.user import User
 from app.schemas.company.company import CompanyRequest
-from app.database.connection import get_session
+from app.schemas.pagination.pagination import Page
+from app.utils.pagination_utils import PageParams, get_page_params, paginate
+from app.database.connection import get_readonly_session, get_session
 from app.services.email import EmailService
 from app.utils.hash_utils import generate_hash
 
 # Inicializa a instância do DatabaseManager
 db_session = get_session
+db_readonly_session = get_readonly_session
 email_service = EmailService()
 configuration = Configuration()
 get_current_user = AuthRouter().get_current_user
@@ -27,14 +31,14 @@ class CompanyRouter(APIRouter):
     def __init__(self, *args, **kwargs):
         super().__init__(prefix="/admin/company", *args, **kwargs)
 
-        self.add_api_route("/all", self.get_all_companies, methods=["GET"], response_model=List[Company])
+        self.add_api_route("/all", self.get_all_companies, methods=["GET"], response_model=Page[Company])
         self.add_api_route("/create", self.create_company, methods=["POST"], response_model=Company)
         self.add_api_route("/{company_id}", self.delete_company, methods=["DELETE"], response_model=dict)
 
 
-    def get_all_companies(self, session: Session = Depends(db_session)):
-        companies = session.exec(select(Company)).all()
-        if not companies:
+    def get_all_companies(self, page: PageParams = Depends(get_page_params), session: Session = Depends(db_readonly_session)):
+        companies = paginate(session, select(Company), Company, page)
+        if not companies["items"] and not page.cursor:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Nenhuma empresa encontrada.")
         return companies
 
@@ -94,8 +98,10 @@ class CompanyRouter(APIRouter):
         if not db_company:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Empresa não encontrada.")
 
+        version = bump_data_version(session, company_id)
         session.delete(db_company)
         session.commit()
+        cache_invalidator.invalidate(company_id, COMPANY_INFO, ASSISTANT_INFO, SERVICE_DATA, SCHEDULE_SLOTS, version=version)
         return {"ok": True, "message": "Empresa deletada com sucesso"}
         
  
\ No newline at end of file
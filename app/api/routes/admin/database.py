@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends
+from app.auth.auth import AuthRouter
+from app.database.connection import get_pool_status
+from app.database.write_behind import write_behind
+from app.middleware.admin import is_admin
+from app.models.user.user import User
+
+get_current_user = AuthRouter().get_current_user
+
+class DatabaseRouter(APIRouter):
+    """
+    Roteador interno para observabilidade do banco de dados.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(prefix="/admin/database", *args, **kwargs)
+        self.add_api_route("/pool", self.pool_status, methods=["GET"], response_model=dict)
+
+    def pool_status(self, current_user: User = Depends(get_current_user)):
+        """Retorna as estatísticas do pool de conexões (checked-out, overflow, espera) e da fila write-behind."""
+        is_admin(current_user)
+        return {**get_pool_status(), "write_behind": write_behind.snapshot()}
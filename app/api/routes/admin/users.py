@@ -2,31 +2,32 @@ from datetime import datetime, timedelta, timezone
 import bcrypt
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlmodel import Session, select
-from typing import List
 from app.configuration.settings import Configuration
 from app.models.user.user import User
 from app.schemas.auth.auth import AuthRequestCreate, AuthRequestUpdate
 from app.auth.auth import AuthRouter
-from app.database.connection import get_session
+from app.database.connection import get_readonly_session, get_session
 from app.middleware.admin import is_admin
+from app.schemas.pagination.pagination import Page
+from app.utils.pagination_utils import PageParams, get_page_params, paginate
 
 db_session = get_session
+db_readonly_session = get_readonly_session
 configuration = Configuration()
 get_current_user = AuthRouter().get_current_user
 
 class AdminRouter(APIRouter):
     def __init__(self, *args, **kwargs):
         super().__init__(prefix="/admin", *args, **kwargs)
-        self.add_api_route("/users", self.list_users, methods=["GET"], response_model=List[User])
+        self.add_api_route("/users", self.list_users, methods=["GET"], response_model=Page[User])
         self.add_api_route("/users", self.create_user, methods=["POST"], response_model=User)
         self.add_api_route("/recent-users", self.get_recent_users, methods=["GET"], response_model=dict)
         self.add_api_route("/users/{company_id}", self.update_user, methods=["PUT"], response_model=User)
         self.add_api_route("/users/{company_id}", self.delete_user, methods=["DELETE"], response_model=dict)
 
-    def list_users(self, current_user: User = Depends(get_current_user), session: Session = Depends(db_session)):
+    def list_users(self, page: PageParams = Depends(get_page_params), current_user: User = Depends(get_current_user), session: Session = Depends(db_readonly_session)):
         is_admin(current_user)
-        users = session.exec(select(User)).all()
-        return users
+        return paginate(session, select(User), User, page)
 
     def create_user(self, user_data: AuthRequestCreate, current_user: User = Depends(get_current_user), session: Session = Depends(db_session)):
         
@@ -104,7 +105,7 @@ class AdminRouter(APIRouter):
         session.commit()
         return {"ok": True, "message": "Usuário deletado com sucesso"}
 
-    def get_recent_users(self, current_user: User = Depends(get_current_user), session: Session = Depends(db_session)):
+    def get_recent_users(self, current_user: User = Depends(get_current_user), session: Session = Depends(db_readonly_session)):
         is_admin(current_user)
         now = datetime.now(timezone.utc)
         start_of_week = now - timedelta(days=now.weekday())
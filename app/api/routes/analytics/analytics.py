@@ -1,12 +1,15 @@
-from fastapi import APIRouter, HTTPException, Depends
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Depends, Query
 from fastapi.responses import FileResponse
-from sqlmodel import Session
-from datetime import datetime
+from sqlmodel import Session, func, select
+from datetime import date, datetime
+from app.models.analytics.company_daily_client import CompanyDailyClient
+from app.models.analytics.company_daily_stats import CompanyDailyStats
 from app.models.chat.assistant import Assistant
-from app.models.chat.interaction import Interaction
 from app.models.company.company import Company
 from app.auth.auth import AuthRouter
-from app.database.connection import get_session
+from app.database.connection import get_readonly_session, get_session
+from app.utils.analytics_utils import SENTIMENT_COLUMNS
 
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet
@@ -15,23 +18,29 @@ from fastapi.responses import FileResponse
 import tempfile
 
 db_session = get_session
+db_readonly_session = get_readonly_session
 get_current_user = AuthRouter().get_current_user
 
 class AnalyticsRouter(APIRouter):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.add_api_route("/analytics/report/{company_id}", self.generate_report, methods=["GET"])
+        self.add_api_route("/analytics/daily/{company_id}", self.get_daily_stats, methods=["GET"], response_model=List[CompanyDailyStats])
     
-    async def generate_report(self, company_id: int, session: Session = Depends(get_session)):
+    async def generate_report(
+        self,
+        company_id: int,
+        start: Optional[date] = Query(None, description="Primeiro dia do período (inclusive)"),
+        end: Optional[date] = Query(None, description="Último dia do período (inclusive)"),
+        session: Session = Depends(db_readonly_session),
+    ):
         try:
             company = session.query(Company).filter(Company.id == company_id).first()
             if not company:
                 raise HTTPException(status_code=404, detail="Empresa não encontrada")
 
             assistant = session.query(Assistant).filter(Assistant.company_id == company_id).first()
-            interactions = session.query(Interaction).filter(Interaction.company_id == company_id).all()
-
-            metrics = self._calculate_metrics(interactions, assistant)
+            metrics = self._calculate_metrics(session, company_id, assistant, start, end)
 
             filename = f"analise-{company.name.lower().replace(' ', '-')}-{datetime.now().strftime('%d-%m-%Y')}.pdf"
 
@@ -42,13 +51,14 @@ class AnalyticsRouter(APIRouter):
                 elements = [
                     Paragraph(f"Relatório de Análise - {company.name}", styles["Title"]),
                     Paragraph(f"Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M')}", styles["Normal"]),
+                    Paragraph(f"Período: {start.strftime('%d/%m/%Y') if start else 'início'} a {end.strftime('%d/%m/%Y') if end else 'hoje'}", styles["Normal"]),
                     Spacer(1, 12),
 
                     Paragraph("Métricas:", styles["Heading2"]),
                     Paragraph(f"Total de Interações: {metrics['total_interactions']}", styles["Normal"]),
                     Paragraph(f"Total de Clientes Únicos: {metrics['unique_clients']}", styles["Normal"]),
                     Paragraph(f"Tokens Usados: {metrics['tokens_used']} de {metrics['tokens_available']} ({metrics['token_usage_percentage']}%)", styles["Normal"]),
-                    Paragraph(f"Média de Tokens por Interação: {metrics['avg_tokens']}", styles["Normal"]),
+                    Paragraph(f"Média de Tokens por Mensagem: {metrics['avg_tokens']}", styles["Normal"]),
                     Paragraph(f"Limite de Tokens: {metrics['token_limit']}", styles["Normal"]),
                     Paragraph(f"Reset de Tokens: {metrics['token_reset_date']}", styles["Normal"]),
                     Paragraph(f"Atendimentos Humanos: {metrics['human_attendances']}", styles["Normal"]),
@@ -61,7 +71,7 @@ class AnalyticsRouter(APIRouter):
                     Paragraph(f"Modelo: {metrics['assistant_model']}", styles["Normal"]),
                     Spacer(1, 12),
 
-                    Paragraph("Sentimentos:", styles["Heading2"]),
+                    Paragraph("Sentimentos (por interação):", styles["Heading2"]),
                 ]
                 for k, v in metrics["sentiments"].items():
                     elements.append(Paragraph(f"{k}: {v}", styles["Normal"]))
@@ -85,20 +95,63 @@ class AnalyticsRouter(APIRouter):
             raise HTTPException(status_code=500, detail=f"Erro ao gerar relatório: {str(e)}")
 
     
-    def _calculate_metrics(self, interactions, assistant):
+    def _daily_stats_window(self, statement, start: Optional[date], end: Optional[date], day=CompanyDailyStats.day):
+        if start is not None:
+            statement = statement.where(day >= start)
+        if end is not None:
+            statement = statement.where(day <= end)
+        return statement
+
+    def _aggregate_daily_stats(self, session: Session, company_id: int, start: Optional[date], end: Optional[date]):
+        """Soma o consolidado diário da empresa no período: custo O(dias), não O(interações).
+
+        Clientes únicos não somam entre dias (o mesmo cliente voltaria a contar):
+        vêm do COUNT DISTINCT sobre tb_company_daily_client no mesmo período.
+        """
+        unique_clients = self._daily_stats_window(
+            select(func.count(func.distinct(CompanyDailyClient.client_contact)))
+            .where(CompanyDailyClient.company_id == company_id),
+            start, end, day=CompanyDailyClient.day,
+        ).scalar_subquery()
+        statement = (
+            select(
+                func.coalesce(func.sum(CompanyDailyStats.interactions), 0).label("total_interactions"),
+                unique_clients.label("unique_clients"),
+                func.coalesce(func.sum(CompanyDailyStats.messages), 0).label("messages"),
+                func.coalesce(func.sum(CompanyDailyStats.total_tokens), 0).label("total_tokens"),
+                func.coalesce(func.sum(CompanyDailyStats.human_handoffs), 0).label("human_attendances"),
+                func.max(CompanyDailyStats.last_interaction_at).label("last_interaction"),
+                *(
+                    func.coalesce(func.sum(getattr(CompanyDailyStats, column)), 0).label(sentiment.value)
+                    for sentiment, column in SENTIMENT_COLUMNS.items()
+                ),
+            )
+            .where(CompanyDailyStats.company_id == company_id)
+        )
+        return session.exec(self._daily_stats_window(statement, start, end)).one()
+
+    def get_daily_stats(
+        self,
+        company_id: int,
+        start: Optional[date] = Query(None, description="Primeiro dia do período (inclusive)"),
+        end: Optional[date] = Query(None, description="Último dia do período (inclusive)"),
+        session: Session = Depends(db_readonly_session),
+    ):
+        """Série diária da empresa para dashboards, lida do consolidado."""
+        statement = select(CompanyDailyStats).where(CompanyDailyStats.company_id == company_id)
+        statement = self._daily_stats_window(statement, start, end).order_by(CompanyDailyStats.day)
+        return session.exec(statement).all()
+
+    def _calculate_metrics(self, session: Session, company_id: int, assistant, start: Optional[date] = None, end: Optional[date] = None):
+        row = self._aggregate_daily_stats(session, company_id, start, end)
         base_metrics = {
-            "total_interactions": len(interactions),
-            "sentiments": {"POSITIVE": 0, "NEUTRAL": 0, "NEGATIVE": 0},
-            "unique_clients": len(set(i.client_contact for i in interactions if i.client_contact)),
-            "last_interaction": max((i.created_at for i in interactions if i.created_at), default=None),
-            "human_attendances": sum(1 for i in interactions if i.chat and i.chat.human_attendance),
+            "total_interactions": row.total_interactions,
+            "sentiments": {sentiment.value: getattr(row, sentiment.value) for sentiment in SENTIMENT_COLUMNS},
+            "unique_clients": row.unique_clients,
+            "last_interaction": row.last_interaction,
+            "human_attendances": row.human_attendances,
         }
 
-        for interaction in interactions:
-            sentiment = interaction.sentiment.upper() if interaction.sentiment else "NEUTRAL"
-            if sentiment in base_metrics["sentiments"]:
-                base_metrics["sentiments"][sentiment] += 1
-
         if not assistant:
             return {
                 **base_metrics,
@@ -120,11 +173,8 @@ class AnalyticsRouter(APIRouter):
             round((tokens_used / tokens_available) * 100) if tokens_available > 0 else 0
         )
 
-        avg_tokens = (
-            round(sum(i.total_tokens or 0 for i in interactions) / len(interactions))
-            if len(interactions) > 0
-            else 0
-        )
+        # Tokens e mensagens na mesma unidade, no histórico e no consolidado do chat
+        avg_tokens = round(row.total_tokens / row.messages) if row.messages else 0
 
         return {
             **base_metrics,
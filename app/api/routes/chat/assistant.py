@@ -6,6 +6,7 @@ from app.models.company.company import Company
 from app.models.chat.assistant import Assistant
 from app.models.user.user import User
 from app.auth.auth import AuthRouter
+from app.cache.invalidation import ASSISTANT_INFO, cache_invalidator
 from app.database.connection import get_session
 from app.schemas.chat.assistant import AssistantRequest, AssistantResponse, AssistantStatusUpdate, AssistantUpdate
 
@@ -71,6 +72,7 @@ class AssistantRouter(APIRouter):
 
         session.add(assistant)
         session.commit()
+        cache_invalidator.invalidate(company_id, ASSISTANT_INFO)
         session.refresh(assistant)
         return assistant
 
@@ -101,6 +103,7 @@ class AssistantRouter(APIRouter):
 
         session.add(assistant)
         session.commit()
+        cache_invalidator.invalidate(company_id, ASSISTANT_INFO)
         session.refresh(assistant)
         return assistant
 
@@ -117,6 +120,7 @@ class AssistantRouter(APIRouter):
 
         session.delete(assistant)
         session.commit()
+        cache_invalidator.invalidate(company_id, ASSISTANT_INFO)
         return {"message": "Assistente deletada com sucesso"}
     
     def update_assistant_status(
@@ -149,6 +153,7 @@ class AssistantRouter(APIRouter):
 
         session.add(assistant)
         session.commit()
+        cache_invalidator.invalidate(company_id, ASSISTANT_INFO)
         session.refresh(assistant)
 
         return assistant
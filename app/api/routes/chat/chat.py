@@ -1,8 +1,10 @@
 import logging
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
 from fastapi import APIRouter, HTTPException, Response, Depends
-from sqlmodel import Session
-from app.database.connection import get_session
-from datetime import datetime, timezone
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.database.connection import get_async_session
 
 from app.configuration.settings import Configuration
 
@@ -13,18 +15,22 @@ from app.schemas.chat.chat import ChatRequest
 
 from app.cache.cache import Cache
 from app.cache.cache_manager import CacheManager
+from app.cache.response_cache import response_cache
 
-from app.gateway.chatbot.engine.generate_response import generate_response
+from app.gateway.chatbot.engine.generate_response import generate_response, stream_generated, stream_response
 from app.gateway.chatbot.engine.generate_response_fake import generate_response_fake
 from app.gateway.chatbot.nlp.context_filter import ContextFilter
 from app.gateway.chatbot.nlp.intent_classifier import IntentClassifier
 from app.gateway.chatbot.nlp.sentiment_classifier import SentimentClassifier
 
 from app.utils.spacy_utils import SpacyProcessor
+from app.utils.date_utils import utc_now
+from app.utils.stream_utils import sse_event
+from app.utils.token_utils import token_budget
 from app.utils.chat_utils import build_blocked_context, build_chat_context, check_chatbot_count, check_context_integrity, get_or_create_chat, load_all_cached_data, reset_chatbot_count, update_interaction_and_assistant
 
-db_session = get_session
-Configuration()
+db_session = get_async_session
+configuration = Configuration()
 cache = Cache()
 
 class ChatRouter(APIRouter):
@@ -36,107 +42,205 @@ class ChatRouter(APIRouter):
         self.context_classifier = ContextClassifier()
         self.spacy_processor = SpacyProcessor()
         self.cache_manager = CacheManager()
+        # IA_PROVIDER=mock: /chat e /stream usam o gerador fake; senão, o provedor real
+        self.fake_ia = configuration.ia_provider == "mock"
+        self.generate = generate_response_fake if self.fake_ia else generate_response
         self.add_api_route("/chat/company/{company_id}", self.chat, methods=["POST"])
+        self.add_api_route("/chat/company/{company_id}/stream", self.chat_stream, methods=["POST"])
 
-    async def chat(self, company_id: int, data: ChatRequest, session: Session = Depends(db_session)) -> Response:
+    async def chat(self, company_id: int, data: ChatRequest, session: AsyncSession = Depends(db_session)) -> Response:
         logging.info(f"DADOS DA REQUISIÇÃO: >>> {data}")
         try:
-            try:
-                chatbot = get_or_create_chat(
-                    session=session,
-                    company_id=company_id,
-                    whatsapp_id=data.whatsapp_id,
-                    chat_code=data.chat_code
-                )
-            except Exception as e:
-                logging.exception(f"Erro ao criar ou buscar chat: {e}")
-                raise
-            context = chatbot.context_json
-            logging.info(f"CHAT >>> Chat carregado/criado: {context}")
-                               
-            # Zera a contagem se passou 24h da última interação
-            reset_chatbot = reset_chatbot_count(chatbot)
-            logging.info(f"CHAT >>> {reset_chatbot}")
-            
-            # Verifica se o numero de interações foi atingido
-            check_chatbot = await check_chatbot_count(chatbot, context)
-            if check_chatbot["blocked"]:
-                return check_chatbot["data"]
-            logging.info(f"CHAT >>> {check_chatbot['message']}")
-
-            keywords = self.spacy_processor.process_message(data.message)
-            chatbot.step = chatbot.step.IN_PROGRESS
-            logging.info(f"CHAT >>> PALAVRAS CHAVE >>> Palavras chave extraídas: {keywords}")
-            
-            intents = self.intent_classifier.classify_intent(keywords, data.message)
-            logging.info(f"CHAT >>> INTENÇÕES >>> Intenções classificadas: {[i.name for i in intents]}")
-                       
-            selected_intent = self.intent_classifier.get_priority_intent(intents)
-            logging.info(f"CHAT >>> INTENÇÕES >>> Priorizando Intenções >>> {selected_intent}")
-            
-            context_blocked = await build_blocked_context(selected_intent, chatbot, context, session)
-            if context_blocked:
-                chatbot.step = chatbot.step.BLOCKED_ABUSE if selected_intent == ChatIntent.ABUSIVE else chatbot.step.CLOSING
-                return context_blocked
-
-            sentiment_str = self.sentiment_classifier.detect_sentiment(data.message)
-            logging.info(f"CHAT >>> SENTIMENTO >>> {sentiment_str}")
-            
-            if selected_intent not in [ChatIntent.CLOSE_CHAT, ChatIntent.ABUSIVE]:
-                cached_data = await load_all_cached_data(self.cache_manager, session, company_id)
-                company_data = cached_data["company_data"]
-                assistant_data = cached_data["assistant_data"]
-                service_data = cached_data["service_data"]
-                schedule_slots_data = cached_data["schedule_slots_data"]
-                schedule_data = cached_data["schedule_data"]
-                logging.info(f"CHAT >>> Dados do cache carregados.")
-
-                context = await build_chat_context(
-                    data=data,
-                    chatbot=chatbot,
-                    intents=intents,
-                    sentiment_str=sentiment_str,
-                    selected_intent=selected_intent,
-                    company_data=company_data,
-                    assistant_data=assistant_data,
-                    service_data=service_data,
-                    schedule_data=schedule_data,
-                    schedule_slots_data=schedule_slots_data,
-                )
-                logging.info(f"CHAT >>> Contexto montado >>> {context}")
-                                
-                context = self.context_classifier.filter_context(context)
-                logging.info(f"CHAT >>> Contexto filtrado: {context}")
-                            
-                context = await check_context_integrity(context, schedule_data, schedule_slots_data)
-                logging.info(f"CHAT >>> Integridade do contexto validado: {context}")
-            
+            chatbot, context, sentiment_str, early_response = await self._prepare_turn(company_id, data, session)
+            if early_response is not None:
+                return early_response
+
             logging.info(f"CHAT >>> Dados ANTES de enviar para IA: {context}")
-            # response_data = await generate_response(context)
-            response_data = await generate_response_fake(context)
+            # Perguntas repetidas à mesma empresa (mesma versão dos dados) reaproveitam a resposta
+            response_data = await response_cache.get_or_generate(session, company_id, context, self.generate)
             logging.info(f"CHAT >>> Dados DEPOIS de enviar para IA: {response_data}")
-            
-            useful_context = response_data.get("useful_context", {})
-            
-            chatbot.context_json = useful_context
-            chatbot.interaction_count += 1
-            chatbot.updated_at = datetime.now(timezone.utc)
-            
-            update_interaction_and_assistant(
+
+            return await self._finish_turn(session, company_id, chatbot, sentiment_str, response_data)
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            logging.error(f"CHAT >>> Erro ao processar o chat: {e}")
+            raise HTTPException(status_code=502, detail="Erro de comunicação com a IA.")
+
+    async def chat_stream(self, company_id: int, data: ChatRequest, session: AsyncSession = Depends(db_session)) -> StreamingResponse:
+        """Mesmo turno do /chat em Server-Sent Events.
+
+        Eventos: `start` (chat_code, enviado logo no início), `token` (trechos de
+        user_response conforme a IA gera) e `done` (a resposta completa, no mesmo
+        formato do /chat, com o system_response). O turno é gravado depois que o
+        stream fecha.
+        """
+        logging.info(f"DADOS DA REQUISIÇÃO (stream): >>> {data}")
+        try:
+            chatbot, context, sentiment_str, early_response = await self._prepare_turn(company_id, data, session)
+            cache_key, cached_response = (None, None)
+            if early_response is None:
+                cache_key, cached_response = await response_cache.lookup(session, company_id, context)
+        except HTTPException:
+            raise
+        except Exception as e:
+            logging.error(f"CHAT >>> Erro ao processar o chat: {e}")
+            raise HTTPException(status_code=502, detail="Erro de comunicação com a IA.")
+
+        headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        if early_response is not None:
+            return StreamingResponse(self._single_event(early_response), media_type="text/event-stream", headers=headers)
+
+        turn: Dict[str, Any] = {}
+        return StreamingResponse(
+            self._stream_turn(chatbot, context, cached_response, turn),
+            media_type="text/event-stream",
+            headers=headers,
+            background=BackgroundTask(self._persist_stream_turn, company_id, chatbot, sentiment_str, cache_key, turn),
+        )
+
+    async def _stream_turn(self, chatbot, context: dict, cached_response: Optional[dict], turn: Dict[str, Any]) -> AsyncIterator[str]:
+        yield sse_event("start", {"chat_code": chatbot.chat_code})
+
+        if cached_response is not None:
+            events = stream_generated(cached_response)
+        elif self.fake_ia:
+            events = stream_generated(await self.generate(context))
+        else:
+            events = stream_response(context)
+
+        async for event in events:
+            if event["type"] == "token":
+                if event["text"]:
+                    yield sse_event("token", {"text": event["text"]})
+                continue
+            response_data = event["response"]
+            turn["response"] = response_data
+            turn["cached"] = cached_response is not None
+            yield sse_event("done", {**response_data, "chat_code": chatbot.chat_code})
+
+    async def _persist_stream_turn(self, company_id: int, chatbot, sentiment_str: str, cache_key: Optional[str], turn: Dict[str, Any]) -> None:
+        """Grava o turno depois do stream; se o cliente desconectou antes do fim não há resposta para gravar."""
+        response_data = turn.get("response")
+        if response_data is None:
+            logging.warning(f"CHAT >>> Stream encerrado sem resposta final para company_id={company_id}")
+            return
+        try:
+            if cache_key is not None and not turn.get("cached"):
+                await response_cache.store(cache_key, response_data)
+            # A sessão da requisição já foi fechada quando o stream termina
+            async with self.cache_manager.open_session() as session:
+                await self._finish_turn(session, company_id, chatbot, sentiment_str, response_data)
+        except Exception as e:
+            logging.error(f"CHAT >>> Erro ao gravar o turno do stream: {e}")
+
+    @staticmethod
+    async def _single_event(response_data: dict) -> AsyncIterator[str]:
+        yield sse_event("done", response_data)
+
+    async def _finish_turn(self, session: AsyncSession, company_id: int, chatbot, sentiment_str: str, response_data: dict) -> dict:
+        useful_context = response_data.get("useful_context", {})
+
+        chatbot.context_json = useful_context
+        chatbot.interaction_count += 1
+        chatbot.updated_at = utc_now()
+
+        await update_interaction_and_assistant(
+            session=session,
+            chatbot=chatbot,
+            company_id=company_id,
+            sentiment_str=sentiment_str,
+            useful_context=useful_context
+        )
+
+        return {
+            **response_data,
+            "chat_code": chatbot.chat_code
+        }
+
+    async def _prepare_turn(self, company_id: int, data: ChatRequest, session: AsyncSession) -> Tuple[Any, dict, Optional[str], Optional[dict]]:
+        """Carrega o chat, classifica a mensagem e monta o contexto para a IA.
+
+        Retorna (chatbot, context, sentimento, resposta antecipada); a resposta
+        antecipada vem preenchida quando o turno termina sem chamar a IA
+        (limite de interações, intenção bloqueada).
+        """
+        try:
+            chatbot = await get_or_create_chat(
                 session=session,
-                chatbot=chatbot,
                 company_id=company_id,
+                whatsapp_id=data.whatsapp_id,
+                chat_code=data.chat_code
+            )
+        except Exception as e:
+            logging.exception(f"Erro ao criar ou buscar chat: {e}")
+            raise
+        context = chatbot.context_json
+        logging.info(f"CHAT >>> Chat carregado/criado: {context}")
+                           
+        # Zera a contagem se passou 24h da última interação
+        reset_chatbot = reset_chatbot_count(chatbot)
+        logging.info(f"CHAT >>> {reset_chatbot}")
+        
+        # Verifica se o numero de interações foi atingido
+        check_chatbot = await check_chatbot_count(chatbot, context)
+        if check_chatbot["blocked"]:
+            return chatbot, context, None, check_chatbot["data"]
+        logging.info(f"CHAT >>> {check_chatbot['message']}")
+
+        keywords = self.spacy_processor.process_message(data.message)
+        chatbot.step = chatbot.step.IN_PROGRESS
+        logging.info(f"CHAT >>> PALAVRAS CHAVE >>> Palavras chave extraídas: {keywords}")
+        
+        intents = self.intent_classifier.classify_intent(keywords, data.message)
+        logging.info(f"CHAT >>> INTENÇÕES >>> Intenções classificadas: {[i.name for i in intents]}")
+                   
+        selected_intent = self.intent_classifier.get_priority_intent(intents)
+        logging.info(f"CHAT >>> INTENÇÕES >>> Priorizando Intenções >>> {selected_intent}")
+        
+        context_blocked = await build_blocked_context(selected_intent, chatbot, context, session)
+        if context_blocked:
+            chatbot.step = chatbot.step.BLOCKED_ABUSE if selected_intent == ChatIntent.ABUSIVE else chatbot.step.CLOSING
+            return chatbot, context, None, context_blocked
+
+        sentiment_str = self.sentiment_classifier.detect_sentiment(data.message)
+        logging.info(f"CHAT >>> SENTIMENTO >>> {sentiment_str}")
+        
+        if selected_intent not in [ChatIntent.CLOSE_CHAT, ChatIntent.ABUSIVE]:
+            cached_data = await load_all_cached_data(self.cache_manager, session, company_id, selected_intent)
+            company_data = cached_data["company_data"]
+            assistant_data = cached_data["assistant_data"]
+            service_data = cached_data["service_data"]
+            schedule_slots_data = cached_data["schedule_slots_data"]
+            schedule_data = cached_data["schedule_data"]
+            logging.info(f"CHAT >>> Dados do cache carregados.")
+
+            context = await build_chat_context(
+                data=data,
+                chatbot=chatbot,
+                intents=intents,
                 sentiment_str=sentiment_str,
-                useful_context=useful_context
+                selected_intent=selected_intent,
+                company_data=company_data,
+                assistant_data=assistant_data,
+                service_data=service_data,
+                schedule_data=schedule_data,
+                schedule_slots_data=schedule_slots_data,
             )
-            
-            return {
-                **response_data,
-                "chat_code": chatbot.chat_code
-            }
+            logging.info(f"CHAT >>> Contexto montado >>> {context}")
+                            
+            context = self.context_classifier.filter_context(context, cached_data["snapshot"].projections)
+            logging.info(f"CHAT >>> Contexto filtrado: {context}")
+                        
+            context = await check_context_integrity(context, schedule_data, schedule_slots_data)
+            logging.info(f"CHAT >>> Integridade do contexto validado: {context}")
+        
+        # Pré-check de limite de tokens com o último uso conhecido (sem consulta ao banco)
+        if not token_budget.has_budget(company_id, utc_now()):
+            logging.warning(f"CHAT >>> Limite de tokens atingido para company_id={company_id}")
+            raise HTTPException(status_code=403, detail="Limite de tokens atingido para este plano.")
 
-        except Exception as e:
-            logging.error(f"CHAT >>> Erro ao processar o chat: {e}")
-            raise HTTPException(status_code=502, detail="Erro de comunicação com a IA.")
+        return chatbot, context, sentiment_str, None
 
-            
+        
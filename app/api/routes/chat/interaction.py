@@ -1,18 +1,21 @@
-from datetime import datetime
+from datetime import datetime, time, timedelta
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, Query, status, Header
-from sqlmodel import Session, func, select
-from app.database.connection import get_session
+from sqlmodel import Session, select
+from app.database.connection import get_readonly_session, get_session
 from app.models.company.company import Company
 from app.models.chat.interaction import Interaction
+from app.schemas.pagination.pagination import Page
+from app.utils.pagination_utils import PageParams, get_page_params, paginate
 
 db_session = get_session
+db_readonly_session = get_readonly_session
 
 class InteractionRouter(APIRouter):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.add_api_route("/interactions/", self.create_interaction, methods=["POST"], response_model=Interaction)
-        self.add_api_route("/interactions/", self.get_interactions, methods=["GET"], response_model=List[Interaction])
+        self.add_api_route("/interactions/", self.get_interactions, methods=["GET"], response_model=Page[Interaction])
         self.add_api_route("/interactions/{interaction_id}", self.get_interaction, methods=["GET"], response_model=Interaction)
         self.add_api_route("/interactions/{interaction_id}", self.update_interaction, methods=["PUT"], response_model=Interaction)
         self.add_api_route("/interactions/{interaction_id}", self.delete_interaction, methods=["DELETE"], response_model=dict)
@@ -35,9 +38,8 @@ class InteractionRouter(APIRouter):
         session.refresh(db_interaction)
         return db_interaction
 
-    def get_interactions(self, session: Session = Depends(db_session)):
-        interactions = session.exec(select(Interaction)).all()
-        return interactions
+    def get_interactions(self, page: PageParams = Depends(get_page_params), session: Session = Depends(db_session)):
+        return paginate(session, select(Interaction), Interaction, page)
 
     def get_interaction(self, interaction_id: int, session: Session = Depends(db_session)):
         interaction = session.get(Interaction, interaction_id)
@@ -67,7 +69,7 @@ class InteractionRouter(APIRouter):
         session.commit()
         return {"ok": True, "message": "Interação deletada com sucesso"}
 
-    def get_interactions_by_company(self, company_id: int, session: Session = Depends(db_session)):
+    def get_interactions_by_company(self, company_id: int, session: Session = Depends(db_readonly_session)):
         """
         Retorna todas as interações de uma empresa específica.
         """
@@ -96,10 +98,11 @@ class InteractionRouter(APIRouter):
         return interactions
 
     def get_interactions_by_date_range(self, start: datetime = Query(None), end: datetime = Query(None), session: Session = Depends(db_session)):
+        # Intervalo por dia inteiro como faixa em created_at, para usar o índice
         query = select(Interaction)
         if start is not None:
-            query = query.where(func.date(Interaction.created_at) >= start.date())
+            query = query.where(Interaction.created_at >= datetime.combine(start.date(), time.min))
         if end is not None:
-            query = query.where(func.date(Interaction.created_at) <= end.date())
+            query = query.where(Interaction.created_at < datetime.combine(end.date() + timedelta(days=1), time.min))
         interactions = session.exec(query).all()
         return interactions
\ No newline at end of file
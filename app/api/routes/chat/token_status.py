@@ -1,6 +1,7 @@
 import os
 from app.configuration.settings import Configuration
 from app.enums.token_status import Provider
+from app.gateway.http_client import http_client
 import httpx
 import logging
 from fastapi import APIRouter, HTTPException, status
@@ -18,13 +19,12 @@ class TokenStatusRouter(APIRouter):
         self.add_api_route("/check_token_status/{provider}", self.check_token_status, methods=["GET"])
 
     async def check_openai_status(self, api_key: str) -> dict:
-        url = "https://openrouter.ai/api/v1/auth/key" 
+        url = f"{configuration.openai_base_url.rstrip('/')}/auth/key"
         headers = {"Authorization": f"Bearer {api_key}"}
         try:
             logging.info("Fazendo requisição para o OpenAI")
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, headers=headers)
-                response.raise_for_status()
+            response = await http_client.get(url, headers=headers)
+            response.raise_for_status()
             data = response.json()
             key_info = data.get("data", {})
             logging.info(f"Status da resposta do OpenAI: {response.status_code}")
@@ -47,14 +47,13 @@ class TokenStatusRouter(APIRouter):
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Erro ao acessar OpenAI: {e}")
 
     async def check_deepseek_status(self, api_key: str) -> dict:
-        url = "https://openrouter.ai/api/v1/auth/key" 
+        url = f"{configuration.openai_base_url.rstrip('/')}/auth/key"
         headers = {"Authorization": f"Bearer {api_key}"}
         
         try:
             logging.info("Fazendo requisição para o OpenRouter (DeepSeek via OpenRouter)")
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, headers=headers)
-                response.raise_for_status()
+            response = await http_client.get(url, headers=headers)
+            response.raise_for_status()
             data = response.json()
             key_info = data.get("data", {})
             return {
@@ -80,4 +79,4 @@ class TokenStatusRouter(APIRouter):
             return await self.check_deepseek_status(self.deepseek_api_key)
         else:
             logging.error("Provedor inválido ou chave não configurada corretamente.")
-            raise HTTPException(status_code=status.HTTP_BAD_REQUEST, detail="Provedor inválido ou chave não configurada corretamente.")
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Provedor inválido ou chave não configurada corretamente.")
@@ -1,11 +1,12 @@
 from datetime import datetime, timedelta, timezone
 import logging
-from typing import List
 import uuid
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
 from sqlmodel import Session, select
 
 from app.auth.auth import AuthRouter
+from app.cache.invalidation import ASSISTANT_INFO, COMPANY_INFO, SCHEDULE_SLOTS, SERVICE_DATA, cache_invalidator
+from app.cache.versions import bump_data_version
 from app.configuration.settings import Configuration
 from app.middleware.admin import is_admin
 from app.models.company.address import Address
@@ -13,13 +14,16 @@ from app.models.company.company import Company
 from app.models.plan.plan import Plan
 from app.models.user.user import User
 from app.schemas.company.company import CompanyRequest, CompanyStatusResponse, CompanyStatusUpdate, CompanyUpdate
-from app.database.connection import get_session
+from app.schemas.pagination.pagination import Page
+from app.utils.pagination_utils import PageParams, get_page_params, paginate
+from app.database.connection import get_readonly_session, get_session
 from app.services.email import EmailService
 from app.utils.company_utils import remove_logo_company, upload_logo_company
 from app.utils.hash_utils import generate_hash
 
 # Inicializa a instância do DatabaseManager
 db_session = get_session
+db_readonly_session = get_readonly_session
 email_service = EmailService()
 configuration = Configuration()
 get_current_user = AuthRouter().get_current_user
@@ -31,7 +35,7 @@ class CompanyRouter(APIRouter):
     def __init__(self, *args, **kwargs):
         super().__init__(prefix="/company", *args, **kwargs)
 
-        self.add_api_route("/all", self.get_all_companies, methods=["GET"], response_model=List[Company])
+        self.add_api_route("/all", self.get_all_companies, methods=["GET"], response_model=Page[Company])
         self.add_api_route("/create", self.create_company, methods=["POST"], response_model=Company)
         self.add_api_route("/recent-companies", self.get_recent_companies, methods=["GET"], response_model=dict)
         self.add_api_route("/status", self.change_company_status, methods=["POST"], response_model=CompanyStatusResponse)
@@ -44,7 +48,7 @@ class CompanyRouter(APIRouter):
         self.add_api_route("/{company_id}/associate-plan/{plan_id}", self.associate_plan, methods=["PUT"])
         self.add_api_route("/tutorial/{company_id}", self.change_tutorial, methods=["PUT"])
 
-    def get_company_for_chat(self, code: str, session: Session = Depends(db_session)):
+    def get_company_for_chat(self, code: str, session: Session = Depends(db_readonly_session)):
         """
         Retorna os dados de uma empresa cadastrada pelo ID.
         """
@@ -66,9 +70,9 @@ class CompanyRouter(APIRouter):
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Empresa não encontrada.")
         return company
 
-    def get_all_companies(self, session: Session = Depends(db_session)):
-        companies = session.exec(select(Company)).all()
-        if not companies:
+    def get_all_companies(self, page: PageParams = Depends(get_page_params), session: Session = Depends(db_readonly_session)):
+        companies = paginate(session, select(Company), Company, page)
+        if not companies["items"] and not page.cursor:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Nenhuma empresa encontrada.")
         return companies
 
@@ -162,7 +166,9 @@ class CompanyRouter(APIRouter):
         db_company.updated_at = datetime.now(timezone.utc)
 
         session.add(db_company)
+        version = bump_data_version(session, company_id)
         session.commit()
+        cache_invalidator.invalidate(company_id, COMPANY_INFO, version=version)
         session.refresh(db_company)
 
         return db_company
@@ -176,8 +182,10 @@ class CompanyRouter(APIRouter):
         if not db_company:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Empresa não encontrada.")
 
+        version = bump_data_version(session, company_id)
         session.delete(db_company)
         session.commit()
+        cache_invalidator.invalidate(company_id, COMPANY_INFO, ASSISTANT_INFO, SERVICE_DATA, SCHEDULE_SLOTS, version=version)
         return {"ok": True, "message": "Empresa deletada com sucesso"}
         
     async def upload_logo(self, company_id: int, image_file: UploadFile = File(...), session: Session = Depends(db_session)):
@@ -193,7 +201,9 @@ class CompanyRouter(APIRouter):
 
         company.logo_url = result["url"]
         session.add(company)
+        version = bump_data_version(session, company_id)
         session.commit()
+        cache_invalidator.invalidate(company_id, COMPANY_INFO, version=version)
         session.refresh(company)
 
         return {"message": "Logo enviado com sucesso", "url": result["url"]}
@@ -210,12 +220,14 @@ class CompanyRouter(APIRouter):
 
         company.logo_url = None
         session.add(company)
+        version = bump_data_version(session, company_id)
         session.commit()
+        cache_invalidator.invalidate(company_id, COMPANY_INFO, version=version)
         session.refresh(company)
 
         return {"message": "Logo removido com sucesso"}
 
-    def get_recent_companies(self, session: Session = Depends(db_session)):
+    def get_recent_companies(self, session: Session = Depends(db_readonly_session)):
         now = datetime.now(timezone.utc)
         start_of_week = now - timedelta(days=now.weekday())
         start_of_month = now.replace(day=1)
@@ -244,7 +256,9 @@ class CompanyRouter(APIRouter):
         company.updated_at = datetime.now(timezone.utc)
 
         session.add(company)
+        version = bump_data_version(session, company_id)
         session.commit()
+        cache_invalidator.invalidate(company_id, COMPANY_INFO, version=version)
         session.refresh(company)
 
         return {"message": "Plano associado com sucesso", "company": company}
@@ -261,7 +275,9 @@ class CompanyRouter(APIRouter):
             company.is_open = payload.new_status
             company.updated_at = datetime.now(timezone.utc)
             session.add(company)
+            version = bump_data_version(session, company.id)
             session.commit()
+            cache_invalidator.invalidate(company.id, COMPANY_INFO, version=version)
             session.refresh(company)
             
             return CompanyStatusResponse(
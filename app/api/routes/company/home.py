@@ -1,10 +1,12 @@
 import logging
 from fastapi import APIRouter, HTTPException, status
+from app.cache.warmup import cache_warmer
 
 class HomeRouter(APIRouter):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.add_api_route("/", self.index, methods=["GET"])
+        self.add_api_route("/ready", self.ready, methods=["GET"])
         
     def index(self):
         try:
@@ -13,4 +15,10 @@ class HomeRouter(APIRouter):
             raise e
         except Exception as e:
             logging.error(f"Erro inesperado: {e}", exc_info=True)
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro interno do servidor.")
\ No newline at end of file
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro interno do servidor.")
+
+    def ready(self):
+        """Readiness: 503 enquanto o warm-up do cache não terminou."""
+        if not cache_warmer.ready:
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Aquecendo o cache.")
+        return {"ready": True}
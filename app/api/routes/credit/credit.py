@@ -1,9 +1,10 @@
-from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlmodel import Session, select
 from app.models.credit.credit import Credit
 from app.database.connection import get_session
 from app.schemas.credit.credit import CreditCreate, CreditUpdate, CreditRead
+from app.schemas.pagination.pagination import Page
+from app.utils.pagination_utils import PageParams, get_page_params, paginate
 
 db_session = get_session
 
@@ -11,14 +12,14 @@ class CreditRouter(APIRouter):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-        self.add_api_route("/credits", self.get_credits, methods=["GET"], response_model=List[CreditRead])
+        self.add_api_route("/credits", self.get_credits, methods=["GET"], response_model=Page[CreditRead])
         self.add_api_route("/credits", self.create_credit, methods=["POST"], response_model=CreditRead)
         self.add_api_route("/credits/{credit_id}", self.get_credit_by_id, methods=["GET"], response_model=CreditRead)
         self.add_api_route("/credits/{credit_id}", self.update_credit, methods=["PUT"], response_model=CreditRead)
         self.add_api_route("/credits/{credit_id}", self.delete_credit, methods=["DELETE"], response_model=dict)
 
-    def get_credits(self, session: Session = Depends(db_session)):
-        return session.exec(select(Credit)).all()
+    def get_credits(self, page: PageParams = Depends(get_page_params), session: Session = Depends(db_session)):
+        return paginate(session, select(Credit), Credit, page)
 
     def get_credit_by_id(self, credit_id: int, session: Session = Depends(db_session)):
         credit = session.get(Credit, credit_id)
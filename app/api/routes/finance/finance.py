@@ -1,4 +1,3 @@
-from typing import List
 from fastapi import APIRouter, Depends, HTTPException
 from sqlmodel import Session, select
 
@@ -6,6 +5,8 @@ from app.database.connection import get_session
 from app.auth.auth import AuthRouter
 from app.models.finance.finance import Finance
 from app.schemas.finance.finance import FinanceCreate, FinanceUpdate, FinanceRead
+from app.schemas.pagination.pagination import Page
+from app.utils.pagination_utils import PageParams, get_page_params, paginate
 
 db_session = get_session
 get_current_user = AuthRouter().get_current_user
@@ -13,14 +14,14 @@ get_current_user = AuthRouter().get_current_user
 class FinanceRouter(APIRouter):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.add_api_route("/finances", self.get_finances, methods=["GET"], response_model=List[FinanceRead])
+        self.add_api_route("/finances", self.get_finances, methods=["GET"], response_model=Page[FinanceRead])
         self.add_api_route("/finances", self.create_finance, methods=["POST"], response_model=FinanceRead)
         self.add_api_route("/finances/{finance_id}", self.get_finance_by_id, methods=["GET"], response_model=FinanceRead)
         self.add_api_route("/finances/{finance_id}", self.update_finance, methods=["PUT"], response_model=FinanceRead)
         self.add_api_route("/finances/{finance_id}", self.delete_finance, methods=["DELETE"], response_model=dict)
 
-    def get_finances(self, session: Session = Depends(db_session)):
-        return session.exec(select(Finance)).all()
+    def get_finances(self, page: PageParams = Depends(get_page_params), session: Session = Depends(db_session)):
+        return paginate(session, select(Finance), Finance, page)
 
     def get_finance_by_id(self, finance_id: int, session: Session = Depends(db_session)):
         finance = session.get(Finance, finance_id)
@@ -13,6 +13,8 @@ from app.models.plan.plan import Plan
 from app.auth.auth import AuthRouter
 from app.database.connection import get_session
 from app.schemas.payment.payment import PaymentCreate, PaymentResponse, PaymentUpdate
+from app.schemas.pagination.pagination import Page
+from app.utils.pagination_utils import PageParams, get_page_params, paginate
 from app.services.email import EmailService
 import logging
 
@@ -30,7 +32,7 @@ class PaymentRouter(APIRouter):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         
-        self.add_api_route("/payments/", self.list_payments, methods=["GET"], response_model=List[PaymentResponse])
+        self.add_api_route("/payments/", self.list_payments, methods=["GET"], response_model=Page[PaymentResponse])
         self.add_api_route("/payments/", self.create_payment, methods=["POST"], response_model=PaymentResponse)
                 
         self.add_api_route("/payments/{payment_id}", self.get_payment_by_id, methods=["GET"], response_model=PaymentResponse)
@@ -41,20 +43,21 @@ class PaymentRouter(APIRouter):
         self.add_api_route("/payments/company/{company_id}", self.get_payments_by_company, methods=["GET"], response_model=List[PaymentResponse])
 
 
-    async def list_payments(self, session: Session = Depends(db_session)):
-        """Lista todos os pagamentos"""
+    async def list_payments(self, page: PageParams = Depends(get_page_params), session: Session = Depends(db_session)):
+        """Lista os pagamentos, paginados por cursor"""
         try:
             logging.info("Iniciando listagem de pagamentos")
-            payments = session.exec(select(Payment)).all()
+            payments = paginate(session, select(Payment), Payment, page)
             
-            if not payments:
+            if not payments["items"]:
                 logging.warning("Nenhum pagamento encontrado")
-                return []
                 
-            logging.info(f"Retornando {len(payments)} pagamentos")
+            logging.info(f"Retornando {len(payments['items'])} pagamentos")
             
             return payments
             
+        except HTTPException:
+            raise
         except Exception as e:
             logging.error(f"Erro ao listar pagamentos: {str(e)}")
             raise HTTPException(
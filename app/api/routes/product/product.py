@@ -1,7 +1,6 @@
 import logging
-from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session
+from sqlmodel import Session, select
 from app.configuration.settings import Configuration
 from app.models.company.company import Company
 from app.models.product.product import Product
@@ -9,6 +8,8 @@ from app.models.user.user import User
 from app.auth.auth import AuthRouter
 from app.database.connection import get_session
 from app.schemas.product.product import ProductRequest
+from app.schemas.pagination.pagination import Page
+from app.utils.pagination_utils import PageParams, get_page_params, paginate
 
 Configuration()
 db_session = get_session
@@ -17,7 +18,7 @@ get_current_user = AuthRouter().get_current_user
 class ProductRouter(APIRouter):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.add_api_route("/products/", self.list_products, methods=["GET"], response_model=List[Product])
+        self.add_api_route("/products/", self.list_products, methods=["GET"], response_model=Page[Product])
         self.add_api_route("/products/", self.create_product, methods=["POST"], response_model=Product)
         self.add_api_route("/products/{product_id}", self.get_product, methods=["GET"], response_model=Product)
         self.add_api_route("/products/{product_id}", self.update_product, methods=["PUT"], response_model=Product)
@@ -54,9 +55,8 @@ class ProductRouter(APIRouter):
         session.refresh(product)
         return product
 
-    def list_products(self, current_user: User = Depends(get_current_user), session: Session = Depends(db_session)):
-        products = session.query(Product).all()
-        return products
+    def list_products(self, page: PageParams = Depends(get_page_params), current_user: User = Depends(get_current_user), session: Session = Depends(db_session)):
+        return paginate(session, select(Product), Product, page)
 
     def update_product(self, product_id: int, updated_product: ProductRequest, current_user: User = Depends(get_current_user), session: Session = Depends(db_session)):
         product = session.get(Product, product_id)
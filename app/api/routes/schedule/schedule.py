@@ -2,8 +2,12 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlmodel import Session, select
 
+from app.cache.invalidation import cache_invalidator
+from app.cache.versions import bump_data_version
 from app.models.schedule.schedule import Schedule
 from app.schemas.schedule.schedule import ScheduleCreate, ScheduleRead, ScheduleUpdate
+from app.schemas.pagination.pagination import Page
+from app.utils.pagination_utils import PageParams, get_page_params, paginate
 from app.database.connection import get_session
 
 db_session = get_session
@@ -11,16 +15,15 @@ db_session = get_session
 class ScheduleRouter(APIRouter):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.add_api_route("/schedule", self.get_schedules, methods=["GET"], response_model=List[ScheduleRead])
+        self.add_api_route("/schedule", self.get_schedules, methods=["GET"], response_model=Page[ScheduleRead])
         self.add_api_route("/schedule", self.create_schedule, methods=["POST"], response_model=ScheduleRead)
         self.add_api_route("/schedule/by-company", self.get_schedule_by_company, methods=["GET"], response_model=List[ScheduleRead])
         self.add_api_route("/schedule/{schedule_id}", self.get_schedule_by_id, methods=["GET"], response_model=ScheduleRead)
         self.add_api_route("/schedule/{schedule_id}", self.update_schedule, methods=["PUT"], response_model=ScheduleRead)
         self.add_api_route("/schedule/{schedule_id}", self.delete_schedule, methods=["DELETE"], response_model=None, status_code=status.HTTP_204_NO_CONTENT)
 
-    def get_schedules(self, session: Session = Depends(db_session)):
-        schedules = session.exec(select(Schedule)).all()
-        return schedules
+    def get_schedules(self, page: PageParams = Depends(get_page_params), session: Session = Depends(db_session)):
+        return paginate(session, select(Schedule), Schedule, page)
 
     def get_schedule_by_id(self, schedule_id: int, session: Session = Depends(db_session)):
         schedule = session.get(Schedule, schedule_id)
@@ -34,7 +37,8 @@ class ScheduleRouter(APIRouter):
         session: Session = Depends(db_session)
     ):
         statement = select(Schedule).where(
-            Schedule.company_id == company_id
+            Schedule.company_id == company_id,
+            Schedule.deleted_at.is_(None)
         )
         schedules = session.exec(statement)
         return schedules
@@ -43,7 +47,9 @@ class ScheduleRouter(APIRouter):
     def create_schedule(self, schedule_request: ScheduleCreate, session: Session = Depends(db_session)):
         schedule = Schedule(**schedule_request.dict())
         session.add(schedule)
+        version = bump_data_version(session, schedule.company_id)
         session.commit()
+        cache_invalidator.invalidate(schedule.company_id, version=version)
         session.refresh(schedule)
         return schedule
 
@@ -57,7 +63,9 @@ class ScheduleRouter(APIRouter):
             setattr(schedule, key, value)
         
         session.add(schedule)
+        version = bump_data_version(session, schedule.company_id)
         session.commit()
+        cache_invalidator.invalidate(schedule.company_id, version=version)
         session.refresh(schedule)
         return schedule
 
@@ -65,6 +73,9 @@ class ScheduleRouter(APIRouter):
         schedule = session.get(Schedule, schedule_id)
         if not schedule:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Agendamento não encontrado")
+        company_id = schedule.company_id
         session.delete(schedule)
+        version = bump_data_version(session, company_id)
         session.commit()
+        cache_invalidator.invalidate(company_id, version=version)
         return None
@@ -3,21 +3,26 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlmodel import Session, select
 
 from app.models.schedule.schedule_slot import ScheduleSlot
+from app.cache.invalidation import SCHEDULE_SLOTS, cache_invalidator
+from app.cache.versions import bump_data_version
 from app.schemas.schedule.schedule_slot import (
     ScheduleSlotCreate,
     ScheduleSlotRead,
     ScheduleSlotUpdate
 )
-from app.database.connection import get_session
+from app.database.connection import get_readonly_session, get_session
+from app.schemas.pagination.pagination import Page
+from app.utils.pagination_utils import PageParams, get_page_params, paginate
 
 db_session = get_session
+db_readonly_session = get_readonly_session
 
 
 class ScheduleSlotRouter(APIRouter):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.add_api_route(
-            "/schedule-slot", self.get_slots, methods=["GET"], response_model=List[ScheduleSlotRead]
+            "/schedule-slot", self.get_slots, methods=["GET"], response_model=Page[ScheduleSlotRead]
         )
         self.add_api_route(
             "/schedule-slot", self.create_slot, methods=["POST"], response_model=ScheduleSlotRead
@@ -35,16 +40,17 @@ class ScheduleSlotRouter(APIRouter):
             "/schedule-slot/{slot_id}", self.delete_slot, methods=["DELETE"], status_code=status.HTTP_204_NO_CONTENT
         )
 
-    def get_slots(self, session: Session = Depends(db_session)):
-        return session.exec(select(ScheduleSlot)).all()
+    def get_slots(self, page: PageParams = Depends(get_page_params), session: Session = Depends(db_session)):
+        return paginate(session, select(ScheduleSlot), ScheduleSlot, page)
     
     def get_slots_by_company(
         self,
         company_id: int = Query(..., description="ID da empresa"),
-        session: Session = Depends(db_session)
+        session: Session = Depends(db_readonly_session)
     ):
         statement = select(ScheduleSlot).where(
-            ScheduleSlot.company_id == company_id
+            ScheduleSlot.company_id == company_id,
+            ScheduleSlot.deleted_at.is_(None)
         )
         slots = session.exec(statement).all()
         return slots
@@ -58,7 +64,9 @@ class ScheduleSlotRouter(APIRouter):
     def create_slot(self, slot_data: ScheduleSlotCreate, session: Session = Depends(db_session)):
         slot = ScheduleSlot(**slot_data.dict())
         session.add(slot)
+        version = bump_data_version(session, slot.company_id)
         session.commit()
+        cache_invalidator.invalidate(slot.company_id, SCHEDULE_SLOTS, version=version)
         session.refresh(slot)
         return slot
 
@@ -72,7 +80,9 @@ class ScheduleSlotRouter(APIRouter):
             setattr(slot, key, value)
 
         session.add(slot)
+        version = bump_data_version(session, slot.company_id)
         session.commit()
+        cache_invalidator.invalidate(slot.company_id, SCHEDULE_SLOTS, version=version)
         session.refresh(slot)
         return slot
 
@@ -80,6 +90,9 @@ class ScheduleSlotRouter(APIRouter):
         slot = session.get(ScheduleSlot, slot_id)
         if not slot:
             raise HTTPException(status_code=404, detail="Slot de agendamento não encontrado")
+        company_id = slot.company_id
         session.delete(slot)
+        version = bump_data_version(session, company_id)
         session.commit()
+        cache_invalidator.invalidate(company_id, SCHEDULE_SLOTS, version=version)
         return None
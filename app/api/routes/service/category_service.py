@@ -4,6 +4,8 @@ from sqlmodel import Session, select
 from app.models.service.category_service import CategoryService
 from app.models.user.user import User
 from app.auth.auth import AuthRouter
+from app.cache.invalidation import SERVICE_DATA, cache_invalidator
+from app.cache.versions import bump_data_version
 from app.database.connection import get_session
 from app.schemas.service.category_service import CategoryRequest, CategoryUpdate
 
@@ -39,7 +41,9 @@ class CategoryServiceRouter(APIRouter):
 
         category = CategoryService(name=category_request.name, company_id=company_id)
         session.add(category)
+        version = bump_data_version(session, company_id)
         session.commit()
+        cache_invalidator.invalidate(company_id, SERVICE_DATA, version=version)
         session.refresh(category)
         return category
 
@@ -62,7 +66,9 @@ class CategoryServiceRouter(APIRouter):
         if category_request.name:
             category.name = category_request.name
 
+        version = bump_data_version(session, company_id)
         session.commit()
+        cache_invalidator.invalidate(company_id, SERVICE_DATA, version=version)
         session.refresh(category)
         return category
 
@@ -75,5 +81,7 @@ class CategoryServiceRouter(APIRouter):
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Categoria não encontrada ou não pertence a esta empresa")
 
         session.delete(category)
+        version = bump_data_version(session, company_id)
         session.commit()
+        cache_invalidator.invalidate(company_id, SERVICE_DATA, version=version)
         return {"message": "Categoria excluída com sucesso"}
\ No newline at end of file
@@ -6,7 +6,9 @@ from app.models.company.company import Company
 from app.models.service.service import Service
 from app.models.service.category_service import CategoryService
 from app.auth.auth import AuthRouter
-from app.database.connection import get_session
+from app.cache.invalidation import SERVICE_DATA, cache_invalidator
+from app.cache.versions import bump_data_version
+from app.database.connection import get_readonly_session, get_session
 from app.schemas.service.service import (
     ServiceCreate,
     ServiceUpdate,
@@ -14,6 +16,7 @@ from app.schemas.service.service import (
 )
 
 db_session = get_session
+db_readonly_session = get_readonly_session
 get_current_user = AuthRouter().get_current_user
 
 class ServiceRouter(APIRouter):
@@ -25,7 +28,7 @@ class ServiceRouter(APIRouter):
         self.add_api_route("/services/{company_id}/{service_id}", self.update_service, methods=["PUT"], response_model=ServiceResponse)
         self.add_api_route("/services/{company_id}/{service_id}", self.delete_service, methods=["DELETE"], response_model=dict)
 
-    def list_services(self, company_id: int, session: Session = Depends(db_session)):
+    def list_services(self, company_id: int, session: Session = Depends(db_readonly_session)):
         company = session.get(Company, company_id)
         if not company:
             raise HTTPException(status_code=404, detail="Empresa não encontrada")
@@ -62,7 +65,9 @@ class ServiceRouter(APIRouter):
 
         service = Service(**service_data.dict(exclude={"company_id"}), company_id=company_id)
         session.add(service)
+        version = bump_data_version(session, company_id)
         session.commit()
+        cache_invalidator.invalidate(company_id, SERVICE_DATA, version=version)
         session.refresh(service)
         return service
 
@@ -93,7 +98,9 @@ class ServiceRouter(APIRouter):
             setattr(service, key, value)
 
         session.add(service)
+        version = bump_data_version(session, company_id)
         session.commit()
+        cache_invalidator.invalidate(company_id, SERVICE_DATA, version=version)
         session.refresh(service)
         return service
 
@@ -114,5 +121,7 @@ class ServiceRouter(APIRouter):
             raise HTTPException(status_code=404, detail="Serviço não encontrado ou não pertence à empresa")
 
         session.delete(service)
+        version = bump_data_version(session, company_id)
         session.commit()
+        cache_invalidator.invalidate(company_id, SERVICE_DATA, version=version)
         return {"message": "Serviço deletado com sucesso"}
@@ -1,6 +1,7 @@
 import logging
 from app.configuration.settings import Configuration
 from fastapi import APIRouter, Depends, HTTPException, status, Header
+from sqlalchemy.orm import selectinload
 from sqlmodel import Session, select
 from app.database.connection import get_session
 from app.models.company.company import Company
@@ -81,7 +82,7 @@ class AuthRouter(APIRouter):
         if user is None:
             raise HTTPException(status_code=404, detail="Usuário não encontrado")
 
-        company = session.get(Company, user.company_id)
+        company = session.get(Company, user.company_id, options=[selectinload(Company.addresses)])
         if company is None:
             raise HTTPException(status_code=404, detail="Empresa não encontrada")
 
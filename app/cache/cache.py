@@ -1,43 +1,166 @@
 # app/tasks/cache.py
 
-from typing import Dict, Any, Optional
+from collections import OrderedDict
+from dataclasses import fields, is_dataclass
+from typing import Callable, Dict, Any, Optional, Tuple
 import logging
-from datetime import datetime, timedelta
+import re
+import sys
+import threading
+import time
+from datetime import timedelta
 
 from app.configuration.settings import Configuration
 
-Configuration()
+configuration = Configuration()
+
+# Sufixo numérico (company_id) removido para agrupar as métricas por tipo de chave
+_KEY_ID_SUFFIX = re.compile(r"_\d+$")
+
+
+def key_prefix(key: str) -> str:
+    """Prefixo da chave usado nas métricas (ex.: chat_data_company_info_12 -> chat_data_company_info)."""
+    return _KEY_ID_SUFFIX.sub("", key)
+
+
+def approximate_size(value: Any) -> int:
+    """Tamanho aproximado em bytes de um valor (soma recursiva de sys.getsizeof)."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(approximate_size(k) + approximate_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(approximate_size(item) for item in value)
+    elif is_dataclass(value) and not isinstance(value, type):
+        size += sum(approximate_size(getattr(value, field.name)) for field in fields(value))
+    return size
+
 
 class Cache:
-    def __init__(self):
-        self._cache: Dict[str, Dict[str, Any]] = {}
-        self._expiry_times: Dict[str, datetime] = {}
+    """Cache LRU em memória com TTL, limite de entradas e orçamento aproximado de bytes.
+
+    Entradas expiradas são removidas na leitura e por uma varredura periódica em
+    thread daemon (iniciada no primeiro `set`). Quando o limite de entradas ou de
+    bytes é ultrapassado, as menos usadas recentemente são descartadas. Acertos,
+    falhas, expirações e descartes são contados por prefixo de chave.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        sweep_interval: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries if max_entries is not None else configuration.cache_max_entries
+        self.max_bytes = max_bytes if max_bytes is not None else configuration.cache_max_bytes
+        self.sweep_interval = sweep_interval if sweep_interval is not None else configuration.cache_sweep_interval
         self.default_ttl = timedelta(minutes=15)
+        self._clock = clock
+        self._lock = threading.Lock()
+        # chave -> (dados, expira_em, bytes); a ordem é a de uso (mais recente no fim)
+        self._entries: "OrderedDict[str, Tuple[Any, float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._sweeper: Optional[threading.Thread] = None
+        self._stop = threading.Event()
 
     def set(self, key: str, data: Dict[str, Any], ttl: Optional[int] = None) -> None:
         """Armazena dados no cache com tempo de expiração em segundos."""
-        expiration = datetime.now() + timedelta(seconds=ttl) if ttl else datetime.now() + self.default_ttl
-        self._cache[key] = data
-        self._expiry_times[key] = expiration
+        ttl_seconds = ttl if ttl else self.default_ttl.total_seconds()
+        size = approximate_size(data)
+        if size > self.max_bytes:
+            logging.warning(f"CACHE >>> Valor de {size} bytes excede o orçamento do cache, não armazenado: {key}")
+            return
+
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (data, self._clock() + ttl_seconds, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                evicted, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._count(evicted, "evictions")
+        self._ensure_sweeper()
         logging.debug(f"Cache setado para key: {key}")
 
     def get(self, key: str) -> Optional[Dict[str, Any]]:
         """Obtém dados do cache se existirem e não estiverem expirados."""
-        if key not in self._cache:
-            return None
-            
-        if datetime.now() > self._expiry_times.get(key, datetime.min):
-            del self._cache[key]
-            del self._expiry_times[key]
-            logging.debug(f"Cache expirado para key: {key}")
-            return None
-            
-        return self._cache[key]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._count(key, "misses")
+                return None
+
+            data, expires_at, _ = entry
+            if self._clock() > expires_at:
+                self._remove(key)
+                self._count(key, "expirations")
+                self._count(key, "misses")
+                logging.debug(f"Cache expirado para key: {key}")
+                return None
+
+            self._entries.move_to_end(key)
+            self._count(key, "hits")
+            return data
 
     def clear(self, key: str) -> None:
         """Remove dados do cache."""
-        if key in self._cache:
-            del self._cache[key]
-            del self._expiry_times[key]
+        with self._lock:
+            removed = self._remove(key)
+        if removed:
             logging.debug(f"Cache limpo para key: {key}")
 
+    delete = clear
+
+    def sweep(self) -> int:
+        """Remove todas as entradas expiradas; retorna quantas foram removidas."""
+        now = self._clock()
+        with self._lock:
+            expired = [key for key, (_, expires_at, _) in self._entries.items() if now > expires_at]
+            for key in expired:
+                self._remove(key)
+                self._count(key, "expirations")
+        if expired:
+            logging.debug(f"CACHE >>> Varredura removeu {len(expired)} entradas expiradas")
+        return len(expired)
+
+    def stats(self) -> dict:
+        """Ocupação do cache e contadores por prefixo de chave."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "prefixes": {prefix: dict(counters) for prefix, counters in self._stats.items()},
+            }
+
+    def close(self) -> None:
+        """Para a varredura em background."""
+        self._stop.set()
+
+    def _ensure_sweeper(self) -> None:
+        if self._sweeper is not None or self.sweep_interval <= 0:
+            return
+        with self._lock:
+            if self._sweeper is None:
+                self._sweeper = threading.Thread(target=self._sweep_loop, name="cache-sweeper", daemon=True)
+                self._sweeper.start()
+
+    def _sweep_loop(self) -> None:
+        while not self._stop.wait(self.sweep_interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                logging.error(f"CACHE >>> Erro na varredura do cache: {e}")
+
+    def _remove(self, key: str) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._bytes -= entry[2]
+        return True
+
+    def _count(self, key: str, counter: str) -> None:
+        counters = self._stats.setdefault(key_prefix(key), {"hits": 0, "misses": 0, "expirations": 0, "evictions": 0})
+        counters[counter] += 1
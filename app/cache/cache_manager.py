@@ -2,58 +2,199 @@
 
 from datetime import datetime
 import logging
-from typing import List, Optional
+import random
+import time
+from typing import Any, Awaitable, Callable, List, Optional
 from app.models.chat.assistant import Assistant
 from app.models.company.company import Company
 from app.cache.cache import Cache
+from app.cache.single_flight import SingleFlight
+from app.cache.snapshot import CompanySnapshot
+from app.cache.tiered_cache import build_cache
+from app.cache.versions import data_versions
+from app.configuration.settings import Configuration
+from app.database.connection import AsyncSessionLocal, get_async_engine
 from app.models.service.category_service import CategoryService
-from sqlmodel import Session, select
+from sqlalchemy.orm import selectinload
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.models.schedule.schedule import Schedule
 from app.models.schedule.schedule_slot import ScheduleSlot
+from app.utils.frozen_utils import FrozenDict, freeze
+from app.utils.token_utils import token_budget
 
-cache = Cache()
+configuration = Configuration()
+
+cache = build_cache()
+# Cargas em andamento por chave, compartilhadas pelas instâncias do processo
+single_flight = SingleFlight()
+# Snapshots por empresa (só em memória do processo; remontados a partir do cache)
+snapshots = Cache(sweep_interval=0)
 
 class CacheManager:
     _cache_key_prefix = "chat_data_"
     
     def __init__(self):
         self.cache = cache
+        self.snapshots = snapshots
+        # Fábrica de sessões da revalidação em background; None usa o engine assíncrono do processo
+        self.session_factory: Optional[Callable[[], AsyncSession]] = None
+        # Segundos antes do vencimento em que a entrada já é remontada (0 = só depois de vencer)
+        self.refresh_ahead = 0
 
     def get_cache_key(self, key: str) -> str:
         """Gera a chave de cache completa com o prefixo"""
         return f"{self._cache_key_prefix}{key}"
 
-    async def load_cached_data(self, key: str) -> Optional[dict]:
-        """Carrega dados do cache"""
-        cache_key = self.get_cache_key(key)
-        cached_data = self.cache.get(cache_key)
-        if cached_data:
-            logging.info(f"Dados encontrados no cache para a chave: {cache_key}")
-        return cached_data
-
-    async def cache_data(self, key: str, data: dict) -> None:
-        """Armazena dados no cache"""
-        cache_key = self.get_cache_key(key)
-        self.cache.set(cache_key, data, ttl=900)
-        logging.info(f"Dados armazenados no cache com a chave: {cache_key}")
+    def company_cache_key(self, kind: str, company_id: int) -> str:
+        """Chave gravada no cache para um tipo de dado da empresa (company_info, assistant_info, service_data, schedule_slots).
 
-    async def get_company_data(self, session: Session, company_id: int) -> dict:
-        cache_key = self.get_cache_key(f"company_info_{company_id}")
-        cached = await self.load_cached_data(cache_key)
+        Os getters montam a chave com get_cache_key e load_cached_data/cache_data
+        aplicam o prefixo de novo; a invalidação precisa da chave final.
+        """
+        return self.get_cache_key(self.get_cache_key(f"{kind}_{company_id}"))
 
-        if cached:
-            company_status = session.exec(
-                select(Company.is_open).where(Company.id == company_id)
-            ).first()
+    async def load_cached_entry(self, key: str, version: Optional[int] = None) -> Optional[FrozenDict]:
+        """Carrega a entrada do cache ({"version", "fresh_until", "data"}).
 
-            cached["is_open"] = company_status if company_status else "CLOSE"
-            return cached
+        Com `version`, a entrada precisa ter sido montada nessa versão dos dados
+        da empresa ou depois; senão é tratada como ausente. Uma entrada vencida
+        (`fresh_until` no passado) continua sendo devolvida até o TTL do cache.
+        """
+        cache_key = self.get_cache_key(key)
+        entry = await self.cache.get(cache_key)
+        if not (isinstance(entry, dict) and "fresh_until" in entry):
+            return None
+        if version is not None and (entry.get("version") is None or entry["version"] < version):
+            logging.info(f"Cache desatualizado (versão {version}) para a chave: {cache_key}")
+            return None
+        logging.info(f"Dados encontrados no cache para a chave: {cache_key}")
+        return entry
+
+    async def load_cached_data(self, key: str, version: Optional[int] = None) -> Optional[dict]:
+        """Carrega dados do cache (ver load_cached_entry)."""
+        entry = await self.load_cached_entry(key, version)
+        return entry["data"] if entry is not None else None
+
+    async def cache_data(self, key: str, data: dict, version: Optional[int] = None, ttl: Optional[int] = None):
+        """Armazena dados no cache (com a versão dos dados da empresa, se informada).
+
+        A validade recebe uma variação aleatória de ±CACHE_TTL_JITTER, para que as
+        entradas preenchidas juntas não vençam juntas, e a entrada fica no cache
+        mais CACHE_STALE_SECONDS para ser servida vencida enquanto é remontada.
+        Os dados são congelados (FrozenDict/FrozenList) e a cópia imutável guardada
+        no cache é devolvida, para que o chamador use o mesmo objeto dos acertos seguintes.
+        """
+        cache_key = self.get_cache_key(key)
+        jitter = configuration.cache_ttl_jitter
+        fresh_for = (ttl or configuration.cache_ttl) * random.uniform(1 - jitter, 1 + jitter)
+        data = freeze(data)
+        entry = FrozenDict({"version": version, "fresh_until": time.time() + fresh_for, "data": data})
+        await self.cache.set(cache_key, entry, ttl=int(fresh_for + configuration.cache_stale_seconds))
+        logging.info(f"Dados armazenados no cache com a chave: {cache_key}")
+        return data
+
+    async def load_or_build(
+        self,
+        session: AsyncSession,
+        key: str,
+        company_id: int,
+        loader: Callable[[AsyncSession, int], Awaitable[Any]],
+        versioned: bool = True,
+    ) -> Any:
+        """Lê a chave do cache ou a remonta com `loader(session, company_id)`.
+
+        Na falta, só uma corrotina por chave (e versão) executa o loader; as
+        demais aguardam o mesmo resultado. Uma entrada vencida é devolvida na hora
+        e remontada em background, com uma sessão própria. Com `refresh_ahead`
+        (usado pelo CacheWarmer), a entrada que vence dentro desse prazo é
+        remontada aqui mesmo, com a sessão do chamador. Se o loader retorna None,
+        nada é armazenado.
+        """
+        version = await data_versions.current(session, company_id) if versioned else None
+        flight_key = f"{self.get_cache_key(key)}@{version}"
+        entry = await self.load_cached_entry(key, version)
+        if entry is not None:
+            if time.time() < entry["fresh_until"] - self.refresh_ahead:
+                return entry["data"]
+            if self.refresh_ahead:
+                return await single_flight.run(flight_key, lambda: self._build(session, key, company_id, loader, version))
+            if single_flight.spawn(flight_key, lambda: self._revalidate(key, company_id, loader, version)):
+                logging.info(f"CACHE >>> Servindo valor vencido e revalidando em background: {key}")
+            return entry["data"]
+
+        return await single_flight.run(flight_key, lambda: self._build(session, key, company_id, loader, version))
+
+    async def _build(self, session: AsyncSession, key: str, company_id: int, loader, version: Optional[int]) -> Any:
+        data = await loader(session, company_id)
+        if data is None:
+            return None
+        return await self.cache_data(key, data, version)
+
+    async def _revalidate(self, key: str, company_id: int, loader, version: Optional[int]) -> Any:
+        async with self.open_session() as session:
+            return await self._build(session, key, company_id, loader, version)
+
+    def open_session(self) -> AsyncSession:
+        """Sessão própria (revalidação em background e cargas paralelas); só conecta na primeira consulta."""
+        if self.session_factory is not None:
+            return self.session_factory()
+        get_async_engine()
+        return AsyncSessionLocal()
+
+    def get_snapshot(self, company_id: int, company: dict, assistant: dict, services, schedule, slots, variant: str = "all") -> CompanySnapshot:
+        """Snapshot imutável da empresa com as projeções por intenção.
+
+        É montado uma vez e reutilizado enquanto os getters devolverem os mesmos
+        objetos do cache; quando alguma parte é remontada, o snapshot também é.
+        `variant` separa os snapshots montados com subconjuntos dos dados (grupo de intenção).
+        """
+        key = f"snapshot_{variant}_{company_id}"
+        snapshot = self.snapshots.get(key)
+        if snapshot is not None and snapshot.built_from(company, assistant, services, schedule, slots):
+            return snapshot
+
+        snapshot = CompanySnapshot.build(company_id, company, assistant, services, schedule, slots)
+        self.snapshots.set(key, snapshot, ttl=configuration.cache_ttl)
+        logging.info(f"CACHE >>> Snapshot dos dados do chat montado para company_id={company_id}")
+        return snapshot
+
+    async def get_company_data(self, session: AsyncSession, company_id: int) -> dict:
+        # Alterações da empresa (inclusive is_open) incrementam a versão; o acerto não consulta o banco
+        return await self.load_or_build(session, self.get_cache_key(f"company_info_{company_id}"), company_id, self._load_company_data)
+
+    async def get_assistant_data(self, session: AsyncSession, company_id: int) -> dict:
+        # Alterações do assistente (inclusive status e criação) invalidam a chave
+        return await self.load_or_build(
+            session, self.get_cache_key(f"assistant_info_{company_id}"), company_id, self._load_assistant_data, versioned=False
+        )
+
+    async def get_service_data(self, session: AsyncSession, company_id: int) -> dict:
+        # CRUD de serviços e categorias incrementa a versão (lista vazia também é acerto)
+        return await self.load_or_build(session, self.get_cache_key(f"service_data_{company_id}"), company_id, self._load_service_data)
+
+    async def get_schedule_data(self, session: AsyncSession, company_id: int) -> dict:
+        # A versão dos dados da empresa substitui a consulta de updated_at a cada acerto
+        return await self.load_or_build(session, f"schedules_{company_id}", company_id, self._load_schedule_data)
+
+    async def get_schedule_slots_data(self, session: AsyncSession, company_id: int) -> List[dict]:
+        """
+        Obtém os slots de agendamento do cache ou do banco de dados.
+        Atualiza o cache se necessário.
+        """
+        # CRUD de slots invalida a chave e incrementa a versão; o acerto não consulta o banco
+        cached = await self.load_or_build(session, self.get_cache_key(f"schedule_slots_{company_id}"), company_id, self._load_schedule_slots_data)
+        return cached["slots"]
 
-        # Se não está no cache, buscar do banco
-        company = session.exec(select(Company).where(Company.id == company_id)).first()
+    async def _load_company_data(self, session: AsyncSession, company_id: int) -> dict:
+        company = (await session.exec(
+            select(Company)
+            .where(Company.id == company_id)
+            .options(selectinload(Company.addresses))
+        )).first()
 
-        company_data = {
+        return {
             "name": company.name if company else "Empresa",
             "status": company.status if company and company.status else "CLOSE",
             "is_open": company.is_open if company and company.is_open else "CLOSE",
@@ -66,24 +207,13 @@ class CacheManager:
             "social_media": company.social_media_links if company and company.social_media_links else {},
         }
 
-        await self.cache_data(cache_key, company_data)
-        return company_data
-
-    async def get_assistant_data(self, session: Session, company_id: int) -> dict:
-        cache_key = self.get_cache_key(f"assistant_info_{company_id}")
-        cached = await self.load_cached_data(cache_key)
-        if cached:
-            status = session.exec(
-                select(Assistant.status).where(Assistant.company_id == company_id)
-            ).first()
-            cached["status"] = status if status else "OFFLINE"
-            return cached
-
-        assistant = session.exec(
+    async def _load_assistant_data(self, session: AsyncSession, company_id: int) -> dict:
+        assistant = (await session.exec(
             select(Assistant).where(Assistant.company_id == company_id)
-        ).first()
+        )).first()
 
         if not assistant:
+            # Também fica no cache: a criação do assistente invalida a chave
             return {
                 "name": "Assistente",
                 "status": "OFFLINE",
@@ -95,7 +225,15 @@ class CacheManager:
                 "token_reset_date": None,
             }
 
-        assistant_data = {
+        # Semeia o pré-check de tokens do chat com o uso gravado no banco
+        token_budget.record(
+            company_id,
+            assistant.assistant_token_usage,
+            assistant.assistant_token_limit,
+            assistant.assistant_token_reset_date,
+        )
+
+        return {
             "name": assistant.assistant_name,
             "status": assistant.status if assistant.status else "OFFLINE",
             "type": assistant.assistant_type,
@@ -103,50 +241,15 @@ class CacheManager:
             "api_url": assistant.assistant_api_url,
         }
 
-        await self.cache_data(cache_key, assistant_data)
-        return assistant_data
-
-    async def get_service_data(self, session: Session, company_id: int) -> dict:
-        cache_key = self.get_cache_key(f"service_data_{company_id}")
-        cached = await self.load_cached_data(cache_key)
-        if cached:
-            # Atualiza os dados sempre do banco
-            categories = session.exec(
-                select(CategoryService).where(CategoryService.company_id == company_id)
-            ).all()
-
-            service_data = [
-                {
-                    "category_id": category.id,
-                    "category_name": category.name,
-                    "services": [
-                        {
-                            "id": service.id,
-                            "name": service.name,
-                            "description": service.description,
-                            "price": service.price,
-                            "duration": service.duration,
-                            "availability": service.availability,
-                            "rating": service.rating,
-                            "image": service.image,
-                        }
-                        for service in category.services
-                        if not service.deleted_at
-                    ],
-                }
-                for category in categories
-                if not category.deleted_at
-            ]
-
-            await self.cache_data(cache_key, service_data)
-            return service_data
+    async def _load_service_data(self, session: AsyncSession, company_id: int) -> List[dict]:
+        categories = (await session.exec(
+            select(CategoryService)
+            .where(CategoryService.company_id == company_id)
+            .where(CategoryService.deleted_at.is_(None))
+            .options(selectinload(CategoryService.services))
+        )).all()
 
-        # Se não tá no cache, busca e salva
-        categories = session.exec(
-            select(CategoryService).where(CategoryService.company_id == company_id)
-        ).all()
-
-        service_data = [
+        return [
             {
                 "category_id": category.id,
                 "category_name": category.name,
@@ -169,29 +272,13 @@ class CacheManager:
             if not category.deleted_at
         ]
 
-        await self.cache_data(cache_key, service_data)
-        return service_data
-    
-    async def get_schedule_data(self, session: Session, company_id: int) -> dict:
-        cache_key = f"schedules_{company_id}"
-        
-        cached = await self.load_cached_data(cache_key)
-        if cached:
-            last_update = session.exec(
-                select(Schedule.updated_at)
-                .where(Schedule.company_id == company_id)
-                .order_by(Schedule.updated_at.desc())
-            ).first()
-
-            cache_time = datetime.fromisoformat(cached['last_updated'])
-            if last_update and last_update <= cache_time:
-                return cached
-
-        schedules = session.exec(
+    async def _load_schedule_data(self, session: AsyncSession, company_id: int) -> dict:
+        schedules = (await session.exec(
             select(Schedule)
             .where(Schedule.company_id == company_id)
+            .where(Schedule.deleted_at.is_(None))
             .order_by(Schedule.start)
-        ).all()
+        )).all()
 
         calendar_events = [
             schedule.to_calendar_event()
@@ -199,66 +286,30 @@ class CacheManager:
             if schedule.start
         ]
 
-        schedule_data = {
+        return {
             "events_data": calendar_events,
             "last_updated": datetime.now().isoformat()
         }
 
-        await self.cache_data(cache_key, schedule_data)
-        return schedule_data
-
-    async def get_schedule_slots_data(self, session: Session, company_id: int) -> List[dict]:
-        """
-        Obtém os slots de agendamento do cache ou do banco de dados.
-        Atualiza o cache se necessário.
-        """
-        cache_key = self.get_cache_key(f"schedule_slots_{company_id}")
-        cached = await self.load_cached_data(cache_key)
-        
-        # Verifica se precisa atualizar o cache
-        needs_refresh = False
-        if cached:
-            # Busca a última atualização no banco
-            last_db_update = session.exec(
-                select(ScheduleSlot.updated_at)
-                .where(ScheduleSlot.company_id == company_id)
-                .order_by(ScheduleSlot.updated_at.desc())
-            ).first()
-            
-            if last_db_update and datetime.fromisoformat(cached['last_updated']) < last_db_update:
-                needs_refresh = True
-        else:
-            needs_refresh = True
-
-        if not needs_refresh:
-            return cached['slots']
-
-        # Busca os dados atualizados do banco
-        slots = session.exec(
+    async def _load_schedule_slots_data(self, session: AsyncSession, company_id: int) -> dict:
+        slots = (await session.exec(
             select(ScheduleSlot)
             .where(ScheduleSlot.company_id == company_id)
+            .where(ScheduleSlot.deleted_at.is_(None))
             .order_by(ScheduleSlot.start)
-        ).all()
+        )).all()
 
-        # Formata os dados para o cache
-        slots_data = [self._format_slot_data(slot) for slot in slots]
-        
-        # Atualiza o cache
-        cache_data = {
-            "slots": slots_data,
+        return {
+            "slots": [self._format_slot_data(slot) for slot in slots],
             "last_updated": datetime.now().isoformat()
         }
-        await self.cache_data(cache_key, cache_data)
-        
-        return slots_data
 
     async def invalidate_schedule_slots_cache(self, company_id: int) -> None:
         """
         Invalida o cache de slots de agendamento para uma empresa específica.
         Útil quando sabemos que os dados foram alterados.
         """
-        cache_key = self.get_cache_key(f"schedule_slots_{company_id}")
-        self.cache.delete(cache_key)
+        await self.cache.delete(self.company_cache_key("schedule_slots", company_id))
 
     def _format_slot_data(self, slot: ScheduleSlot) -> dict:
         """Formata os dados de um slot para o formato de cache"""
@@ -277,7 +328,7 @@ class CacheManager:
             "updated_at": slot.updated_at.isoformat()
         }
 
-    async def get_available_slots(self, session: Session, company_id: int, service_id: Optional[int] = None) -> List[dict]:
+    async def get_available_slots(self, session: AsyncSession, company_id: int, service_id: Optional[int] = None) -> List[dict]:
         """
         Obtém apenas os slots disponíveis (is_active=True e sem schedule_id)
         Opcionalmente filtra por service_id.
@@ -0,0 +1,140 @@
+# app/cache/invalidation.py
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+from redis.exceptions import RedisError
+
+from app.cache.cache_manager import CacheManager, cache
+from app.cache.tiered_cache import TieredCache
+from app.cache.versions import SET_VERSION_IF_GREATER, DataVersions, data_versions
+from app.configuration.settings import Configuration
+
+configuration = Configuration()
+
+INVALIDATION_CHANNEL = "firecloud:cache:invalidate"
+
+# Tipos de dado do chat por empresa (ver CacheManager.company_cache_key)
+COMPANY_INFO = "company_info"
+ASSISTANT_INFO = "assistant_info"
+SERVICE_DATA = "service_data"
+SCHEDULE_SLOTS = "schedule_slots"
+
+
+class CacheInvalidator:
+    """Invalida dados do chat em cache quando as rotas de CRUD alteram o banco.
+
+    A invalidação apaga a chave no L1 deste processo e no L2 (Redis) e publica
+    o evento no canal de pub/sub; os demais workers escutam o canal numa thread
+    daemon e apagam a chave dos seus L1. O evento leva também a nova versão dos
+    dados da empresa (ver app/cache/versions.py), que invalida as entradas
+    montadas em versões anteriores. A latência (publicação -> aplicação em outro
+    worker) é medida a partir do horário enviado no evento.
+    """
+
+    def __init__(self, cache: TieredCache, redis=None, channel: str = INVALIDATION_CHANNEL, versions: Optional[DataVersions] = None):
+        self.cache = cache
+        # Cliente Redis síncrono (as rotas de CRUD são síncronas); None = só este processo
+        self.redis = redis
+        self.channel = channel
+        self.versions = versions if versions is not None else data_versions
+        # Script Lua registrado localmente (EVALSHA na primeira chamada); mantém a versão do Redis monotônica
+        self._set_version = redis.register_script(SET_VERSION_IF_GREATER) if redis is not None else None
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._keys = CacheManager()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._listener: Optional[threading.Thread] = None
+        self._stats = {"published": 0, "received": 0, "publish_errors": 0, "latency_ms_last": 0.0, "latency_ms_max": 0.0, "latency_ms_total": 0.0}
+
+    def invalidate(self, company_id: int, *kinds: str, version: Optional[int] = None) -> None:
+        """Invalida os tipos de dado da empresa e divulga a nova versão (de bump_data_version); chamar depois do commit."""
+        keys = [self._keys.company_cache_key(kind, company_id) for kind in kinds]
+        for key in keys:
+            self.cache.l1.clear(key)
+        if version is not None:
+            self.versions.observe(company_id, version)
+        logging.info(f"CACHE >>> Invalidação de {', '.join(kinds) or 'dados'} para company_id={company_id} (versão {version})")
+        if self.redis is None:
+            return
+
+        event = {"company_id": company_id, "keys": keys, "version": version, "origin": self.origin, "published_at": time.time()}
+        try:
+            if keys:
+                self.redis.delete(*[self.cache.namespace + key for key in keys])
+            if version is not None:
+                self._set_version(keys=[f"{self.versions.namespace}{company_id}"], args=[version])
+            self.redis.publish(self.channel, json.dumps(event))
+            self._count("published")
+        except (RedisError, OSError) as e:
+            # O L2 pode ficar com o valor antigo até o TTL; o L1 dos outros workers até CACHE_L1_TTL_SECONDS
+            self._count("publish_errors")
+            logging.warning(f"CACHE >>> Falha ao publicar invalidação para company_id={company_id}: {e}")
+
+    def handle_message(self, data: Any) -> None:
+        """Aplica um evento recebido do pub/sub no L1 e nas versões deste processo."""
+        event = json.loads(data)
+        if event.get("origin") == self.origin:
+            return
+        for key in event.get("keys", []):
+            self.cache.l1.clear(key)
+        if event.get("version") is not None:
+            self.versions.observe(event["company_id"], event["version"])
+
+        latency_ms = max(0.0, (time.time() - event.get("published_at", time.time())) * 1000)
+        with self._lock:
+            self._stats["received"] += 1
+            self._stats["latency_ms_last"] = latency_ms
+            self._stats["latency_ms_max"] = max(self._stats["latency_ms_max"], latency_ms)
+            self._stats["latency_ms_total"] += latency_ms
+
+    def start(self) -> None:
+        """Inicia a escuta do canal de invalidação (uma thread por processo)."""
+        if self.redis is None or self._listener is not None:
+            return
+        self._stop.clear()
+        self._listener = threading.Thread(target=self._listen, name="cache-invalidation", daemon=True)
+        self._listener.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._listener = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        total = stats.pop("latency_ms_total")
+        stats["latency_ms_avg"] = total / stats["received"] if stats["received"] else 0.0
+        stats["listening"] = self._listener is not None
+        return stats
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self._stats[counter] += 1
+
+    def _listen(self) -> None:
+        while not self._stop.is_set():
+            try:
+                pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                try:
+                    while not self._stop.is_set():
+                        message = pubsub.get_message(timeout=1.0)
+                        if message and message.get("type") == "message":
+                            self.handle_message(message["data"])
+                finally:
+                    pubsub.close()
+            except (RedisError, OSError, ValueError) as e:
+                logging.warning(f"CACHE >>> Escuta de invalidação interrompida, nova tentativa em {configuration.cache_l2_retry_seconds}s: {e}")
+                self._stop.wait(configuration.cache_l2_retry_seconds)
+
+
+cache_invalidator = CacheInvalidator(
+    cache,
+    redis=configuration.get_redis_client() if configuration.cache_l2_enabled else None,
+)
@@ -0,0 +1,185 @@
+# app/cache/response_cache.py
+
+import copy
+import hashlib
+import logging
+import re
+import threading
+import unicodedata
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.cache.cache import Cache
+from app.cache.tiered_cache import TieredCache
+from app.cache.versions import data_versions
+from app.configuration.settings import Configuration
+from app.enums.chat import ChatIntent
+from app.gateway.chatbot.nlp.context_classifier import ContextClassifier
+
+configuration = Configuration()
+
+_NON_WORD = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+
+# Campos da resposta que dependem do turno (e não da pergunta) e não vão para o cache
+_TURN_FIELDS = {"history", "timestamp", "token_usage", "user_message", "user_last_message", "sentiment", "intents"}
+
+
+def normalize_message(message: str) -> str:
+    """Mensagem em minúsculas, sem acentos, pontuação e espaços repetidos ("Qual o horário?" -> "qual o horario")."""
+    text = unicodedata.normalize("NFKD", message or "")
+    text = "".join(char for char in text if not unicodedata.combining(char)).lower()
+    return _SPACES.sub(" ", _NON_WORD.sub(" ", text)).strip()
+
+
+class ResponseCache:
+    """Cache das respostas da IA para perguntas repetidas à mesma empresa.
+
+    A chave combina company_id, versão dos dados da empresa, intenção principal
+    e a mensagem normalizada (com o nome/tipo/modelo do assistente). Como toda escrita
+    no catálogo, agenda ou cadastro incrementa a versão (bump_data_version), as
+    respostas antigas deixam de ser encontradas sem invalidação explícita e
+    saem pelo TTL. Só intenções de informação (ContextClassifier.NEED_SERVICES)
+    são cacheadas, e só quando a conversa ainda não tem turnos além da saudação:
+    a chave não inclui o histórico, então perguntas de acompanhamento ("qual
+    desses é mais barato?") e intenções que dependem do cliente sempre vão à IA.
+    """
+
+    CACHEABLE_INTENTS = ContextClassifier.NEED_SERVICES
+    # Turnos anteriores que não mudam a resposta de uma pergunta de informação
+    OPENING_INTENTS = {ChatIntent.START.value, ChatIntent.WELCOME.value}
+
+    def __init__(self, cache: Optional[TieredCache] = None, ttl: Optional[int] = None, enabled: Optional[bool] = None):
+        if cache is None:
+            redis = configuration.get_async_redis_client() if configuration.cache_l2_enabled else None
+            cache = TieredCache(Cache(max_entries=configuration.response_cache_max_entries), redis=redis, namespace="firecloud:llm:")
+        self.cache = cache
+        self.ttl = ttl if ttl is not None else configuration.response_cache_ttl
+        self.enabled = enabled if enabled is not None else configuration.response_cache_enabled
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stored": 0, "skipped": 0, "tokens_saved": 0}
+
+    def cacheable(self, context: Dict[str, Any]) -> bool:
+        return (
+            self.enabled
+            and context.get("main_intent") in self.CACHEABLE_INTENTS
+            and bool(normalize_message(context.get("user_message", "")))
+            and not self.depends_on_history(context)
+        )
+
+    @classmethod
+    def depends_on_history(cls, context: Dict[str, Any]) -> bool:
+        """Se a conversa já tem turnos (além de saudações) que a IA usaria para responder."""
+        for turn in context.get("history") or []:
+            intent = turn.get("intent") if isinstance(turn, dict) else None
+            if str(getattr(intent, "value", intent)) not in cls.OPENING_INTENTS:
+                return True
+        return False
+
+    def cache_key(self, company_id: int, version: int, context: Dict[str, Any]) -> str:
+        assistant = context.get("data", {}).get("assistant") or {}
+        material = "|".join([normalize_message(context.get("user_message", "")), str(assistant.get("name")), str(assistant.get("type")), str(assistant.get("model"))])
+        digest = hashlib.sha1(material.encode("utf-8")).hexdigest()
+        return f"{company_id}:{version}:{context.get('main_intent')}:{digest}"
+
+    async def get_or_generate(
+        self,
+        session: AsyncSession,
+        company_id: int,
+        context: Dict[str, Any],
+        generate: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+    ) -> Dict[str, Any]:
+        """Resposta do cache, quando houver; senão chama `generate(context)` e guarda a resposta se ela puder ser reaproveitada."""
+        key, cached = await self.lookup(session, company_id, context)
+        if cached is not None:
+            return cached
+
+        response_data = await generate(context)
+        if key is not None:
+            await self.store(key, response_data)
+        return response_data
+
+    async def lookup(self, session: AsyncSession, company_id: int, context: Dict[str, Any]) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """(chave, resposta do cache); chave None quando o pedido não é cacheável e resposta None quando não houver entrada."""
+        if not self.cacheable(context):
+            return None, None
+
+        version = await data_versions.current(session, company_id)
+        key = self.cache_key(company_id, version, context)
+        entry = await self.cache.get(key)
+        if entry is None:
+            self._count("misses")
+            return key, None
+
+        self._count("hits")
+        self._count("tokens_saved", entry.get("total_tokens", 0))
+        logging.info(f"CACHE >>> Resposta da IA reaproveitada para company_id={company_id} ({context.get('main_intent')})")
+        return key, self.replay(entry, context)
+
+    async def store(self, key: str, response_data: Dict[str, Any]) -> bool:
+        """Guarda a resposta gerada para a chave de `lookup`, se ela puder ser reaproveitada."""
+        entry = self.entry_for(response_data)
+        if entry is None:
+            self._count("skipped")
+            return False
+        await self.cache.set(key, entry, ttl=self.ttl)
+        self._count("stored")
+        return True
+
+    @staticmethod
+    def entry_for(response_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Parte reaproveitável de uma resposta da IA; None para fallbacks e erros, mesmo quando gastaram tokens."""
+        useful_context = response_data.get("useful_context") or {}
+        token_usage = useful_context.get("token_usage")
+        total_tokens = token_usage.get("total_tokens", 0) if isinstance(token_usage, dict) else 0
+        if response_data.get("status") != 200 or not total_tokens or not isinstance(useful_context.get("system_response"), dict):
+            return None
+        user_response = useful_context.get("user_response")
+        if not isinstance(user_response, str) or not user_response.strip():
+            return None
+        if (useful_context.get("metadata") or {}).get("function") == "handle_fallback":
+            return None
+        return {
+            "useful_context": {k: v for k, v in useful_context.items() if k not in _TURN_FIELDS},
+            "total_tokens": total_tokens,
+        }
+
+    @staticmethod
+    def replay(entry: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+        """Monta a resposta do turno a partir da entrada do cache, como generate_response faria (sem gastar tokens)."""
+        now = datetime.now(timezone.utc).isoformat()
+        useful_context = copy.deepcopy(dict(entry["useful_context"]))
+        history = context.get("history", [])
+        history.append({
+            "user_message": context.get("user_message"),
+            "ia_response": useful_context.get("user_response"),
+            "timestamp": now,
+            "intent": context.get("main_intent"),
+        })
+        useful_context.update({
+            "user_message": context.get("user_message"),
+            "main_intent": context.get("main_intent"),
+            "intents": context.get("intents", []),
+            "sentiment": context.get("sentiment"),
+            "history": history,
+            "token_usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            "timestamp": now,
+        })
+        return {"useful_context": useful_context, "status": 200, "cached": True}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        stats["enabled"] = self.enabled
+        return stats
+
+    def _count(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self._stats[counter] += amount
+
+
+response_cache = ResponseCache()
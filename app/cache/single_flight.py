@@ -0,0 +1,85 @@
+# app/cache/single_flight.py
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Set, Tuple
+
+
+class SingleFlight:
+    """Coalescência de cargas concorrentes por chave (single-flight).
+
+    A primeira corrotina que pede uma chave executa o loader; as demais que
+    chegam enquanto ele roda aguardam o mesmo resultado (ou a mesma exceção) em
+    vez de repetir as consultas. As chamadas são separadas por event loop.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Tuple[int, str], asyncio.Future] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._stats = {"loads": 0, "coalesced": 0, "background": 0, "background_errors": 0}
+
+    async def run(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Executa `loader` uma vez por chave entre as corrotinas concorrentes."""
+        loop = asyncio.get_running_loop()
+        call_key = (id(loop), key)
+        while True:
+            future = self._calls.get(call_key)
+            if future is None:
+                break
+            self._stats["coalesced"] += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # Só repete se quem foi cancelado é a carga em andamento, não esta corrotina
+                if not future.cancelled():
+                    raise
+
+        future = loop.create_future()
+        self._calls[call_key] = future
+        return await self._lead(call_key, future, loader)
+
+    def spawn(self, key: str, loader: Callable[[], Awaitable[Any]]) -> bool:
+        """Inicia `loader` em background, se a chave não estiver carregando; retorna se iniciou."""
+        loop = asyncio.get_running_loop()
+        call_key = (id(loop), key)
+        if call_key in self._calls:
+            return False
+
+        future = loop.create_future()
+        self._calls[call_key] = future
+        self._stats["background"] += 1
+        task = loop.create_task(self._background(call_key, future, loader, key))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def stats(self) -> dict:
+        return {**self._stats, "in_flight": self.in_flight()}
+
+    async def _lead(self, call_key: Tuple[int, str], future: asyncio.Future, loader: Callable[[], Awaitable[Any]]) -> Any:
+        self._stats["loads"] += 1
+        try:
+            result = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Marca a exceção como lida: sem seguidores, o asyncio avisaria no coletor de lixo
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._calls.pop(call_key, None)
+
+    async def _background(self, call_key: Tuple[int, str], future: asyncio.Future, loader: Callable[[], Awaitable[Any]], key: str) -> None:
+        try:
+            await self._lead(call_key, future, loader)
+        except Exception as e:
+            self._stats["background_errors"] += 1
+            logging.warning(f"CACHE >>> Falha ao revalidar em background a chave {key}: {e}")
@@ -0,0 +1,49 @@
+# app/cache/snapshot.py
+
+from dataclasses import dataclass
+from typing import Any, Optional, Tuple
+
+from app.gateway.chatbot.nlp.context_classifier import ContextClassifier
+from app.utils.frozen_utils import FrozenDict
+
+
+@dataclass(frozen=True)
+class CompanySnapshot:
+    """Dados do chat de uma empresa, imutáveis, com as projeções por intenção já montadas.
+
+    `sources` guarda os objetos do cache de onde o snapshot foi montado
+    (empresa, assistente, serviços, agenda e slots). Enquanto o cache devolve
+    os mesmos objetos, o snapshot continua válido; qualquer remontagem de uma
+    parte (expiração, invalidação, nova versão) produz outro objeto.
+    """
+
+    company_id: int
+    sources: Tuple[Any, ...]
+    data: FrozenDict
+    projections: FrozenDict
+
+    @classmethod
+    def build(cls, company_id: int, company: Any, assistant: Any, services: Any, schedule: Any, slots: Any) -> "CompanySnapshot":
+        # Mesmas chaves que build_chat_context monta em context["data"]
+        data = {"company": company, "assistant": assistant}
+        if services:
+            data["services"] = services
+        if schedule:
+            data["schedule"] = schedule
+        if slots:
+            data["schedule_slots"] = slots
+        return cls(
+            company_id=company_id,
+            sources=(company, assistant, services, schedule, slots),
+            data=FrozenDict(data),
+            projections=FrozenDict(ContextClassifier.project(data)),
+        )
+
+    def built_from(self, *sources: Any) -> bool:
+        """Se o snapshot foi montado exatamente destes objetos (comparação por identidade)."""
+        return len(sources) == len(self.sources) and all(a is b for a, b in zip(sources, self.sources))
+
+    def for_intent(self, main_intent: Any) -> FrozenDict:
+        """Projeção dos dados para a intenção (os dados completos se ela não tiver filtro)."""
+        group: Optional[str] = ContextClassifier.intent_group(main_intent)
+        return self.data if group is None else self.projections[group]
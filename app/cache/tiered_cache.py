@@ -0,0 +1,126 @@
+# app/cache/tiered_cache.py
+
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, Optional
+
+from redis.exceptions import RedisError
+
+from app.cache.cache import Cache
+from app.configuration.settings import Configuration
+from app.utils.frozen_utils import freeze
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson é opcional
+    orjson = None
+
+configuration = Configuration()
+
+
+def dumps(data: Any) -> bytes:
+    """Serializa um valor do cache (orjson quando disponível, json como alternativa)."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def loads(raw: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+class TieredCache:
+    """Cache em dois níveis: L1 em memória do processo na frente de um L2 Redis compartilhado.
+
+    O L1 guarda por no máximo `l1_ttl` segundos, o que limita quanto tempo um
+    worker pode divergir dos demais; o L2 guarda pelo TTL pedido e é comum a
+    todos os workers/instâncias. Se o Redis falha, o cache segue só com o L1 e
+    o L2 é tentado de novo após `retry_seconds`.
+    """
+
+    def __init__(
+        self,
+        l1: Cache,
+        redis=None,
+        l1_ttl: Optional[int] = None,
+        namespace: str = "firecloud:cache:",
+        retry_seconds: Optional[float] = None,
+        decode: Optional[Callable[[Any], Any]] = None,
+    ):
+        self.l1 = l1
+        # Cliente redis.asyncio; None desliga o L2
+        self.redis = redis
+        self.l1_ttl = l1_ttl if l1_ttl is not None else configuration.cache_l1_ttl
+        self.namespace = namespace
+        self.retry_seconds = retry_seconds if retry_seconds is not None else configuration.cache_l2_retry_seconds
+        # Aplicado ao valor lido do L2 antes de ir para o L1 (ex.: freeze)
+        self.decode = decode
+        self._l2_down_until = 0.0
+        self._l2_stats = {"hits": 0, "misses": 0, "errors": 0}
+
+    async def get(self, key: str) -> Optional[Any]:
+        data = self.l1.get(key)
+        if data is not None or not self._l2_available():
+            return data
+
+        try:
+            raw = await self.redis.get(self.namespace + key)
+        except (RedisError, OSError) as e:
+            self._l2_failed("leitura", e)
+            return None
+
+        if raw is None:
+            self._l2_stats["misses"] += 1
+            return None
+        self._l2_stats["hits"] += 1
+        data = loads(raw)
+        if self.decode is not None:
+            data = self.decode(data)
+        self.l1.set(key, data, ttl=self.l1_ttl)
+        return data
+
+    async def set(self, key: str, data: Any, ttl: Optional[int] = None) -> None:
+        ttl = ttl or int(self.l1.default_ttl.total_seconds())
+        self.l1.set(key, data, ttl=min(ttl, self.l1_ttl))
+        if not self._l2_available():
+            return
+        try:
+            await self.redis.set(self.namespace + key, dumps(data), ex=ttl)
+        except (RedisError, OSError) as e:
+            self._l2_failed("escrita", e)
+
+    async def delete(self, key: str) -> None:
+        self.l1.clear(key)
+        if not self._l2_available():
+            return
+        try:
+            await self.redis.delete(self.namespace + key)
+        except (RedisError, OSError) as e:
+            self._l2_failed("remoção", e)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "l1": self.l1.stats(),
+            "l2": {
+                **self._l2_stats,
+                "enabled": self.redis is not None,
+                "available": self._l2_available(),
+            },
+        }
+
+    def _l2_available(self) -> bool:
+        return self.redis is not None and time.monotonic() >= self._l2_down_until
+
+    def _l2_failed(self, operation: str, error: Exception) -> None:
+        self._l2_stats["errors"] += 1
+        self._l2_down_until = time.monotonic() + self.retry_seconds
+        logging.warning(f"CACHE >>> Falha de {operation} no Redis (L2), usando só o L1 por {self.retry_seconds}s: {error}")
+
+
+def build_cache() -> TieredCache:
+    """Cache do processo: L1 limitado + L2 Redis quando habilitado; os valores do L1 são imutáveis."""
+    redis = configuration.get_async_redis_client() if configuration.cache_l2_enabled else None
+    return TieredCache(Cache(), redis=redis, decode=freeze)
@@ -0,0 +1,120 @@
+# app/cache/versions.py
+
+import logging
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from redis.exceptions import RedisError
+from sqlalchemy import update
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.configuration.settings import Configuration
+from app.models.company.company import Company
+
+configuration = Configuration()
+
+VERSION_NAMESPACE = "firecloud:version:"
+
+# Grava a versão só se ela for maior que a do Redis: publicações fora de ordem não voltam a versão
+SET_VERSION_IF_GREATER = """
+local current = tonumber(redis.call('GET', KEYS[1]))
+local version = tonumber(ARGV[1])
+if current == nil or current < version then
+    redis.call('SET', KEYS[1], version)
+    return version
+end
+return current
+"""
+
+
+def bump_data_version(session: Session, company_id: int) -> Optional[int]:
+    """Incrementa tb_company.data_version na transação da sessão; chamar antes do commit.
+
+    Retorna a nova versão (ou None se a empresa não existe), que deve ser
+    repassada ao cache_invalidator depois do commit.
+    """
+    row = session.exec(
+        update(Company)
+        .where(Company.id == company_id)
+        .values(data_version=Company.data_version + 1)
+        .returning(Company.data_version)
+        .execution_options(synchronize_session=False)
+    ).first()
+    return row[0] if row else None
+
+
+class DataVersions:
+    """Última versão conhecida dos dados de cada empresa, em memória do processo.
+
+    Uma entrada de cache é válida se foi montada na versão atual ou depois.
+    A versão vem da memória enquanto tiver menos de `ttl` segundos (atualizada
+    pelas escritas locais e pelos eventos de invalidação); depois disso é relida
+    com um GET no Redis ou, sem Redis, com uma leitura da empresa pela PK.
+    """
+
+    def __init__(self, redis=None, ttl: float = 30, namespace: str = VERSION_NAMESPACE):
+        # Cliente redis.asyncio (o mesmo do L2); None = só memória e banco
+        self.redis = redis
+        self.ttl = ttl
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._known: Dict[int, Tuple[int, float]] = {}
+        self._stats = {"memory_reads": 0, "redis_reads": 0, "db_reads": 0}
+
+    def observe(self, company_id: int, version: int) -> None:
+        """Registra uma versão vista (nunca regride)."""
+        with self._lock:
+            current = self._known.get(company_id)
+            self._known[company_id] = (max(version, current[0]) if current else version, time.monotonic())
+
+    def known(self, company_id: int) -> Optional[int]:
+        with self._lock:
+            entry = self._known.get(company_id)
+        if entry is None or time.monotonic() - entry[1] > self.ttl:
+            return None
+        return entry[0]
+
+    async def current(self, session: AsyncSession, company_id: int) -> int:
+        """Versão atual dos dados da empresa, com o menor custo disponível."""
+        version = self.known(company_id)
+        if version is not None:
+            self._count("memory_reads")
+            return version
+
+        key = f"{self.namespace}{company_id}"
+        if self.redis is not None:
+            try:
+                raw = await self.redis.get(key)
+                self._count("redis_reads")
+                if raw is not None:
+                    version = int(raw)
+            except (RedisError, OSError) as e:
+                logging.warning(f"CACHE >>> Falha ao ler a versão de company_id={company_id} no Redis: {e}")
+
+        if version is None:
+            version = (await session.exec(select(Company.data_version).where(Company.id == company_id))).first() or 0
+            self._count("db_reads")
+            if self.redis is not None:
+                try:
+                    await self.redis.set(key, version, nx=True)
+                except (RedisError, OSError):
+                    pass
+
+        self.observe(company_id, version)
+        return version
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "companies": len(self._known)}
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self._stats[counter] += 1
+
+
+data_versions = DataVersions(
+    redis=configuration.get_async_redis_client() if configuration.cache_l2_enabled else None,
+    ttl=configuration.cache_l1_ttl,
+)
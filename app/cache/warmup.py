@@ -0,0 +1,159 @@
+# app/cache/warmup.py
+
+import asyncio
+import logging
+import time
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.cache.cache_manager import CacheManager
+from app.configuration.settings import Configuration
+from app.models.chat.chat import Chat
+from app.utils.date_utils import utc_now
+
+configuration = Configuration()
+
+
+class CacheWarmer:
+    """Pré-carrega o cache do chat das empresas com conversas recentes.
+
+    No startup, carrega os dados (empresa, assistente, serviços, agenda e slots)
+    das empresas com `Chat.last_interaction_at` dentro da janela, com no máximo
+    `concurrency` empresas ao mesmo tempo (uma sessão cada), e só então marca o
+    processo como pronto (`ready`, exposto em /ready). Depois, a cada
+    `refresh_interval` segundos, remonta as entradas dessas empresas que vencem
+    em menos de CACHE_REFRESH_AHEAD_SECONDS, antes que um chat encontre a
+    entrada vencida.
+    """
+
+    def __init__(
+        self,
+        manager: Optional[CacheManager] = None,
+        window_minutes: Optional[int] = None,
+        max_companies: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        refresh_interval: Optional[float] = None,
+        enabled: Optional[bool] = None,
+    ):
+        if manager is None:
+            manager = CacheManager()
+            manager.refresh_ahead = configuration.cache_refresh_ahead
+        self.manager = manager
+        self.window = timedelta(minutes=window_minutes if window_minutes is not None else configuration.cache_warmup_window_minutes)
+        self.max_companies = max_companies if max_companies is not None else configuration.cache_warmup_max_companies
+        self.concurrency = max(1, concurrency if concurrency is not None else configuration.cache_warmup_concurrency)
+        self.refresh_interval = refresh_interval if refresh_interval is not None else configuration.cache_refresh_interval
+        self.enabled = enabled if enabled is not None else configuration.cache_warmup_enabled
+        self.ready = False
+        self._task: Optional[asyncio.Task] = None
+        self._stats: Dict[str, Any] = {
+            "warmed_companies": 0,
+            "warmup_seconds": None,
+            "refresh_cycles": 0,
+            "refreshed_companies": 0,
+            "errors": 0,
+        }
+
+    async def recent_companies(self, session: AsyncSession) -> List[int]:
+        """Empresas com conversa dentro da janela, das mais recentes para as mais antigas."""
+        since = utc_now() - self.window
+        last_interaction = func.max(Chat.last_interaction_at)
+        rows = (await session.exec(
+            select(Chat.company_id, last_interaction)
+            .where(Chat.last_interaction_at >= since)
+            .group_by(Chat.company_id)
+            .order_by(last_interaction.desc())
+            .limit(self.max_companies)
+        )).all()
+        return [company_id for company_id, _ in rows]
+
+    async def warm_company(self, company_id: int) -> None:
+        """Carrega (ou renova) os dados do chat de uma empresa, em sequência numa única sessão."""
+        async with self.manager.open_session() as session:
+            await self.manager.get_company_data(session, company_id)
+            await self.manager.get_assistant_data(session, company_id)
+            await self.manager.get_service_data(session, company_id)
+            await self.manager.get_schedule_data(session, company_id)
+            await self.manager.get_schedule_slots_data(session, company_id)
+
+    async def warm(self, company_ids: List[int]) -> int:
+        """Aquece as empresas com no máximo `concurrency` ao mesmo tempo; retorna quantas deram certo."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def guarded(company_id: int) -> bool:
+            async with semaphore:
+                try:
+                    await self.warm_company(company_id)
+                    return True
+                except Exception as e:
+                    self._stats["errors"] += 1
+                    logging.warning(f"CACHE >>> Falha ao aquecer o cache de company_id={company_id}: {e}")
+                    return False
+
+        results = await asyncio.gather(*(guarded(company_id) for company_id in company_ids))
+        return sum(results)
+
+    async def warm_up(self) -> None:
+        """Aquecimento do startup; o processo fica pronto mesmo se ele falhar."""
+        started = time.perf_counter()
+        try:
+            async with self.manager.open_session() as session:
+                company_ids = await self.recent_companies(session)
+            self._stats["warmed_companies"] = await self.warm(company_ids)
+            logging.info(
+                f"CACHE >>> Warm-up de {self._stats['warmed_companies']}/{len(company_ids)} empresas "
+                f"em {time.perf_counter() - started:.2f}s"
+            )
+        except Exception as e:
+            self._stats["errors"] += 1
+            logging.error(f"CACHE >>> Falha no warm-up do cache, seguindo com o cache frio: {e}")
+        finally:
+            self._stats["warmup_seconds"] = time.perf_counter() - started
+            self.ready = True
+
+    async def refresh(self) -> int:
+        """Um ciclo de renovação das empresas com conversas recentes."""
+        async with self.manager.open_session() as session:
+            company_ids = await self.recent_companies(session)
+        refreshed = await self.warm(company_ids)
+        self._stats["refresh_cycles"] += 1
+        self._stats["refreshed_companies"] += refreshed
+        return refreshed
+
+    def start(self) -> None:
+        """Inicia o warm-up e a renovação periódica em background (chamar com o event loop rodando)."""
+        if not self.enabled:
+            self.ready = True
+            return
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, "ready": self.ready, "enabled": self.enabled}
+
+    async def _run(self) -> None:
+        await self.warm_up()
+        while self.refresh_interval > 0:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                self._stats["errors"] += 1
+                logging.warning(f"CACHE >>> Falha na renovação do cache: {e}")
+
+
+cache_warmer = CacheWarmer()
@@ -1,6 +1,8 @@
 import logging
 import os
+import threading
 import redis
+import redis.asyncio
 from dotenv import load_dotenv
 
 # Configuração de logging
@@ -12,6 +14,11 @@ load_dotenv(dotenv_path=".env", encoding="utf-8")
 # Silencia logs de SQLAlchemy
 logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
 
+# Clientes Redis do processo, criados sob demanda (um pool por processo)
+_redis_lock = threading.Lock()
+_redis_client = None
+_async_redis_client = None
+
 class Configuration:
     def __init__(self):
         
@@ -37,11 +44,30 @@ class Configuration:
 
         # IA - OPENAI
         self.openassistant_api_key = os.getenv("OPENassistant_api_key")
-        self.openai_base_url = "https://openrouter.ai/api/v1"
+        self.openai_base_url = os.getenv("OPENAI_BASE_URL", "https://openrouter.ai/api/v1")
 
         # IA - GEMINI
         self.gemini_api_key = os.getenv("GEMINI_API_KEY")
 
+        # CLIENTE HTTP COMPARTILHADO DOS PROVEDORES DE IA (pool com keep-alive; HTTP/2 quando o pacote h2 está instalado)
+        self.http_max_connections = int(os.getenv("HTTP_MAX_CONNECTIONS", 100))
+        self.http_max_keepalive = int(os.getenv("HTTP_MAX_KEEPALIVE", 20))
+        self.http_keepalive_expiry = float(os.getenv("HTTP_KEEPALIVE_SECONDS", 30))
+        self.http_max_per_host = int(os.getenv("HTTP_MAX_PER_HOST", 20))
+        self.http_timeout = float(os.getenv("HTTP_TIMEOUT_SECONDS", 15))
+        self.http_http2 = os.getenv("HTTP_HTTP2", "true").lower() == "true"
+
+        # CIRCUIT BREAKER, TIMEOUT ADAPTATIVO E RETRIES POR PROVEDOR DE IA (o timeout máximo é HTTP_TIMEOUT_SECONDS)
+        self.ai_breaker_window = float(os.getenv("AI_BREAKER_WINDOW_SECONDS", 60))
+        self.ai_breaker_min_calls = int(os.getenv("AI_BREAKER_MIN_CALLS", 10))
+        self.ai_breaker_error_rate = float(os.getenv("AI_BREAKER_ERROR_RATE", 0.5))
+        self.ai_breaker_slow_call = float(os.getenv("AI_BREAKER_SLOW_CALL_SECONDS", 10))
+        self.ai_breaker_open_seconds = float(os.getenv("AI_BREAKER_OPEN_SECONDS", 30))
+        self.ai_timeout_min = float(os.getenv("AI_TIMEOUT_MIN_SECONDS", 3))
+        self.ai_timeout_factor = float(os.getenv("AI_TIMEOUT_P95_FACTOR", 2))
+        self.ai_retry_attempts = int(os.getenv("AI_RETRY_ATTEMPTS", 2))
+        self.ai_retry_backoff = float(os.getenv("AI_RETRY_BACKOFF_SECONDS", 0.2))
+
         # Configurações do ambiente e banco de dados
         self.environment = os.getenv("APP_ENVIRONMENT_DEFAULT", "development").lower()
         
@@ -62,6 +88,57 @@ class Configuration:
         self.db_dev_host = os.getenv("DB_DEV_HOST")
         self.db_dev_port = os.getenv("DB_DEV_PORT", "5432")
         self.db_dev_name = os.getenv("DB_DEV_NAME")
+
+        # POOL DE CONEXÕES
+        self.db_pool_size = int(os.getenv("DB_POOL_SIZE", 5))
+        self.db_max_overflow = int(os.getenv("DB_MAX_OVERFLOW", 10))
+        self.db_pool_timeout = int(os.getenv("DB_POOL_TIMEOUT", 30))
+        self.db_pool_recycle = int(os.getenv("DB_POOL_RECYCLE", 1800))
+        self.db_pool_pre_ping = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+        self.db_session_hold_warning = float(os.getenv("DB_SESSION_HOLD_WARNING_SECONDS", 10))
+
+        # POSTGRES RÉPLICA DE LEITURA (opcional)
+        self.db_replica_url = os.getenv("DB_REPLICA_URL")
+        self.db_replica_max_lag = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", 5))
+        self.db_replica_lag_check_interval = float(os.getenv("DB_REPLICA_LAG_CHECK_SECONDS", 10))
+
+        # CACHE EM MEMÓRIA (dados do chat por empresa)
+        self.cache_max_entries = int(os.getenv("CACHE_MAX_ENTRIES", 5000))
+        self.cache_max_bytes = int(os.getenv("CACHE_MAX_BYTES", 64 * 1024 * 1024))
+        self.cache_sweep_interval = float(os.getenv("CACHE_SWEEP_SECONDS", 60))
+        # Validade dos dados do chat, variação aleatória (fração do TTL) e janela em que o valor vencido ainda é servido enquanto é remontado
+        self.cache_ttl = int(os.getenv("CACHE_TTL_SECONDS", 900))
+        self.cache_ttl_jitter = float(os.getenv("CACHE_TTL_JITTER", 0.1))
+        self.cache_stale_seconds = int(os.getenv("CACHE_STALE_SECONDS", 120))
+        # Warm-up no startup e renovação antecipada para empresas com conversas recentes
+        self.cache_warmup_enabled = os.getenv("CACHE_WARMUP_ENABLED", "true").lower() == "true"
+        self.cache_warmup_window_minutes = int(os.getenv("CACHE_WARMUP_WINDOW_MINUTES", 60))
+        self.cache_warmup_max_companies = int(os.getenv("CACHE_WARMUP_MAX_COMPANIES", 200))
+        self.cache_warmup_concurrency = int(os.getenv("CACHE_WARMUP_CONCURRENCY", 4))
+        self.cache_refresh_interval = float(os.getenv("CACHE_REFRESH_SECONDS", 60))
+        self.cache_refresh_ahead = int(os.getenv("CACHE_REFRESH_AHEAD_SECONDS", 120))
+
+        # CACHE DE RESPOSTAS DA IA (perguntas repetidas por empresa, intenção e versão dos dados)
+        self.response_cache_enabled = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+        self.response_cache_ttl = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", 3600))
+        self.response_cache_max_entries = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 2000))
+
+        # CACHE L2 COMPARTILHADO (Redis); ligado por padrão quando REDIS_HOST está definido
+        self.cache_l2_enabled = os.getenv("CACHE_L2_ENABLED", "true" if os.getenv("REDIS_HOST") else "false").lower() == "true"
+        self.cache_l1_ttl = int(os.getenv("CACHE_L1_TTL_SECONDS", 30))
+        self.cache_l2_retry_seconds = float(os.getenv("CACHE_L2_RETRY_SECONDS", 5))
+        self.redis_max_connections = int(os.getenv("REDIS_MAX_CONNECTIONS", 20))
+        # Com o pool cheio, espera uma conexão livre por até este tempo antes de falhar
+        self.redis_pool_timeout = float(os.getenv("REDIS_POOL_TIMEOUT_SECONDS", 2))
+
+        # WRITE-BEHIND DOS TURNOS DE CHAT
+        self.write_behind_flush_ms = int(os.getenv("WRITE_BEHIND_FLUSH_MS", 200))
+        self.write_behind_max_batch = int(os.getenv("WRITE_BEHIND_MAX_BATCH", 100))
+        self.write_behind_max_retries = int(os.getenv("WRITE_BEHIND_MAX_RETRIES", 3))
+
+        # PAGINAÇÃO DAS LISTAGENS
+        self.page_default_limit = int(os.getenv("PAGE_DEFAULT_LIMIT", 50))
+        self.page_max_limit = int(os.getenv("PAGE_MAX_LIMIT", 200))
         
         self.endpoint_url_r2 = os.getenv("ENDPOINT_CLOUDFLARE_R2")
         self.aws_access_key_id_aws = os.getenv("AWS_ACCESS_KEY_ID")
@@ -78,16 +155,55 @@ class Configuration:
         self.mercado_pago_access_token_test = os.getenv("MERCADO_PAGO_ACCESS_TOKEN_TEST")
                     
     def get_redis_client(self):
-        """Retorna uma instância do cliente Redis configurado."""
-        return redis.Redis(
+        """Retorna o cliente Redis do processo (um único pool de conexões compartilhado)."""
+        global _redis_client
+        if _redis_client is None:
+            with _redis_lock:
+                if _redis_client is None:
+                    _redis_client = redis.Redis(connection_pool=redis.BlockingConnectionPool(
+                        timeout=self.redis_pool_timeout, **self._redis_options()
+                    ))
+        return _redis_client
+
+    def get_async_redis_client(self):
+        """Retorna o cliente Redis assíncrono do processo (pool compartilhado, usado pelo cache L2)."""
+        global _async_redis_client
+        if _async_redis_client is None:
+            with _redis_lock:
+                if _async_redis_client is None:
+                    _async_redis_client = redis.asyncio.Redis(connection_pool=self.async_redis_pool())
+        return _async_redis_client
+
+    def async_redis_pool(self) -> redis.asyncio.BlockingConnectionPool:
+        """Pool assíncrono limitado a REDIS_MAX_CONNECTIONS.
+
+        Bloqueante: com todas as conexões em uso, o pedido espera uma vaga (até
+        REDIS_POOL_TIMEOUT_SECONDS) em vez de falhar com "Too many connections",
+        o que desligaria o L2 do cache por CACHE_L2_RETRY_SECONDS.
+        """
+        return redis.asyncio.BlockingConnectionPool(timeout=self.redis_pool_timeout, **self._redis_options(decode_responses=False))
+
+    def _redis_options(self, decode_responses: bool = True) -> dict:
+        return dict(
             host=os.getenv("REDIS_HOST", "localhost"),
             username=os.getenv("REDIS_USERNAME", ""),
             password=os.getenv("REDIS_PASSWORD", ""),
             port=int(os.getenv("REDIS_PORT", 6379)),
             db=int(os.getenv("REDIS_DB", 0)),
-            decode_responses=True
+            max_connections=self.redis_max_connections,
+            decode_responses=decode_responses,
         )
 
+    def get_database_url(self):
+        """Retorna a URL do banco de acordo com o ambiente."""
+        if self.environment == "development":
+            return self.connect_to_postgresql_dev()
+        return self.connect_to_postgresql()
+
+    def get_async_database_url(self):
+        """URL do banco para o driver assíncrono (asyncpg)."""
+        return self.get_database_url().replace("postgresql://", "postgresql+asyncpg://", 1)
+
     def connect_to_postgresql(self):
         # Montar a URL de conexão corretamente
         db_url = f"postgresql://{self.db_user}:{self.db_password}@{self.db_host}:{self.db_port}/{self.db_name}"
@@ -1,9 +1,22 @@
 # app/database/__init__.py
 
-from .connection import get_session
-from .populate import populate_database
+import logging
+from .connection import get_engine, get_session, session_scope
+from .populate import is_database_seeded, populate_database
 
-def init_db():
-    """Inicializa o banco de dados e popula com dados iniciais."""
-    session = get_session()
-    populate_database(session)
+def migrate_db(revision: str = "head"):
+    """Aplica as migrações do Alembic até a revisão informada."""
+    from alembic import command
+    from alembic.config import Config
+
+    command.upgrade(Config("alembic.ini"), revision)
+
+def seed_db(force: bool = False) -> bool:
+    """Popula o banco com os dados iniciais. Retorna False se já estava populado."""
+    with session_scope("seed_db") as session:
+        if not force and is_database_seeded(session):
+            logging.info("SISTEMA >>> Banco de dados já populado, nada a fazer.")
+            return False
+        populate_database(session)
+    logging.info("SISTEMA >>> Banco de dados populado com sucesso.")
+    return True
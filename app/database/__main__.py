@@ -0,0 +1,30 @@
+# app/database/__main__.py
+#
+# Gerenciamento do banco fora do startup da aplicação:
+#   python -m app.database migrate        # alembic upgrade head
+#   python -m app.database seed [--force] # dados iniciais (empresa, admins, planos, créditos)
+
+import argparse
+
+from app.database import migrate_db, seed_db
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m app.database", description="Gerenciamento do banco de dados")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrate = commands.add_parser("migrate", help="Aplica as migrações do Alembic")
+    migrate.add_argument("revision", nargs="?", default="head")
+
+    seed = commands.add_parser("seed", help="Popula o banco com os dados iniciais")
+    seed.add_argument("--force", action="store_true", help="Executa o seed mesmo se o banco já estiver populado")
+
+    args = parser.parse_args()
+    if args.command == "migrate":
+        migrate_db(args.revision)
+    elif args.command == "seed":
+        seed_db(force=args.force)
+
+
+if __name__ == "__main__":
+    main()
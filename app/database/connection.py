@@ -1,29 +1,373 @@
 # app/database/connection.py
 
 import logging
-from sqlmodel import create_engine, SQLModel, Session
+import threading
+import time
+from contextlib import contextmanager
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+from fastapi import Request
+from sqlalchemy import Engine, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlmodel import create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.configuration.settings import Configuration
 
 # Configuração global já carregada
 configuration = Configuration()
 
-def get_session():
-    """Cria e retorna a sessão para interação com o banco de dados."""
+
+class PoolStats:
+    """Contadores do pool de conexões (tempo de espera no checkout)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record_wait(self, elapsed: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += elapsed
+            self.max_wait = max(self.max_wait, elapsed)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            avg_wait = self.total_wait / self.checkouts if self.checkouts else 0.0
+            return {
+                "checkouts_total": self.checkouts,
+                "wait_avg_ms": round(avg_wait * 1000, 3),
+                "wait_max_ms": round(self.max_wait * 1000, 3),
+            }
+
+
+pool_stats = PoolStats()
+async_pool_stats = PoolStats()
+replica_pool_stats = PoolStats()
+
+
+class _InstrumentedPoolMixin:
+    """Mede quanto tempo cada checkout esperou por uma conexão."""
+
+    stats: PoolStats
+
+    def connect(self):
+        start = time.perf_counter()
+        connection = super().connect()
+        self.stats.record_wait(time.perf_counter() - start)
+        return connection
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    stats = pool_stats
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    stats = async_pool_stats
+
+
+class InstrumentedReplicaQueuePool(_InstrumentedPoolMixin, QueuePool):
+    stats = replica_pool_stats
+
+
+def _pool_options() -> dict:
+    return {
+        "pool_size": configuration.db_pool_size,
+        "max_overflow": configuration.db_max_overflow,
+        "pool_timeout": configuration.db_pool_timeout,
+        "pool_recycle": configuration.db_pool_recycle,
+        "pool_pre_ping": configuration.db_pool_pre_ping,
+    }
+
+
+def _describe_pool(pool, stats: PoolStats) -> dict:
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "max_overflow": configuration.db_max_overflow,
+        **stats.snapshot(),
+    }
+
+
+_engine: Optional[Engine] = None
+_async_engine: Optional[AsyncEngine] = None
+_replica_engine: Optional[Engine] = None
+_engine_lock = threading.Lock()
+SessionLocal = sessionmaker(class_=Session)
+ReplicaSessionLocal = sessionmaker(class_=Session)
+AsyncSessionLocal = async_sessionmaker(class_=AsyncSession, expire_on_commit=False)
+
+
+def get_engine() -> Engine:
+    """Retorna o engine do processo, criado uma única vez com pool configurado."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_engine(
+                    configuration.get_database_url(),
+                    echo=False,
+                    poolclass=InstrumentedQueuePool,
+                    **_pool_options(),
+                )
+                SessionLocal.configure(bind=_engine)
+                logging.info(
+                    f"BANCO DE DADOS >>> Engine criado (pool_size={configuration.db_pool_size}, "
+                    f"max_overflow={configuration.db_max_overflow})"
+                )
+    return _engine
+
+
+def get_async_engine() -> AsyncEngine:
+    """Retorna o engine assíncrono (asyncpg) do processo, usado no fluxo do chat."""
+    global _async_engine
+    if _async_engine is None:
+        with _engine_lock:
+            if _async_engine is None:
+                _async_engine = create_async_engine(
+                    configuration.get_async_database_url(),
+                    echo=False,
+                    poolclass=InstrumentedAsyncQueuePool,
+                    **_pool_options(),
+                )
+                AsyncSessionLocal.configure(bind=_async_engine)
+                logging.info("BANCO DE DADOS >>> Engine assíncrono criado")
+    return _async_engine
+
+
+def get_replica_engine() -> Optional[Engine]:
+    """Retorna o engine da réplica de leitura, ou None se DB_REPLICA_URL não estiver definida."""
+    global _replica_engine
+    if _replica_engine is None and configuration.db_replica_url:
+        with _engine_lock:
+            if _replica_engine is None:
+                _replica_engine = create_engine(
+                    configuration.db_replica_url,
+                    echo=False,
+                    poolclass=InstrumentedReplicaQueuePool,
+                    **_pool_options(),
+                )
+                ReplicaSessionLocal.configure(bind=_replica_engine)
+                logging.info("BANCO DE DADOS >>> Engine da réplica de leitura criado")
+    return _replica_engine
+
+
+class ReplicaHealth:
+    """Decide se a réplica pode atender leituras, com base no atraso de replicação.
+
+    O atraso é medido no máximo uma vez a cada `check_interval` segundos; se a
+    réplica estiver atrasada além de `max_lag` ou inacessível, as leituras vão
+    para o primário até a próxima verificação.
+    """
+
+    LAG_QUERY = text(
+        "SELECT CASE WHEN NOT pg_is_in_recovery() "
+        "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+        "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+    )
+
+    def __init__(self, max_lag: float, check_interval: float):
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._checked_at = float("-inf")
+        self.healthy = False
+        self.lag: Optional[float] = None
+        self.fallbacks = 0
+
+    def is_usable(self, engine: Engine) -> bool:
+        with self._lock:
+            if time.monotonic() - self._checked_at >= self.check_interval:
+                self._checked_at = time.monotonic()
+                self._check(engine)
+            if not self.healthy:
+                self.fallbacks += 1
+            return self.healthy
+
+    def _check(self, engine: Engine) -> None:
+        try:
+            with engine.connect() as connection:
+                self.lag = float(connection.execute(self.LAG_QUERY).scalar() or 0)
+            self.healthy = self.lag <= self.max_lag
+            if not self.healthy:
+                logging.warning(f"BANCO DE DADOS >>> Réplica atrasada {self.lag:.1f}s, leituras no primário")
+        except Exception as e:
+            self.lag = None
+            self.healthy = False
+            logging.warning(f"BANCO DE DADOS >>> Réplica indisponível, leituras no primário: {e}")
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"healthy": self.healthy, "lag_s": self.lag, "fallbacks_to_primary": self.fallbacks}
+
+
+replica_health = ReplicaHealth(configuration.db_replica_max_lag, configuration.db_replica_lag_check_interval)
+
+
+def dialect_insert(session, table):
+    """INSERT com suporte a ON CONFLICT do dialeto da sessão (Postgres em produção, SQLite nos testes)."""
+    dialect = postgresql if session.bind.dialect.name == "postgresql" else sqlite
+    return dialect.insert(table)
+
+
+def get_pool_status() -> dict:
+    """Retorna o estado atual dos pools de conexões."""
+    status = {
+        **_describe_pool(get_engine().pool, pool_stats),
+        **session_tracker.snapshot(),
+    }
+    if _async_engine is not None:
+        status["async"] = _describe_pool(_async_engine.sync_engine.pool, async_pool_stats)
+    if _replica_engine is not None:
+        status["replica"] = {
+            **_describe_pool(_replica_engine.pool, replica_pool_stats),
+            **replica_health.snapshot(),
+        }
+    return status
+
+
+class SessionTracker:
+    """Rastreia sessões abertas para detectar retenção longa e vazamentos."""
+
+    def __init__(self, hold_threshold: float):
+        self.hold_threshold = hold_threshold
+        self._lock = threading.Lock()
+        self._open: Dict[int, Tuple[str, float]] = {}
+        self.long_held = 0
+        self.leaked = 0
+
+    def opened(self, session: Session, route: str) -> None:
+        with self._lock:
+            self._open[id(session)] = (route, time.perf_counter())
+
+    def closed(self, session: Session) -> None:
+        with self._lock:
+            entry = self._open.pop(id(session), None)
+        if not entry:
+            return
+        route, started = entry
+        elapsed = time.perf_counter() - started
+        if elapsed > self.hold_threshold:
+            with self._lock:
+                self.long_held += 1
+            logging.warning(f"BANCO DE DADOS >>> Sessão retida por {elapsed:.2f}s na rota {route}")
+
+    def check_leaks(self, sessions: List[Session], route: str) -> int:
+        """Sinaliza sessões da requisição que continuam abertas após a resposta."""
+        with self._lock:
+            leaked = [s for s in sessions if id(s) in self._open]
+            self.leaked += len(leaked)
+        for _ in leaked:
+            logging.error(f"BANCO DE DADOS >>> Sessão vazada após o fim da requisição na rota {route}")
+        return len(leaked)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            now = time.perf_counter()
+            oldest = max((now - started for _, started in self._open.values()), default=0.0)
+            return {
+                "sessions_open": len(self._open),
+                "sessions_oldest_s": round(oldest, 3),
+                "sessions_long_held": self.long_held,
+                "sessions_leaked": self.leaked,
+            }
+
+
+session_tracker = SessionTracker(configuration.db_session_hold_warning)
+
+
+def get_route_name(request: Request) -> str:
+    """Nome legível da rota (endpoint) atendida pela requisição."""
+    endpoint = request.scope.get("endpoint")
+    name = getattr(endpoint, "__qualname__", None)
+    return f"{request.method} {name or request.url.path}"
+
+
+@contextmanager
+def session_scope(route: str = "background") -> Iterator[Session]:
+    """Sessão fora do ciclo de requisição; sempre fechada ao sair do bloco."""
+    get_engine()
+    session = SessionLocal()
+    session_tracker.opened(session, route)
     try:
-        if configuration.environment == "development":
-            db_url = configuration.connect_to_postgresql_dev()
+        yield session
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+        session_tracker.closed(session)
+
+
+def _track_request_session(request: Request, session) -> None:
+    session_tracker.opened(session, get_route_name(request))
+    # Registra a sessão no estado da requisição para a checagem de vazamento no middleware
+    if not hasattr(request.state, "db_sessions"):
+        request.state.db_sessions = []
+    request.state.db_sessions.append(session)
+
+
+def _yield_session(request: Request, readonly: bool) -> Iterator[Session]:
+    try:
+        get_engine()
+        replica = get_replica_engine() if readonly else None
+        if replica is not None and replica_health.is_usable(replica):
+            session = ReplicaSessionLocal()
         else:
-            db_url = configuration.connect_to_postgresql()
-            
-        # Criação do engine para a conexão com o banco de dados
-        engine = create_engine(db_url, echo=False)
+            session = SessionLocal()
+    except Exception as e:
+        logging.error(f"Erro ao conectar ao banco de dados: {e}")
+        raise
+
+    _track_request_session(request, session)
+    try:
+        yield session
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+        session_tracker.closed(session)
+
+
+def get_session(request: Request) -> Iterator[Session]:
+    """Cria a sessão da requisição (primário) e garante rollback/fechamento ao final."""
+    yield from _yield_session(request, readonly=False)
 
-        # Criando as tabelas no banco de dados (caso não existam)
-        SQLModel.metadata.create_all(bind=engine)
 
-        # Criação da sessão
-        session = Session(engine)
-        return session
+def get_readonly_session(request: Request) -> Iterator[Session]:
+    """Sessão somente leitura: usa a réplica quando configurada e em dia, senão o primário.
+
+    Use apenas em rotas sem escrita e sem leitura logo após uma escrita do mesmo cliente.
+    """
+    yield from _yield_session(request, readonly=True)
+
+
+def get_db(readonly: bool = False):
+    """Escolhe a dependência de sessão: Depends(get_db(readonly=True)) lê da réplica."""
+    return get_readonly_session if readonly else get_session
+
+
+async def get_async_session(request: Request) -> AsyncIterator[AsyncSession]:
+    """Versão assíncrona de get_session, para rotas que não podem bloquear o event loop."""
+    try:
+        get_async_engine()
+        session = AsyncSessionLocal()
     except Exception as e:
         logging.error(f"Erro ao conectar ao banco de dados: {e}")
         raise
+
+    _track_request_session(request, session)
+    try:
+        yield session
+    except Exception:
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
+        session_tracker.closed(session)
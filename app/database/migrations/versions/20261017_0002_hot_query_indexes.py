@@ -0,0 +1,53 @@
+"""hot query indexes
+
+Índices compostos e parciais para os filtros por empresa mais usados
+(chat, agenda, slots, interações, categorias) e para a busca de pagamento
+por transaction_code. No Postgres os índices são criados com CONCURRENTLY,
+fora da transação da migration, para não bloquear escrita nas tabelas.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 10:12:41.208337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+NOT_DELETED = sa.text("deleted_at IS NULL")
+
+INDEXES = [
+    ("ix_tb_interaction_company_id_created_at", "tb_interaction", ["company_id", "created_at"], None),
+    ("ix_tb_interaction_created_at", "tb_interaction", ["created_at"], None),
+    ("ix_tb_chat_company_id_chat_code", "tb_chat", ["company_id", "chat_code"], None),
+    ("ix_tb_chat_company_id_whatsapp_id", "tb_chat", ["company_id", "whatsapp_id"], None),
+    ("ix_tb_schedule_company_id_start", "tb_schedule", ["company_id", "start"], NOT_DELETED),
+    ("ix_tb_schedule_slot_company_id_active", "tb_schedule_slot", ["company_id", "is_active", "schedule_id", "start"], NOT_DELETED),
+    ("ix_tb_category_service_company_id", "tb_category_service", ["company_id"], NOT_DELETED),
+    ("ix_tb_payment_transaction_code", "tb_payment", ["transaction_code"], None),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name, table, columns,
+                postgresql_concurrently=True,
+                postgresql_where=where,
+                sqlite_where=where,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
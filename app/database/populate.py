@@ -4,7 +4,7 @@ from app.models import Company, User
 from app.models.chat.assistant import Assistant
 from app.models.credit.credit import Credit
 from app.models.plan.plan import Plan
-from sqlmodel import Session, select
+from sqlmodel import Session, func, select
 import bcrypt
 from app.configuration.settings import Configuration
 from datetime import time, timezone, datetime
@@ -15,6 +15,16 @@ from app.utils.hash_utils import generate_hash
 # Carregar configuração global
 configuration = Configuration()
 
+# Os créditos são o último passo do seed; se todos existem, o seed está completo
+SEED_CREDIT_SLUGS = ["ember-1m", "flare-5m", "wildfire-10m"]
+
+def is_database_seeded(session: Session) -> bool:
+    """Verifica com uma única consulta se os dados iniciais já foram criados."""
+    seeded = session.exec(
+        select(func.count()).select_from(Credit).where(Credit.slug.in_(SEED_CREDIT_SLUGS))
+    ).one()
+    return seeded == len(SEED_CREDIT_SLUGS)
+
 def populate_database(session: Session):
     """Inicializa o banco de dados e popula com dados iniciais."""
     populate_company(session)
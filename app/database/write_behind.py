@@ -0,0 +1,338 @@
+# app/database/write_behind.py
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Callable, Dict, Optional, Set, Tuple
+from uuid import uuid4
+
+from sqlalchemy import case, cast, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.configuration.settings import Configuration
+from app.database.connection import AsyncSessionLocal, dialect_insert, get_async_engine
+from app.enums.chat import ChatSentiment
+from app.models.chat.interaction import Interaction
+from app.models.chat.sentiment import Sentiment
+from app.utils.analytics_utils import SENTIMENT_COLUMNS, record_daily_client, sentiment_moves, upsert_company_daily_stats
+from app.utils.date_utils import to_naive_utc
+from app.utils.token_utils import consume_tokens
+
+configuration = Configuration()
+
+
+@dataclass
+class ChatTurnWrite:
+    """Escritas de um turno de chat, aplicadas no banco depois da resposta.
+
+    O próprio Chat (histórico e contagem) não passa por aqui: é gravado no
+    turno, para o turno seguinte do mesmo chat já o encontrar no banco.
+    """
+    company_id: int
+    chat_id: int
+    at: datetime
+    interaction_fields: dict
+    sentiment: ChatSentiment
+    total_tokens: int
+    daily_increments: Dict[str, int]
+    # Contato identificado no turno; o cliente novo no dia é decidido no flush
+    client_contact: Optional[str] = None
+
+    def __post_init__(self):
+        # As colunas são DateTime sem fuso: tudo que vai para o banco fica em UTC sem tzinfo
+        self.at = to_naive_utc(self.at)
+        for name, value in self.interaction_fields.items():
+            if isinstance(value, datetime):
+                self.interaction_fields[name] = to_naive_utc(value)
+
+
+@dataclass
+class _PendingChat:
+    """Turnos pendentes de um chat, já combinados: campos pelo último turno, contadores somados."""
+    company_id: int
+    chat_id: int
+    first_at: datetime
+    last_at: datetime
+    interaction_fields: dict = field(default_factory=dict)
+    sentiment_counts: Dict[str, int] = field(default_factory=dict)
+
+    def merge(self, newer: "_PendingChat") -> None:
+        self.first_at = min(self.first_at, newer.first_at)
+        self.last_at = max(self.last_at, newer.last_at)
+        self.interaction_fields.update(newer.interaction_fields)
+        for column, count in newer.sentiment_counts.items():
+            self.sentiment_counts[column] = self.sentiment_counts.get(column, 0) + count
+
+
+class _Batch:
+    def __init__(self):
+        self.chats: Dict[int, _PendingChat] = {}
+        self.tokens: Dict[int, Tuple[int, datetime]] = {}
+        self.daily: Dict[Tuple[int, date], Tuple[Dict[str, int], datetime]] = {}
+        self.clients: Set[Tuple[int, date, str]] = set()
+        self.turns = 0
+        self.attempts = 0
+
+    def add(self, write: ChatTurnWrite) -> None:
+        pending = _PendingChat(
+            company_id=write.company_id,
+            chat_id=write.chat_id,
+            first_at=write.at,
+            last_at=write.at,
+            interaction_fields=dict(write.interaction_fields),
+            sentiment_counts={SENTIMENT_COLUMNS.get(write.sentiment, "sentiment_neutral_count"): 1},
+        )
+        self._merge_chat(pending)
+        if write.total_tokens:
+            self._add_tokens(write.company_id, write.total_tokens, write.at)
+        self._add_daily((write.company_id, write.at.date()), write.daily_increments, write.at)
+        if write.client_contact:
+            self.clients.add((write.company_id, write.at.date(), write.client_contact))
+        self.turns += 1
+
+    def merge(self, newer: "_Batch") -> None:
+        """Junta um lote mais novo a este (usado ao devolver um lote que falhou)."""
+        for pending in newer.chats.values():
+            self._merge_chat(pending)
+        for company_id, (tokens, at) in newer.tokens.items():
+            self._add_tokens(company_id, tokens, at)
+        for key, (increments, at) in newer.daily.items():
+            self._add_daily(key, increments, at)
+        self.clients |= newer.clients
+        self.turns += newer.turns
+
+    def _merge_chat(self, pending: _PendingChat) -> None:
+        current = self.chats.get(pending.chat_id)
+        if current is None:
+            self.chats[pending.chat_id] = pending
+        else:
+            current.merge(pending)
+
+    def _add_tokens(self, company_id: int, tokens: int, at: datetime) -> None:
+        total, _ = self.tokens.get(company_id, (0, at))
+        self.tokens[company_id] = (total + tokens, at)
+
+    def _add_daily(self, key: Tuple[int, date], increments: Dict[str, int], at: datetime) -> None:
+        totals, _ = self.daily.get(key, ({}, at))
+        for name, value in increments.items():
+            totals[name] = totals.get(name, 0) + value
+        self.daily[key] = (totals, at)
+
+
+def _predominant_sentiment(counts: Dict[str, int]) -> ChatSentiment:
+    # Empate favorece positivo, depois negativo (mesma ordem do agregado original)
+    positive = counts.get("sentiment_positive_count", 0)
+    negative = counts.get("sentiment_negative_count", 0)
+    neutral = counts.get("sentiment_neutral_count", 0)
+    if positive >= negative and positive >= neutral:
+        return ChatSentiment.POSITIVE
+    if negative >= neutral:
+        return ChatSentiment.NEGATIVE
+    return ChatSentiment.NEUTRAL
+
+
+class WriteBehindQueue:
+    """Fila em processo que grava os turnos de chat fora do caminho da resposta.
+
+    Os turnos são combinados por chat e gravados em uma única transação a cada
+    `flush_interval` segundos ou quando `max_batch` turnos se acumulam. Contadores
+    (sentimento, tokens, consolidado diário) são aplicados como incrementos no
+    banco, então turnos do mesmo chat em lotes diferentes não se sobrescrevem.
+    Um lote que falha volta para a fila e é descartado após `max_retries` tentativas.
+    """
+
+    def __init__(self, flush_interval: float, max_batch: int, max_retries: int):
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_retries = max_retries
+        # Fábrica de sessões do flush; None usa o engine assíncrono do processo
+        self.session_factory: Optional[Callable[[], AsyncSession]] = None
+        self._batch = _Batch()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.flushed_batches = 0
+        self.flushed_turns = 0
+        self.failures = 0
+        self.dropped_turns = 0
+
+    def submit(self, write: ChatTurnWrite) -> None:
+        """Enfileira um turno; não bloqueia nem acessa o banco."""
+        self._batch.add(write)
+        self._bind_loop()
+        if self._task is None or self._task.done():
+            self._stopping = False
+            self._task = self._loop.create_task(self._run())
+        if self._batch.turns >= self.max_batch:
+            self._wakeup.set()
+
+    async def flush(self) -> int:
+        """Grava o lote pendente; retorna quantos turnos foram persistidos."""
+        self._bind_loop()
+        async with self._lock:
+            batch, self._batch = self._batch, _Batch()
+            if not batch.turns:
+                return 0
+            try:
+                async with self._session() as session:
+                    await self._apply(session, batch)
+                    await session.commit()
+            except Exception as e:
+                self.failures += 1
+                batch.attempts += 1
+                if batch.attempts >= self.max_retries:
+                    self.dropped_turns += batch.turns
+                    logging.error(f"BANCO DE DADOS >>> Write-behind descartou {batch.turns} turnos após {batch.attempts} falhas: {e}")
+                else:
+                    logging.warning(f"BANCO DE DADOS >>> Falha no write-behind, {batch.turns} turnos voltam para a fila: {e}")
+                    batch.merge(self._batch)
+                    self._batch = batch
+                return 0
+
+            self.flushed_batches += 1
+            self.flushed_turns += batch.turns
+            return batch.turns
+
+    async def stop(self) -> None:
+        """Encerra o flusher e drena tudo o que estiver pendente (shutdown)."""
+        if self._task is not None and not self._task.done() and self._task.get_loop() is asyncio.get_running_loop():
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+        self._task = None
+        while self._batch.turns:
+            await self.flush()
+        logging.info(f"BANCO DE DADOS >>> Write-behind drenado ({self.flushed_turns} turnos gravados)")
+
+    def snapshot(self) -> dict:
+        return {
+            "pending_turns": self._batch.turns,
+            "pending_chats": len(self._batch.chats),
+            "flushed_batches": self.flushed_batches,
+            "flushed_turns": self.flushed_turns,
+            "failures": self.failures,
+            "dropped_turns": self.dropped_turns,
+        }
+
+    def _bind_loop(self) -> None:
+        # Lock e Event pertencem ao loop; recria se o loop mudou (ex.: testes)
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._lock = asyncio.Lock()
+            self._wakeup = asyncio.Event()
+            self._task = None
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def _session(self) -> AsyncSession:
+        if self.session_factory is not None:
+            return self.session_factory()
+        get_async_engine()
+        return AsyncSessionLocal()
+
+    async def _apply(self, session: AsyncSession, batch: _Batch) -> None:
+        new_interactions: Dict[Tuple[int, date], int] = {}
+        # Sentimento por conversa, no dia em que ela começou: a mudança do sentimento final do chat
+        sentiments: Dict[Tuple[int, date], Dict[str, int]] = {}
+        for pending in batch.chats.values():
+            created, started_at = await self._write_interaction(session, pending)
+            key = (pending.company_id, started_at.date())
+            if created:
+                new_interactions[key] = new_interactions.get(key, 0) + 1
+            previous, current = await self._write_sentiment(session, pending)
+            for column, value in sentiment_moves(previous, current).items():
+                moves = sentiments.setdefault(key, {})
+                moves[column] = moves.get(column, 0) + value
+
+        for company_id, (tokens, at) in batch.tokens.items():
+            await consume_tokens(session, company_id, tokens, at)
+
+        new_clients: Dict[Tuple[int, date], int] = {}
+        for company_id, day, client_contact in sorted(batch.clients):
+            if await record_daily_client(session, company_id, day, client_contact):
+                new_clients[(company_id, day)] = new_clients.get((company_id, day), 0) + 1
+
+        for (company_id, day), (increments, at) in batch.daily.items():
+            increments = {
+                **increments,
+                **sentiments.pop((company_id, day), {}),
+                "interactions": new_interactions.get((company_id, day), 0),
+                "unique_clients": new_clients.get((company_id, day), 0),
+            }
+            await upsert_company_daily_stats(session, company_id, day=day, at=at, increments=increments)
+        # Conversas de dias anteriores que mudaram de sentimento
+        for (company_id, day), moves in sentiments.items():
+            if moves:
+                await upsert_company_daily_stats(session, company_id, day=day, at=None, increments=moves)
+
+    async def _write_interaction(self, session: AsyncSession, pending: _PendingChat) -> Tuple[bool, datetime]:
+        """Cria ou atualiza a Interaction do chat; retorna (criada agora, início da conversa)."""
+        table = Interaction.__table__
+        created = (await session.exec(
+            dialect_insert(session, table)
+            .values(company_id=pending.company_id, chat_id=pending.chat_id, created_at=pending.first_at, **pending.interaction_fields)
+            .on_conflict_do_nothing(index_elements=[table.c.chat_id])
+            .returning(table.c.id)
+        )).first()
+        if created is not None:
+            return True, pending.first_at
+
+        started_at = (await session.exec(
+            update(Interaction)
+            .where(Interaction.chat_id == pending.chat_id)
+            .values(**pending.interaction_fields)
+            .returning(Interaction.created_at)
+            .execution_options(synchronize_session=False)
+        )).first()
+        return False, to_naive_utc(started_at[0]) if started_at and started_at[0] else pending.first_at
+
+    async def _write_sentiment(self, session: AsyncSession, pending: _PendingChat) -> Tuple[Optional[ChatSentiment], ChatSentiment]:
+        """Soma os sentimentos do lote no Sentiment do chat; retorna o sentimento final (anterior, atual)."""
+        table = Sentiment.__table__
+        counts = {column: pending.sentiment_counts.get(column, 0) for column in SENTIMENT_COLUMNS.values()}
+        statement = dialect_insert(session, table).values(
+            id=str(uuid4()),
+            chat_id=pending.chat_id,
+            final_sentiment=_predominant_sentiment(counts),
+            updated_at=pending.last_at,
+            **counts,
+        )
+        totals = {column: table.c[column] + statement.excluded[column] for column in counts}
+        positive = totals["sentiment_positive_count"]
+        negative = totals["sentiment_negative_count"]
+        neutral = totals["sentiment_neutral_count"]
+        final_sentiment = case(
+            ((positive >= negative) & (positive >= neutral), ChatSentiment.POSITIVE.value),
+            (negative >= neutral, ChatSentiment.NEGATIVE.value),
+            else_=ChatSentiment.NEUTRAL.value,
+        )
+        row = (await session.exec(statement.on_conflict_do_update(
+            index_elements=[table.c.chat_id],
+            set_={
+                **totals,
+                "final_sentiment": cast(final_sentiment, table.c.final_sentiment.type),
+                "updated_at": statement.excluded.updated_at,
+            },
+        ).returning(*(table.c[column] for column in counts)))).one()
+        # Contagens de antes deste lote = totais gravados - o que o lote somou (sem ler a linha antes)
+        current = dict(zip(counts, row))
+        previous = {column: current[column] - counts[column] for column in counts}
+        return (_predominant_sentiment(previous) if any(previous.values()) else None), _predominant_sentiment(current)
+
+
+write_behind = WriteBehindQueue(
+    flush_interval=configuration.write_behind_flush_ms / 1000,
+    max_batch=configuration.write_behind_max_batch,
+    max_retries=configuration.write_behind_max_retries,
+)
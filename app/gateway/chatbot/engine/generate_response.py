@@ -1,44 +1,90 @@
 from datetime import datetime, timezone
 import logging
+from typing import Any, AsyncIterator, Dict
 from app.enums.chat import ChatSentiment
-from app.gateway.chatbot.providers.chatbot_provider_factory import get_ia_provider
+from app.gateway.chatbot.handlers.handlers import unwrap_fallback
+from app.gateway.chatbot.providers.chatbot_provider_factory import provider_registry
 from app.configuration.settings import Configuration
 
 Configuration()
 
 async def generate_response(context: dict) -> dict:
     try:
-        ia_response = await get_ia_provider().generate_response(context)
-        useful_context = ia_response.get("useful_context", {})
-        history = context.get("history", [])
-        history.append({
-            "user_message": useful_context["user_response"],
-            "ia_response": useful_context["user_message"],
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "intent": useful_context.get("intents", context.get("intents", []))
-        })
-        
-        return {
-            "useful_context": {
-                "user_response": useful_context["user_response"],
-                "user_message": useful_context["user_message"],
-                "system_response": useful_context.get("system_response", {}),
-                "intents": useful_context.get("intents", context.get("intents", [])),
-                "main_intent": useful_context.get("main_intent", context.get("main_intent")),
-                "sentiment": useful_context.get("sentiment", context.get("sentiment", ChatSentiment.NEUTRAL)),
-                "history": history,
-                "token_usage": useful_context.get("token_usage", {}),
-                "timestamp": datetime.now(timezone.utc).isoformat()
-            },
-            "status": 200
-        }
+        # Provedor e modelo do assistente da empresa (instâncias criadas uma vez no registro)
+        provider, model = provider_registry.resolve(context.get("data", {}).get("assistant"))
+        ia_response = await provider.generate_response(context, model=model)
+        return build_turn_response(context, ia_response)
     except Exception as e:
         logging.error(f"Erro ao processar resposta: {str(e)}")
-        return {
-            "useful_context": {
-                "user_response": "Houve um problema. Pode repetir?",
-                "system_response": {"function": "no_action"},
-                "timestamp": datetime.now(timezone.utc).isoformat()
-            },
-            "status": 200 
-        }
\ No newline at end of file
+        return error_response()
+
+
+async def stream_response(context: dict) -> AsyncIterator[Dict[str, Any]]:
+    """Versão em streaming de generate_response.
+
+    Repassa os eventos {"type": "token", "text": ...} do provedor e termina com
+    {"type": "done", "response": ...}, onde `response` tem o mesmo formato de
+    generate_response.
+    """
+    try:
+        provider, model = provider_registry.resolve(context.get("data", {}).get("assistant"))
+        async for event in provider.stream_response(context, model=model):
+            if event["type"] == "done":
+                yield {"type": "done", "response": build_turn_response(context, event["response"])}
+                return
+            yield event
+        raise ValueError("Streaming da IA terminou sem a resposta final")
+    except Exception as e:
+        logging.error(f"Erro ao processar resposta em streaming: {str(e)}")
+        yield {"type": "done", "response": error_response()}
+
+
+async def stream_generated(response_data: dict) -> AsyncIterator[Dict[str, Any]]:
+    """Eventos de streaming para uma resposta já pronta (cache ou gerador sem streaming)."""
+    useful_context = response_data.get("useful_context", {})
+    yield {"type": "token", "text": useful_context.get("user_response", "")}
+    yield {"type": "done", "response": response_data}
+
+
+def build_turn_response(context: dict, ia_response: dict) -> dict:
+    # Fallback do provedor (erro, circuito aberto): responde a mensagem dele e mantém o status de erro
+    ia_response = unwrap_fallback(ia_response) or ia_response
+    useful_context = ia_response.get("useful_context", {})
+    token_usage = useful_context.get("token_usage")
+    history = context.get("history", [])
+    history.append({
+        "user_message": useful_context["user_response"],
+        "ia_response": useful_context.get("user_message", context.get("user_message")),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "intent": useful_context.get("intents", context.get("intents", []))
+    })
+    
+    turn_response = {
+        "useful_context": {
+            "user_response": useful_context["user_response"],
+            "user_message": useful_context.get("user_message", context.get("user_message")),
+            "system_response": useful_context.get("system_response", {}),
+            "intents": useful_context.get("intents", context.get("intents", [])),
+            "main_intent": useful_context.get("main_intent", context.get("main_intent")),
+            "sentiment": useful_context.get("sentiment", context.get("sentiment", ChatSentiment.NEUTRAL)),
+            "history": history,
+            "token_usage": token_usage if isinstance(token_usage, dict) else {},
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        },
+        "status": ia_response.get("status", 200)
+    }
+    metadata = useful_context.get("metadata") or {}
+    if metadata.get("function") == "handle_fallback":
+        turn_response["useful_context"]["metadata"] = metadata
+    return turn_response
+
+
+def error_response() -> dict:
+    return {
+        "useful_context": {
+            "user_response": "Houve um problema. Pode repetir?",
+            "system_response": {"function": "no_action"},
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        },
+        "status": 200 
+    }
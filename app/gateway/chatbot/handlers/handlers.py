@@ -33,6 +33,14 @@ async def call_fallback(
     logging.debug(f"DEEPSEEK >>> Resposta do fallback: {json.dumps(fallback_response, indent=2)}")
     return {"useful_context": fallback_response}
 
+def unwrap_fallback(response: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Resposta do handle_fallback dentro do retorno de call_fallback; None se `response` não for um fallback"""
+    fallback = (response or {}).get("useful_context")
+    if not isinstance(fallback, dict) or not isinstance(fallback.get("useful_context"), dict):
+        return None
+    metadata = fallback["useful_context"].get("metadata") or {}
+    return fallback if metadata.get("function") == "handle_fallback" else None
+
 def determine_error_reason(error: Optional[Exception], reason: Optional[str]) -> str:
     """Classifica o tipo de erro ocorrido"""
     if reason:
@@ -1,5 +1,6 @@
-from typing import Dict, Any
+from typing import Any, Dict, Mapping, Optional, Tuple
 from app.enums.chat import ChatIntent
+from app.utils.frozen_utils import FrozenDict, FrozenList
 
 class ContextClassifier:
     """Filtra o contexto removendo dados desnecessários com base na intenção principal."""
@@ -26,7 +27,7 @@ class ContextClassifier:
     # Campos essenciais
     ESSENTIAL_COMPANY_KEYS = ["name", "is_open", "chatbot_status", "address", "open_work", "work_days", "social_media"]
 
-    ESSENTIAL_ASSISTANT_KEYS = ["name", "status", "type"]
+    ESSENTIAL_ASSISTANT_KEYS = ["name", "status", "type", "model"]
     
     # Campos mínimos para serviços
     SERVICE_KEYS = ["id", "name", "description", "price", "duration"]
@@ -42,101 +43,132 @@ class ContextClassifier:
         "public_id", "start", "end", "all_day", "is_active", "is_recurring"
     ]
 
+    # Grupos de intenção com projeção pré-calculada (ver project)
+    BASIC = "basic"
+    SERVICES = "services"
+    SCHEDULE_INFO = "schedule_info"
+    SCHEDULE_SLOTS = "schedule_slots"
+
+    # Conjuntos de dados do chat carregados por grupo (None = todos)
+    DATASETS = ("company", "assistant", "services", "schedule", "schedule_slots")
+    GROUP_DATASETS = {
+        BASIC: ("company", "assistant"),
+        SERVICES: ("company", "assistant", "services"),
+        SCHEDULE_INFO: ("company", "assistant", "schedule"),
+        SCHEDULE_SLOTS: ("company", "assistant", "schedule_slots"),
+    }
+
+    @classmethod
+    def datasets_for(cls, main_intent: Any) -> Tuple[str, ...]:
+        """Conjuntos de dados que sobrevivem ao filtro da intenção (os demais nem precisam ser carregados)."""
+        return cls.GROUP_DATASETS.get(cls.intent_group(main_intent), cls.DATASETS)
+
+    @classmethod
+    def intent_group(cls, main_intent: Any) -> Optional[str]:
+        """Grupo de projeção da intenção; None mantém os dados completos."""
+        if main_intent in cls.BASIC_ONLY:
+            return cls.BASIC
+        if main_intent in cls.NEED_SERVICES:
+            return cls.SERVICES
+        if main_intent in cls.NEED_SCHEDULE_INFO:
+            return cls.SCHEDULE_INFO
+        if main_intent in cls.NEED_SCHEDULE_SLOTS:
+            return cls.SCHEDULE_SLOTS
+        return None
+
     @classmethod
-    def filter_context(cls, context: Dict[str, Any]) -> Dict[str, Any]:
-        """Filtra o contexto com base na intenção principal."""
+    def filter_context(cls, context: Dict[str, Any], projections: Optional[Mapping[str, Mapping[str, Any]]] = None) -> Dict[str, Any]:
+        """Filtra o contexto com base na intenção principal.
+
+        Com as projeções do snapshot da empresa (CompanySnapshot.projections) é
+        só uma consulta por grupo; sem elas, as projeções são montadas a partir
+        de context["data"]. Em nenhum caso os dados recebidos são alterados.
+        """
         if not context:
             return context
-            
-        main_intent = context.get("main_intent")
-        data = context.get("data", {})
-        
-        if main_intent in cls.BASIC_ONLY:
-            cls._handle_basic_intent(data, context)
-        elif main_intent in cls.NEED_SERVICES:
-            cls._handle_services_intent(data, context)
-        elif main_intent in cls.NEED_SCHEDULE_INFO:
-            cls._handle_schedule_info_intent(data)
-        elif main_intent in cls.NEED_SCHEDULE_SLOTS:
-            cls._handle_schedule_slot_intent(data)
-        
+
+        group = cls.intent_group(context.get("main_intent"))
+        if group is None:
+            return context
+
+        projection = projections[group] if projections is not None else cls.project(context.get("data", {}))[group]
+        # Cópia rasa do nível de cima: os providers completam campos ausentes em data
+        context["data"] = dict(projection)
+        if group == cls.BASIC:
+            context.pop("profanity_analysis", None)
         return context
 
     @classmethod
-    def _handle_basic_intent(cls, data: Dict[str, Any], context: Dict[str, Any]):
-        """Filtra contexto para intenções básicas."""
-        cls._filter_essential_data(data)
-        data.pop("services", None)
-        data.pop("schedule", None)
-        data.pop("schedule_slots", None)
-        context.pop("profanity_analysis", None)
+    def project(cls, data: Mapping[str, Any]) -> Dict[str, FrozenDict]:
+        """Projeções imutáveis de `data` (company, assistant, services, schedule, schedule_slots) para cada grupo de intenção."""
+        essential = {}
+        if "company" in data:
+            essential["company"] = FrozenDict((k, v) for k, v in data["company"].items() if k in cls.ESSENTIAL_COMPANY_KEYS)
+        if "assistant" in data:
+            essential["assistant"] = FrozenDict((k, v) for k, v in data["assistant"].items() if k in cls.ESSENTIAL_ASSISTANT_KEYS)
 
-    @classmethod
-    def _handle_services_intent(cls, data: Dict[str, Any], context: Dict[str, Any]):
-        """Filtra contexto para intenções relacionadas a serviços."""
-        cls._filter_essential_data(data)
-        
+        services = dict(essential)
         if "services" in data:
-            data["services"] = [
-                {
-                    "category_name": category.get("category_name"),
-                    "services": [
-                        {k: service[k] for k in cls.SERVICE_KEYS if k in service}
-                        for service in category.get("services", [])
-                    ]
-                }
-                for category in data["services"] 
-                if category.get("services")
-            ]
-            
-        data.pop("schedule", None)
-        data.pop("schedule_slots", None)
+            services["services"] = cls._project_services(data["services"])
 
-    @classmethod
-    def _handle_schedule_info_intent(cls, data: Dict[str, Any]):
-        """Filtra contexto para verificar agendamentos existentes."""
-        cls._filter_essential_data(data)
-        
-        # Mantém apenas campos essenciais dos agendamentos
+        schedule_info = dict(essential)
         if "schedule" in data:
-            if isinstance(data["schedule"], list):
-                data["schedule"] = [
-                    {k: s[k] for k in cls.SCHEDULE_KEYS if k in s}
-                    for s in data["schedule"]
-                ]
-            else:
-                data["schedule"] = {k: data["schedule"][k] for k in cls.SCHEDULE_KEYS if k in data["schedule"]}
-        
-        # Remove slots pois não são necessários para verificação
-        data.pop("schedule_slots", None)
+            schedule_info["schedule"] = cls._project_schedule(data["schedule"])
+
+        slots = data.get("schedule_slots")
+        schedule_slots = dict(essential)
+        schedule_slots["schedule_slots"] = FrozenList(
+            FrozenDict((k, slot[k]) for k in cls.SCHEDULE_SLOT_KEYS if k in slot)
+            for slot in slots
+        ) if isinstance(slots, (list, tuple)) else FrozenList()
+
+        return {
+            cls.BASIC: FrozenDict(essential),
+            cls.SERVICES: FrozenDict(services),
+            cls.SCHEDULE_INFO: FrozenDict(schedule_info),
+            cls.SCHEDULE_SLOTS: FrozenDict(schedule_slots),
+        }
 
     @classmethod
-    def _handle_schedule_slot_intent(cls, data: Dict[str, Any]):
-        """Filtra contexto para marcar novos agendamentos."""
-        cls._filter_essential_data(data)
-        
-        # Mantém apenas campos essenciais dos slots
-        if isinstance(data.get("schedule_slots"), list):
-            data["schedule_slots"] = [
-                {k: slot[k] for k in cls.SCHEDULE_SLOT_KEYS if k in slot}
-                for slot in data["schedule_slots"]
-            ]
-        else:
-            data["schedule_slots"] = []
-
-        data.pop("schedule", None)
+    def _project_services(cls, categories) -> FrozenList:
+        """Categorias com serviços, cada serviço reduzido a SERVICE_KEYS."""
+        return FrozenList(
+            FrozenDict({
+                "category_name": category.get("category_name"),
+                "services": FrozenList(
+                    FrozenDict((k, service[k]) for k in cls.SERVICE_KEYS if k in service)
+                    for service in category.get("services", [])
+                ),
+            })
+            for category in categories
+            if category.get("services")
+        )
 
     @classmethod
-    def _filter_essential_data(cls, data: Dict[str, Any]):
-        """Filtra os dados essenciais da empresa e assistente."""
-        if "company" in data:
-            data["company"] = {
-                k: v for k, v in data["company"].items() 
-                if k in cls.ESSENTIAL_COMPANY_KEYS
-            }
-            
-        if "assistant" in data:
-            data["assistant"] = {
-                k: v for k, v in data["assistant"].items() 
-                if k in cls.ESSENTIAL_ASSISTANT_KEYS
-            }
\ No newline at end of file
+    def _project_schedule(cls, schedule) -> Any:
+        """Agendamentos reduzidos a SCHEDULE_KEYS.
+
+        O cache guarda os eventos no formato do calendário ({"events_data": [...]},
+        com id/allDay/extendedProps), que são convertidos para os nomes de SCHEDULE_KEYS.
+        """
+        if isinstance(schedule, Mapping) and "events_data" in schedule:
+            schedule = [cls._calendar_event_fields(event) for event in schedule["events_data"]]
+        if isinstance(schedule, (list, tuple)):
+            return FrozenList(FrozenDict((k, s[k]) for k in cls.SCHEDULE_KEYS if k in s) for s in schedule)
+        return FrozenDict((k, schedule[k]) for k in cls.SCHEDULE_KEYS if k in schedule)
+
+    @staticmethod
+    def _calendar_event_fields(event: Mapping[str, Any]) -> Dict[str, Any]:
+        props = event.get("extendedProps") or {}
+        return {
+            "public_id": event.get("id"),
+            "title": event.get("title"),
+            "start": event.get("start"),
+            "end": event.get("end"),
+            "all_day": event.get("allDay"),
+            "color": event.get("color"),
+            "status": props.get("status"),
+            "description": props.get("description"),
+            "customer_name": props.get("customerName"),
+            "customer_contact": props.get("customerContact"),
+        }
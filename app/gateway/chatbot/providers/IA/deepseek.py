@@ -2,24 +2,84 @@
 from datetime import datetime, timezone
 import json
 import logging
-import requests
-from typing import Dict, Any
+from typing import AsyncIterator, Dict, Any, Optional, Tuple
+
+import httpx
 
 from app.configuration.settings import Configuration
-from app.gateway.chatbot.handlers.handlers import handle_interaction_response, handle_action_response, call_fallback
+from app.gateway.circuit_breaker import CircuitOpenError, circuit_breakers
+from app.gateway.http_client import http_client
+from app.gateway.chatbot.handlers.handlers import handle_interaction_response, handle_action_response, call_fallback, unwrap_fallback
+from app.utils.stream_utils import JsonStringFieldStream
 
 config = Configuration()
 
+# Instruções fixas do prompt, montadas uma vez; só a linha de identidade do assistente muda por turno
+INSTRUCTIONS_HEAD = "\n".join([
+    "INSTRUÇÕES:",
+    "- Responda APENAS com JSON válido (sem markdown, texto fora de {}).",
+])
+
+INSTRUCTIONS_TAIL = "\n".join([
+    "- Use SOMENTE os dados do contexto (company, assistant, services, schedule, schedule_slots). Não invente.",
+    "- Considere detalhes do cliente e mensagens anteriores (history) para coerência.",
+
+    "SERVIÇOS:",
+    "- Dados: services[].category_name, services[].services[].(name, description, price, duration, rating, availability).",
+    "- 1 serviço → system_response.service (objeto).",
+    "- Vários → system_response.services (array).",
+    "- NUNCA mude preço/duração.",
+
+    "AGENDAMENTOS:",
+    "- Copie schedule_slots como system_response.schedule_slots (array).",
+    "- 1 agendamento → system_response.schedule.",
+    "- Vários → system_response.schedules.",
+    "- Nenhum dado → system_response: { 'function': 'no_action' }.",
+
+    "RESPOSTA:",
+    "- Seja clara logo na primeira mensagem.",
+    "- Mostrou serviço/agendamento → inclua 'function': 'show_service', 'schedule_slots' ou 'schedule'.",
+    "- Só mencionou → NÃO inclua 'function'.",
+    "- Nada a fazer → function: 'no_action'.",
+
+    "ERROS:",
+    "- Dados faltando → 'incomplete_data'",
+    "- Erro interno → 'internal_error'",
+    "- Desconhecido → 'unknown_action'",
+    "- Mensagem incompleta → 'incomplete_message'",
+    "- Incompreensível → 'incomprehensible_message'",
+    "- Sem agendamentos → 'no_schedule'",
+    "- Sem horários → 'no_schedule_slots'",
+    "- Humano indisponível → 'human_unavailable'",
+    "- Chatbot indisponível → 'chatbot_unavailable'",
+    "- Limite atingido → 'limit_reached'",
+    "- Abusivo → 'abusive_interaction'",
+
+    "FORMATO:",
+    "- JSON começa com { e termina com }, sem explicações.",
+    "- Ex. serviço único: { 'user_response': '...', 'system_response': { 'function': 'show_service', 'service': {...} } }",
+    "- Ex. múltiplos serviços: { 'user_response': '...', 'system_response': { 'function': 'show_service', 'services': [...] } }",
+    "- Ex. múltiplos agendamentos: { 'user_response': '...', 'system_response': { 'function': 'schedule', 'schedules': [...] } }",
+    "- Ex. horários disponíveis (máx 3): { 'user_response': '...', 'system_response': { 'function': 'schedule_slots', 'schedule_slots': [...] } }",
+])
+
+
 class DeepSeekProvider:
+    """Provedor compatível com a API de chat completions (OpenAI/OpenRouter); as chamadas usam o cliente HTTP compartilhado."""
+
     def __init__(self):
+        self.name = "deepseek"
         self.max_response_length = 1000
         self.api_url = config.deepseek_url
         self.model = config.deepseek_model
         self.api_key = config.deepseek_api_key
+        self.http_client = http_client
+        self.breaker = circuit_breakers.get(self.name)
         
         logging.info(f"IA >>> Inicializado DeepSeek Provider com modelo {self.model}")
 
-    async def generate_response(self, context: Dict[str, Any]) -> Dict[str, Any]:
+    async def generate_response(self, context: Dict[str, Any], model: Optional[str] = None) -> Dict[str, Any]:
+        """Gera a resposta do turno; `model` troca o modelo só nesta chamada (escolha por assistente)."""
         logging.info("IA >>> Iniciando geração de resposta...")
 
         try:
@@ -31,32 +91,17 @@ class DeepSeekProvider:
             logging.debug(f"Prompt: {json.dumps(prompt, indent=2, ensure_ascii=False)}")
 
             # Chamada ao modelo DeepSeek
-            api_result = self._call_api(prompt)
-            raw_response = api_result["response"]
-            token_usage = api_result.get("usage", {})
-            logging.info(f"IA >>> Resposta Bruta: {raw_response}")
-            logging.info(f"TOKENS USADOS >>> Prompt: {token_usage.get('prompt_tokens', 0)}, Completion: {token_usage.get('completion_tokens', 0)}, Total: {token_usage.get('total_tokens', 0)}")
-
-            # Verifica resposta vazia ou inválida
-            if not raw_response or not raw_response.get('choices'):
+            api_result = await self._call_api(prompt, model)
+            if api_result is None:
                 return await call_fallback(
                     context=context,
-                    error=ValueError("Resposta da IA vazia ou inválida"),
-                    origin="empty_api_response"
+                    error=ValueError("Falha na chamada à API da IA"),
+                    origin="api_call_error"
                 )
+            return await self._complete_response(api_result["response"], api_result.get("usage", {}), context)
 
-            # Processa e formata a resposta
-            formatted = await self._format_response(raw_response, context)
-            logging.info(f"IA >>> Resposta Formatada: {formatted}")
-            
-            # Gera resposta final normalizada
-            formatted["token_usage"] = token_usage
-            final_response = self._send_response(formatted)
-            final_response["token_usage"] = token_usage
-
-            logging.info("IA >>> Resposta gerada com sucesso")
-            return final_response
-
+        except CircuitOpenError as e:
+            return await self._circuit_open_fallback(context, e)
         except Exception as e:
             logging.error(f"Erro ao gerar resposta: {str(e)}", exc_info=True)
             return await call_fallback(
@@ -65,6 +110,80 @@ class DeepSeekProvider:
                 origin="generate_response_error"
             )
             
+    async def stream_response(self, context: Dict[str, Any], model: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Gera a resposta do turno em streaming.
+
+        Emite {"type": "token", "text": ...} com os trechos de `user_response`
+        conforme o modelo os gera e, por último, {"type": "done", "response": ...}
+        com a resposta completa no mesmo formato de generate_response (o
+        system_response só é interpretado com o JSON inteiro).
+        """
+        logging.info("IA >>> Iniciando geração de resposta em streaming...")
+        fields = JsonStringFieldStream("user_response")
+        parts = []
+        token_usage: Dict[str, Any] = {}
+
+        try:
+            context = self._validate_context(context)
+            prompt = self._build_prompt(context)
+
+            async for delta in self._stream_api(prompt, model, token_usage):
+                parts.append(delta)
+                text = fields.feed(delta)
+                if text:
+                    yield {"type": "token", "text": text}
+
+            raw_text = "".join(parts)
+            raw_response = {"choices": [{"message": {"content": raw_text}}]} if raw_text else {}
+            final_response = await self._complete_response(raw_response, token_usage, context)
+
+        except CircuitOpenError as e:
+            final_response = await self._circuit_open_fallback(context, e)
+        except Exception as e:
+            logging.error(f"Erro ao gerar resposta em streaming: {str(e)}", exc_info=True)
+            final_response = await call_fallback(
+                context=context,
+                error=e,
+                origin="stream_response_error"
+            )
+
+        yield {"type": "done", "response": final_response}
+
+    async def _circuit_open_fallback(self, context: Dict[str, Any], error: CircuitOpenError) -> Dict[str, Any]:
+        """Provedor fora do ar: resposta padrão na hora, sem esperar o timeout."""
+        logging.warning(f"IA >>> {error}; respondendo com o fallback")
+        return await call_fallback(
+            context=context,
+            error=error,
+            reason="chatbot_unavailable",
+            origin="circuit_open"
+        )
+
+    async def _complete_response(self, raw_response: Any, token_usage: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+        """Interpreta a resposta bruta da IA e monta a resposta final do turno."""
+        logging.info(f"IA >>> Resposta Bruta: {raw_response}")
+        logging.info(f"TOKENS USADOS >>> Prompt: {token_usage.get('prompt_tokens', 0)}, Completion: {token_usage.get('completion_tokens', 0)}, Total: {token_usage.get('total_tokens', 0)}")
+
+        # Verifica resposta vazia ou inválida
+        if not raw_response or not raw_response.get('choices'):
+            return await call_fallback(
+                context=context,
+                error=ValueError("Resposta da IA vazia ou inválida"),
+                origin="empty_api_response"
+            )
+
+        # Processa e formata a resposta
+        formatted = await self._format_response(raw_response, context)
+        logging.info(f"IA >>> Resposta Formatada: {formatted}")
+        
+        # Gera resposta final normalizada
+        formatted["token_usage"] = token_usage
+        final_response = self._send_response(formatted)
+        final_response["token_usage"] = token_usage
+
+        logging.info("IA >>> Resposta gerada com sucesso")
+        return final_response
+
     def _validate_context(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Valida os campos essenciais, mas permite que alguns sejam opcionais"""
 
@@ -104,51 +223,9 @@ class DeepSeekProvider:
             "schedule_slots": context["data"]["schedule_slots"],
         }
 
-        instructions = "\n".join([
-            "INSTRUÇÕES:",
-            "- Responda APENAS com JSON válido (sem markdown, texto fora de {}).",
-            f"- Você é {context['data']['assistant']['name']} ({context['data']['assistant']['type']}) da empresa {context['data']['company']['name']}.",
-            "- Use SOMENTE os dados do contexto (company, assistant, services, schedule, schedule_slots). Não invente.",
-            "- Considere detalhes do cliente e mensagens anteriores (history) para coerência.",
-
-            "SERVIÇOS:",
-            "- Dados: services[].category_name, services[].services[].(name, description, price, duration, rating, availability).",
-            "- 1 serviço → system_response.service (objeto).",
-            "- Vários → system_response.services (array).",
-            "- NUNCA mude preço/duração.",
-
-            "AGENDAMENTOS:",
-            "- Copie schedule_slots como system_response.schedule_slots (array).",
-            "- 1 agendamento → system_response.schedule.",
-            "- Vários → system_response.schedules.",
-            "- Nenhum dado → system_response: { 'function': 'no_action' }.",
-
-            "RESPOSTA:",
-            "- Seja clara logo na primeira mensagem.",
-            "- Mostrou serviço/agendamento → inclua 'function': 'show_service', 'schedule_slots' ou 'schedule'.",
-            "- Só mencionou → NÃO inclua 'function'.",
-            "- Nada a fazer → function: 'no_action'.",
-
-            "ERROS:",
-            "- Dados faltando → 'incomplete_data'",
-            "- Erro interno → 'internal_error'",
-            "- Desconhecido → 'unknown_action'",
-            "- Mensagem incompleta → 'incomplete_message'",
-            "- Incompreensível → 'incomprehensible_message'",
-            "- Sem agendamentos → 'no_schedule'",
-            "- Sem horários → 'no_schedule_slots'",
-            "- Humano indisponível → 'human_unavailable'",
-            "- Chatbot indisponível → 'chatbot_unavailable'",
-            "- Limite atingido → 'limit_reached'",
-            "- Abusivo → 'abusive_interaction'",
-
-            "FORMATO:",
-            "- JSON começa com { e termina com }, sem explicações.",
-            "- Ex. serviço único: { 'user_response': '...', 'system_response': { 'function': 'show_service', 'service': {...} } }",
-            "- Ex. múltiplos serviços: { 'user_response': '...', 'system_response': { 'function': 'show_service', 'services': [...] } }",
-            "- Ex. múltiplos agendamentos: { 'user_response': '...', 'system_response': { 'function': 'schedule', 'schedules': [...] } }",
-            "- Ex. horários disponíveis (máx 3): { 'user_response': '...', 'system_response': { 'function': 'schedule_slots', 'schedule_slots': [...] } }",
-        ])
+        assistant = context["data"]["assistant"]
+        identity = f"- Você é {assistant['name']} ({assistant['type']}) da empresa {context['data']['company']['name']}."
+        instructions = "\n".join([INSTRUCTIONS_HEAD, identity, INSTRUCTIONS_TAIL])
 
         prompt = {
             "context": essential_context,
@@ -158,8 +235,8 @@ class DeepSeekProvider:
         logging.debug(f"Prompt construído com {len(instructions)} caracteres de instrução")
         return prompt
 
-    def _call_api(self, prompt_data: Dict[str, Any]) -> Any:
-        """Chamada à API com URL correta"""
+    def _request(self, prompt_data: Dict[str, Any], model: Optional[str] = None) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        """URL, cabeçalhos e corpo da chamada de chat completions"""
         # Construa a URL corretamente
         api_url = f"{self.api_url.rstrip('/')}/chat/completions"
         
@@ -185,22 +262,33 @@ class DeepSeekProvider:
         ]
 
         data = {
-            "model": self.model,
+            "model": model or self.model,
             "messages": messages,
             "temperature": 0.5,
             "max_tokens": self.max_response_length,
             "response_format": {"type": "json_object"}
         }
 
-        try:
-            logging.info(f"Chamando API em: {api_url}")
-            response = requests.post(api_url, headers=headers, json=data, timeout=15)
-            
+        return api_url, headers, data
+
+    async def _call_api(self, prompt_data: Dict[str, Any], model: Optional[str] = None) -> Any:
+        """Chamada à API com URL correta"""
+        api_url, headers, data = self._request(prompt_data, model)
+
+        async def send(timeout: float) -> httpx.Response:
+            response = await self.http_client.post(api_url, headers=headers, json=data, timeout=timeout)
+
             # DEBUG - Essencial para troubleshooting
             logging.debug(f"Status Code: {response.status_code}")
             logging.debug(f"Response Text: {response.text}")
-            
+
             response.raise_for_status()
+            return response
+
+        try:
+            logging.info(f"Chamando API em: {api_url}")
+            # Circuito, timeout pelo p95 e retries com jitter ficam no breaker do provedor
+            response = await self.breaker.call(send)
             json_response = response.json()
 
             # Captura os tokens se disponíveis
@@ -211,13 +299,39 @@ class DeepSeekProvider:
                 "usage": token_usage
             }
                 
+        except CircuitOpenError:
+            raise
+        except httpx.TimeoutException:
+            logging.error("Timeout na requisição à API da IA")
+            return None
         except Exception as e:
             logging.error(f"Falha na chamada API: {str(e)}")
             return None
-        except requests.Timeout:
-            logging.error("Timeout na requisição à API da IA")
-            raise TimeoutError("A IA demorou demais para responder")
     
+    async def _stream_api(self, prompt_data: Dict[str, Any], model: Optional[str], token_usage: Dict[str, Any]) -> AsyncIterator[str]:
+        """Chamada com `stream: true`: devolve os trechos de texto conforme chegam e preenche `token_usage` no fim."""
+        api_url, headers, data = self._request(prompt_data, model)
+        data = {**data, "stream": True, "stream_options": {"include_usage": True}}
+
+        logging.info(f"Chamando API em streaming: {api_url}")
+        # Sem retry: trechos já enviados ao cliente não podem ser repetidos
+        async with self.breaker.guard() as timeout:
+            async with self.http_client.stream("POST", api_url, headers=headers, json=data, timeout=timeout) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    payload = line[5:].strip()
+                    if payload == "[DONE]":
+                        break
+                    chunk = json.loads(payload)
+                    if chunk.get("usage"):
+                        token_usage.update(chunk["usage"])
+                    for choice in chunk.get("choices") or []:
+                        content = (choice.get("delta") or {}).get("content")
+                        if content:
+                            yield content
+
     async def _format_response(self, api_response: Any, context: Dict[str, Any]) -> Dict[str, Any]:
         """Formatação básica da resposta"""
         try:
@@ -271,7 +385,19 @@ class DeepSeekProvider:
         """Preparação da resposta final"""
         useful_context = response.get("useful_context", {})
         token_usage = response.get("token_usage", {})
-        
+
+        # Fallback do processamento (JSON inválido, resposta incompleta...): mantém mensagem e status de erro
+        fallback = unwrap_fallback(response)
+        if fallback is not None:
+            return {
+                "useful_context": {
+                    **fallback["useful_context"],
+                    "token_usage": token_usage,
+                    "timestamp": datetime.now(timezone.utc).isoformat()
+                },
+                "status": fallback.get("status", 500)
+            }
+
         return {
             "useful_context": {
                 "user_response": useful_context.get("user_response", ""),
@@ -1,15 +1,111 @@
-# app/api/gemini_api.py (Gemini)
+# app/gateway/chatbot/providers/IA/gemini.py (Gemini)
+import json
 import logging
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+
 from app.configuration.settings import Configuration
-import google.generativeai as genai
+from app.gateway.chatbot.providers.IA.deepseek import DeepSeekProvider
+from app.gateway.circuit_breaker import CircuitOpenError, circuit_breakers
+from app.gateway.http_client import http_client
 
 config = Configuration()
 
-class GeminiProvider:
+class GeminiProvider(DeepSeekProvider):
+    """Gemini pela API REST (generateContent) no cliente HTTP compartilhado.
+
+    A resposta é convertida para o formato de chat completions, para reaproveitar
+    a formatação e o tratamento de erros do DeepSeekProvider.
+    """
+
     def __init__(self):
+        self.name = "gemini"
         self.max_response_length = 500
         self.model = "gemini-2.0-flash"
-        self.api_url = f"https://generativelanguage.googleapis.com/v1beta/models/{self.model}:generateContent"
+        self.api_url = "https://generativelanguage.googleapis.com/v1beta/models"
         self.api_key = config.gemini_api_key
-        genai.configure(api_key=self.api_key)
-        logging.info(f"Inicializado Gemini Provider com modelo {self.model}")
+        self.http_client = http_client
+        self.breaker = circuit_breakers.get(self.name)
+        logging.info(f"IA >>> Inicializado Gemini Provider com modelo {self.model}")
+
+    def _payload(self, prompt_data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "systemInstruction": {"parts": [{"text": prompt_data["instructions"]}]},
+            "contents": [{
+                "role": "user",
+                "parts": [{"text": json.dumps({
+                    "user_message": prompt_data["context"]["user_message"],
+                    "context": prompt_data["context"]
+                }, ensure_ascii=False)}]
+            }],
+            "generationConfig": {
+                "temperature": 0.5,
+                "maxOutputTokens": self.max_response_length,
+                "responseMimeType": "application/json"
+            }
+        }
+
+    @staticmethod
+    def _text(chunk: Dict[str, Any]) -> str:
+        candidates = chunk.get("candidates") or []
+        parts = candidates[0].get("content", {}).get("parts", []) if candidates else []
+        return "".join(part.get("text", "") for part in parts)
+
+    @staticmethod
+    def _usage(metadata: Dict[str, Any]) -> Dict[str, int]:
+        return {
+            "prompt_tokens": metadata.get("promptTokenCount", 0),
+            "completion_tokens": metadata.get("candidatesTokenCount", 0),
+            "total_tokens": metadata.get("totalTokenCount", 0),
+        }
+
+    async def _call_api(self, prompt_data: Dict[str, Any], model: Optional[str] = None) -> Any:
+        api_url = f"{self.api_url}/{model or self.model}:generateContent"
+        data = self._payload(prompt_data)
+
+        async def send(timeout: float) -> httpx.Response:
+            response = await self.http_client.post(api_url, params={"key": self.api_key}, json=data, timeout=timeout)
+            logging.debug(f"Status Code: {response.status_code}")
+            response.raise_for_status()
+            return response
+
+        try:
+            logging.info(f"Chamando API em: {api_url}")
+            response = await self.breaker.call(send)
+            json_response = response.json()
+
+            content = self._text(json_response)
+            token_usage = self._usage(json_response.get("usageMetadata", {}))
+
+            return {
+                "response": {"choices": [{"message": {"content": content}}]} if content else {},
+                "usage": token_usage
+            }
+
+        except CircuitOpenError:
+            raise
+        except httpx.TimeoutException:
+            logging.error("Timeout na requisição à API da IA")
+            return None
+        except Exception as e:
+            logging.error(f"Falha na chamada API: {str(e)}")
+            return None
+
+    async def _stream_api(self, prompt_data: Dict[str, Any], model: Optional[str], token_usage: Dict[str, Any]) -> AsyncIterator[str]:
+        api_url = f"{self.api_url}/{model or self.model}:streamGenerateContent"
+        params = {"key": self.api_key, "alt": "sse"}
+
+        logging.info(f"Chamando API em streaming: {api_url}")
+        async with self.breaker.guard() as timeout:
+            async with self.http_client.stream("POST", api_url, params=params, json=self._payload(prompt_data), timeout=timeout) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    chunk = json.loads(line[5:].strip())
+                    if chunk.get("usageMetadata"):
+                        token_usage.update(self._usage(chunk["usageMetadata"]))
+                    text = self._text(chunk)
+                    if text:
+                        yield text
@@ -1,12 +1,21 @@
+# app/gateway/chatbot/providers/IA/openai.py (OpenAI)
 import logging
 from app.configuration.settings import Configuration
+from app.gateway.chatbot.providers.IA.deepseek import DeepSeekProvider
+from app.gateway.circuit_breaker import circuit_breakers
+from app.gateway.http_client import http_client
 
 config = Configuration()
 
-class OpenaiProvider:
+class OpenaiProvider(DeepSeekProvider):
+    """Mesmo contrato de chat completions do DeepSeek, na base OPENAI_BASE_URL."""
+
     def __init__(self):
+        self.name = "openai"
         self.max_response_length = 500
         self.model = "gpt-3.5-turbo"
-        self.api_url = "https://api.openai.com/v1/chat/completions"
+        self.api_url = config.openai_base_url
         self.api_key = config.openassistant_api_key
-        logging.info(f"CHAVE: {self.api_key} == URL: {self.api_url}")
+        self.http_client = http_client
+        self.breaker = circuit_breakers.get(self.name)
+        logging.info(f"IA >>> Inicializado OpenAI Provider com modelo {self.model} em {self.api_url}")
@@ -1,10 +1,21 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Dict, Optional
 
 class IAProvider(ABC):
     @abstractmethod
     async def generate_response(
         self,
-        context: Dict[str, Any] = {}
+        context: Dict[str, Any] = {},
+        model: Optional[str] = None
     ) -> Dict[str, Any]:
         pass
+
+    async def stream_response(
+        self,
+        context: Dict[str, Any] = {},
+        model: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Provedores sem streaming: a resposta inteira em um único trecho, seguida do evento final."""
+        response = await self.generate_response(context, model=model)
+        yield {"type": "token", "text": response.get("useful_context", {}).get("user_response", "")}
+        yield {"type": "done", "response": response}
@@ -1,5 +1,9 @@
 # app/gateway/provider_factory.py
 
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+
 from app.configuration.settings import Configuration
 from app.gateway.chatbot.providers.chatbot_provider import IAProvider
 
@@ -7,20 +11,94 @@ from app.gateway.chatbot.providers.IA.deepseek import DeepSeekProvider
 from app.gateway.chatbot.providers.IA.gemini import GeminiProvider
 from app.gateway.chatbot.providers.IA.openai import OpenaiProvider
 
-import logging
-
 config = Configuration()
 
-def get_ia_provider() -> IAProvider:
-    """Retorna a instância do provedor de IA configurado."""
-    
-    provider = config.ia_provider
-    logging.info(f"Inteligência Artificial escolhida: {provider}")
-    
-    if provider == "gemini":
-        return GeminiProvider()
-    elif provider == "openai":
-        return OpenaiProvider()
-    else:
-        return DeepSeekProvider()
 
+class ProviderRegistry:
+    """Instâncias únicas dos provedores de IA e escolha do provedor/modelo por assistente.
+
+    Cada provedor é criado uma vez (na primeira vez em que é pedido) e guarda o
+    cliente HTTP compartilhado, as instruções do prompt e o modelo padrão. A
+    escolha vem de `assistant_model` ("GPT-3.5", "gemini-2.0-flash",
+    "deepseek/deepseek-chat"...) ou, se ele não indicar um provedor, de
+    `assistant_type` com o nome do provedor; sem nenhum dos dois vale IA_PROVIDER.
+    O modelo escolhido é passado na chamada, sem recriar o provedor.
+    """
+
+    PROVIDERS = {
+        "deepseek": DeepSeekProvider,
+        "openai": OpenaiProvider,
+        "gemini": GeminiProvider,
+    }
+
+    # Nomes de modelo gravados no assistente que não são o id usado na API
+    MODEL_ALIASES = {
+        "gpt-3.5": ("openai", "gpt-3.5-turbo"),
+        "gpt-4": ("openai", "gpt-4"),
+    }
+
+    # Prefixo do id do modelo -> provedor
+    MODEL_PREFIXES = (
+        ("gpt-", "openai"),
+        ("openai/", "openai"),
+        ("gemini", "gemini"),
+        ("deepseek", "deepseek"),
+    )
+
+    def __init__(self, default: Optional[str] = None):
+        default = (default or config.ia_provider or "").lower()
+        # IA_PROVIDER=mock (ou desconhecido) continua caindo no DeepSeek, como antes
+        self.default = default if default in self.PROVIDERS else "deepseek"
+        self._lock = threading.Lock()
+        self._providers: Dict[str, IAProvider] = {}
+        self._selections: Dict[Tuple[Optional[str], Optional[str]], Tuple[str, Optional[str]]] = {}
+
+    def get(self, name: Optional[str] = None) -> IAProvider:
+        """Instância do provedor `name` (ou do padrão), criada só na primeira chamada."""
+        name = name or self.default
+        provider = self._providers.get(name)
+        if provider is None:
+            with self._lock:
+                provider = self._providers.get(name)
+                if provider is None:
+                    provider = self._providers[name] = self.PROVIDERS[name]()
+                    logging.info(f"IA >>> Provedor {name} registrado")
+        return provider
+
+    def select(self, assistant_type: Optional[str], assistant_model: Optional[str]) -> Tuple[str, Optional[str]]:
+        """(provedor, modelo) para o tipo/modelo do assistente; modelo None usa o padrão do provedor."""
+        key = (assistant_type, assistant_model)
+        selection = self._selections.get(key)
+        if selection is None:
+            selection = self._selections[key] = self._select(assistant_type, assistant_model)
+        return selection
+
+    def resolve(self, assistant: Optional[Dict[str, Any]]) -> Tuple[IAProvider, Optional[str]]:
+        """Provedor e modelo para o assistente do contexto (`data.assistant`)."""
+        assistant = assistant or {}
+        name, model = self.select(assistant.get("type"), assistant.get("model"))
+        return self.get(name), model
+
+    def stats(self) -> Dict[str, Any]:
+        return {"default": self.default, "instances": sorted(self._providers), "selections": len(self._selections)}
+
+    def _select(self, assistant_type: Optional[str], assistant_model: Optional[str]) -> Tuple[str, Optional[str]]:
+        model = (assistant_model or "").strip()
+        normalized = model.lower()
+        if normalized in self.MODEL_ALIASES:
+            return self.MODEL_ALIASES[normalized]
+        for prefix, name in self.MODEL_PREFIXES:
+            if normalized.startswith(prefix):
+                return name, model
+        provider_type = (assistant_type or "").strip().lower()
+        if provider_type in self.PROVIDERS:
+            return provider_type, None
+        return self.default, None
+
+
+provider_registry = ProviderRegistry()
+
+
+def get_ia_provider() -> IAProvider:
+    """Retorna a instância (única) do provedor de IA configurado."""
+    return provider_registry.get()
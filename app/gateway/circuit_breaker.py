@@ -0,0 +1,254 @@
+# app/gateway/circuit_breaker.py
+
+import asyncio
+import logging
+import math
+import random
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Optional, Tuple, TypeVar
+
+import httpx
+
+from app.configuration.settings import Configuration
+
+configuration = Configuration()
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(Exception):
+    """O circuito do provedor está aberto: a chamada nem chega a ser feita."""
+
+    def __init__(self, name: str):
+        super().__init__(f"Circuito do provedor {name} aberto")
+        self.name = name
+
+
+class CircuitBreaker:
+    """Circuit breaker de um provedor de IA, com timeout adaptativo e retries.
+
+    Guarda o resultado das chamadas dos últimos `window` segundos; chamadas com
+    erro ou mais lentas que `slow_call` contam como falha. Com pelo menos
+    `min_calls` chamadas na janela e taxa de falha >= `error_rate`, o circuito
+    abre e as chamadas falham na hora (CircuitOpenError -> resposta padrão do
+    fallback) por `open_seconds`; depois uma única chamada de teste decide se
+    ele fecha ou abre de novo.
+
+    O timeout de cada chamada é o p95 das chamadas bem-sucedidas da janela
+    vezes `timeout_factor`, entre `min_timeout` e `max_timeout` (o máximo vale
+    enquanto não há amostras suficientes). Só falhas em que o pedido não foi
+    processado (erro de conexão, 429/502/503/504) são repetidas, no máximo
+    `retries` vezes, com backoff exponencial e jitter.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    RETRYABLE_STATUS = {429, 502, 503, 504}
+    RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+
+    def __init__(
+        self,
+        name: str,
+        window: Optional[float] = None,
+        min_calls: Optional[int] = None,
+        error_rate: Optional[float] = None,
+        slow_call: Optional[float] = None,
+        open_seconds: Optional[float] = None,
+        min_timeout: Optional[float] = None,
+        max_timeout: Optional[float] = None,
+        timeout_factor: Optional[float] = None,
+        retries: Optional[int] = None,
+        backoff: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.window = window if window is not None else configuration.ai_breaker_window
+        self.min_calls = max(1, min_calls if min_calls is not None else configuration.ai_breaker_min_calls)
+        self.error_rate = error_rate if error_rate is not None else configuration.ai_breaker_error_rate
+        self.slow_call = slow_call if slow_call is not None else configuration.ai_breaker_slow_call
+        self.open_seconds = open_seconds if open_seconds is not None else configuration.ai_breaker_open_seconds
+        self.min_timeout = min_timeout if min_timeout is not None else configuration.ai_timeout_min
+        self.max_timeout = max_timeout if max_timeout is not None else configuration.http_timeout
+        self.timeout_factor = timeout_factor if timeout_factor is not None else configuration.ai_timeout_factor
+        self.retries = max(0, retries if retries is not None else configuration.ai_retry_attempts)
+        self.backoff = backoff if backoff is not None else configuration.ai_retry_backoff
+        self.clock = clock
+        self._lock = threading.Lock()
+        # (instante, falhou, latência das chamadas bem-sucedidas)
+        self._calls: Deque[Tuple[float, bool, Optional[float]]] = deque()
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self._stats = {"calls": 0, "failures": 0, "rejected": 0, "retries": 0, "opened": 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def allow(self) -> bool:
+        """Se a chamada pode seguir; no meio-aberto só a primeira (a de teste) passa."""
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self._stats["rejected"] += 1
+            return False
+
+    def record(self, success: bool, latency: Optional[float] = None) -> None:
+        """Registra o resultado de uma chamada liberada por `allow`."""
+        with self._lock:
+            now = self.clock()
+            failed = not success or (latency is not None and latency > self.slow_call)
+            self._calls.append((now, failed, latency if success else None))
+            self._prune(now)
+            self._stats["calls"] += 1
+            self._stats["failures"] += failed
+
+            if self._current_state() == self.HALF_OPEN:
+                self._probing = False
+                if failed:
+                    self._open(now, "chamada de teste falhou")
+                else:
+                    self._state = self.CLOSED
+                    self._calls.clear()
+                    logging.info(f"IA >>> Circuito de {self.name} fechado")
+            elif self._state == self.CLOSED and len(self._calls) >= self.min_calls and self._failure_rate() >= self.error_rate:
+                self._open(now, f"{self._failure_rate():.0%} de falhas em {len(self._calls)} chamadas")
+
+    def release(self) -> None:
+        """Libera a vaga da chamada de teste quando ela é cancelada sem resultado."""
+        with self._lock:
+            self._probing = False
+
+    def timeout(self) -> float:
+        with self._lock:
+            self._prune(self.clock())
+            return self._timeout()
+
+    async def call(self, send: Callable[[float], Awaitable[T]]) -> T:
+        """Executa `send(timeout)` com o circuito, o timeout adaptativo e os retries."""
+        if not self.allow():
+            raise CircuitOpenError(self.name)
+        attempt = 0
+        while True:
+            started = self.clock()
+            try:
+                result = await send(self.timeout())
+            except Exception as e:
+                self.record(False)
+                if attempt >= self.retries or not self.retryable(e):
+                    raise
+                attempt += 1
+                self._count("retries")
+                await asyncio.sleep(self.backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+                if not self.allow():
+                    raise
+                continue
+            except BaseException:
+                self.release()
+                raise
+            self.record(True, self.clock() - started)
+            return result
+
+    @asynccontextmanager
+    async def guard(self) -> AsyncIterator[float]:
+        """Uma chamada sem retry (streaming); entrega o timeout e registra só o resultado."""
+        if not self.allow():
+            raise CircuitOpenError(self.name)
+        try:
+            yield self.timeout()
+        except Exception:
+            self.record(False)
+            raise
+        except BaseException:
+            self.release()
+            raise
+        self.record(True)
+
+    @classmethod
+    def retryable(cls, error: Exception) -> bool:
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code in cls.RETRYABLE_STATUS
+        return isinstance(error, cls.RETRYABLE_ERRORS)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._prune(self.clock())
+            latencies = self._latencies()
+            return {
+                **self._stats,
+                "state": self._current_state(),
+                "window_calls": len(self._calls),
+                "error_rate": self._failure_rate(),
+                "p95_seconds": self._p95(latencies),
+                "timeout_seconds": self._timeout(),
+            }
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and self.clock() - self._opened_at >= self.open_seconds:
+            self._state = self.HALF_OPEN
+            self._probing = False
+        return self._state
+
+    def _open(self, now: float, reason: str) -> None:
+        self._state = self.OPEN
+        self._opened_at = now
+        self._probing = False
+        self._stats["opened"] += 1
+        logging.warning(f"IA >>> Circuito de {self.name} aberto por {self.open_seconds:.0f}s ({reason})")
+
+    def _prune(self, now: float) -> None:
+        while self._calls and now - self._calls[0][0] > self.window:
+            self._calls.popleft()
+
+    def _failure_rate(self) -> float:
+        return sum(failed for _, failed, _ in self._calls) / len(self._calls) if self._calls else 0.0
+
+    def _latencies(self):
+        return sorted(latency for _, _, latency in self._calls if latency is not None)
+
+    @staticmethod
+    def _p95(latencies) -> Optional[float]:
+        return latencies[max(0, math.ceil(0.95 * len(latencies)) - 1)] if latencies else None
+
+    def _timeout(self) -> float:
+        latencies = self._latencies()
+        if len(latencies) < self.min_calls:
+            return self.max_timeout
+        return min(self.max_timeout, max(self.min_timeout, self._p95(latencies) * self.timeout_factor))
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self._stats[counter] += 1
+
+
+class CircuitBreakers:
+    """Um CircuitBreaker por provedor, criado no primeiro uso."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, name: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = self._breakers[name] = CircuitBreaker(name)
+            return breaker
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {name: breaker.stats() for name, breaker in breakers.items()}
+
+
+circuit_breakers = CircuitBreakers()
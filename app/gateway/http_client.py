@@ -0,0 +1,125 @@
+# app/gateway/http_client.py
+
+import asyncio
+import importlib.util
+import logging
+import threading
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+import httpx
+
+from app.configuration.settings import Configuration
+
+configuration = Configuration()
+
+
+class SharedHttpClient:
+    """Cliente HTTP assíncrono único do processo para os provedores de IA e verificações de token.
+
+    Mantém um `httpx.AsyncClient` de vida longa (pool com keep-alive e HTTP/2
+    quando o pacote h2 está instalado) em vez de abrir uma conexão por chamada.
+    O httpx limita só o total do pool; o limite por host é aplicado aqui com um
+    semáforo por host. O cliente pertence ao event loop que o criou e é recriado
+    se for usado em outro loop.
+    """
+
+    def __init__(
+        self,
+        max_connections: Optional[int] = None,
+        max_keepalive: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        max_per_host: Optional[int] = None,
+        timeout: Optional[float] = None,
+        http2: Optional[bool] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.max_connections = max_connections if max_connections is not None else configuration.http_max_connections
+        self.max_keepalive = max_keepalive if max_keepalive is not None else configuration.http_max_keepalive
+        self.keepalive_expiry = keepalive_expiry if keepalive_expiry is not None else configuration.http_keepalive_expiry
+        self.max_per_host = max_per_host if max_per_host is not None else configuration.http_max_per_host
+        self.timeout = timeout if timeout is not None else configuration.http_timeout
+        wants_http2 = http2 if http2 is not None else configuration.http_http2
+        self.http2 = wants_http2 and importlib.util.find_spec("h2") is not None
+        self.transport = transport
+        self._lock = threading.Lock()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._stats = {"requests": 0, "errors": 0, "clients_created": 0}
+
+    def client(self) -> httpx.AsyncClient:
+        """Cliente do event loop atual (criado na primeira chamada)."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._client is None or self._client.is_closed or self._loop is not loop:
+                self._client = httpx.AsyncClient(
+                    http2=self.http2,
+                    timeout=self.timeout,
+                    limits=httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.max_keepalive,
+                        keepalive_expiry=self.keepalive_expiry,
+                    ),
+                    transport=self.transport,
+                )
+                self._loop = loop
+                self._host_limits = {}
+                self._stats["clients_created"] += 1
+                logging.info(f"HTTP >>> Cliente compartilhado criado (http2={self.http2}, conexões={self.max_connections}, por host={self.max_per_host})")
+            return self._client
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        client = self.client()
+        async with self._host_limit(url):
+            try:
+                response = await client.request(method, url, **kwargs)
+            except httpx.HTTPError:
+                self._count("errors")
+                raise
+        self._count("requests")
+        return response
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs) -> AsyncIterator[httpx.Response]:
+        """Resposta em streaming (a vaga do host fica ocupada até o corpo ser consumido)."""
+        client = self.client()
+        async with self._host_limit(url):
+            try:
+                async with client.stream(method, url, **kwargs) as response:
+                    self._count("requests")
+                    yield response
+            except httpx.HTTPError:
+                self._count("errors")
+                raise
+
+    async def aclose(self) -> None:
+        with self._lock:
+            client, self._client, self._loop = self._client, None, None
+        if client is not None and not client.is_closed:
+            await client.aclose()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "http2": self.http2, "max_connections": self.max_connections, "max_per_host": self.max_per_host}
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = httpx.URL(url).host
+        with self._lock:
+            semaphore = self._host_limits.get(host)
+            if semaphore is None:
+                semaphore = self._host_limits[host] = asyncio.Semaphore(self.max_per_host)
+        return semaphore
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self._stats[counter] += 1
+
+
+http_client = SharedHttpClient()
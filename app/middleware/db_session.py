@@ -0,0 +1,14 @@
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.database.connection import get_route_name, session_tracker
+
+class SessionLeakMiddleware(BaseHTTPMiddleware):
+    """Verifica, ao fim de cada requisição, se alguma sessão do banco ficou aberta."""
+
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+        sessions = getattr(request.state, "db_sessions", None)
+        if sessions:
+            session_tracker.check_leaks(sessions, get_route_name(request))
+        return response
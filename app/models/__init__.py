@@ -17,4 +17,6 @@ from .finance.finance_category import FinanceCategory
 from .finance.finance import Finance
 from .schedule.schedule import Schedule
 from .schedule.schedule_slot import ScheduleSlot
-from .chat.sentiment import Sentiment
\ No newline at end of file
+from .chat.sentiment import Sentiment
+from .analytics.company_daily_stats import CompanyDailyStats
+from .analytics.company_daily_client import CompanyDailyClient
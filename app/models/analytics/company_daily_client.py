@@ -0,0 +1,38 @@
+from datetime import date
+
+from sqlmodel import SQLModel, Field
+
+
+class CompanyDailyClient(SQLModel, table=True):
+    """Contatos de clientes atendidos por empresa em cada dia.
+
+    Uma linha por (empresa, dia, contato), inserida no primeiro turno do
+    cliente no dia. Dá o número exato de clientes distintos em qualquer
+    período (COUNT DISTINCT sobre O(clientes por dia)), o que a soma de
+    `CompanyDailyStats.unique_clients` não dá quando o cliente volta em outro dia.
+
+    Atributos:
+        company_id (int): ID da empresa.
+        day (date): Dia (UTC) do atendimento.
+        client_contact (str): Contato do cliente.
+    """
+    __tablename__ = "tb_company_daily_client"
+
+    company_id: int = Field(
+        foreign_key="tb_company.id",
+        primary_key=True,
+        description="ID da empresa",
+        title="ID Empresa"
+    )
+
+    day: date = Field(
+        primary_key=True,
+        description="Dia do atendimento (UTC)",
+        title="Dia"
+    )
+
+    client_contact: str = Field(
+        primary_key=True,
+        description="Contato do cliente",
+        title="Contato"
+    )
@@ -0,0 +1,60 @@
+from datetime import date, datetime
+from typing import Optional
+
+from sqlmodel import SQLModel, Field
+
+
+class CompanyDailyStats(SQLModel, table=True):
+    """Consolidado diário de atendimento por empresa.
+
+    Mantido incrementalmente a cada turno de chat (upsert por empresa e dia),
+    para que relatórios e dashboards leiam O(dias) em vez de O(interações).
+
+    Atributos:
+        company_id (int): ID da empresa.
+        day (date): Dia (UTC) do consolidado.
+        interactions (int): Interações (conversas) iniciadas no dia.
+        unique_clients (int): Contatos de clientes distintos identificados no dia.
+        messages (int): Mensagens (turnos respondidos) no dia; base da média de tokens.
+        prompt_tokens (int): Tokens de prompt consumidos no dia.
+        completion_tokens (int): Tokens de resposta consumidos no dia.
+        total_tokens (int): Total de tokens consumidos no dia.
+        sentiment_positive_count (int): Conversas iniciadas no dia com sentimento final positivo.
+        sentiment_negative_count (int): Conversas iniciadas no dia com sentimento final negativo.
+        sentiment_neutral_count (int): Conversas iniciadas no dia com sentimento final neutro.
+            (as três somam `interactions`)
+        human_handoffs (int): Conversas transferidas para atendimento humano no dia
+            (chat marcado com human_attendance; uma vez por conversa).
+        last_interaction_at (datetime): Último turno registrado no dia.
+    """
+    __tablename__ = "tb_company_daily_stats"
+
+    company_id: int = Field(
+        foreign_key="tb_company.id",
+        primary_key=True,
+        description="ID da empresa",
+        title="ID Empresa"
+    )
+
+    day: date = Field(
+        primary_key=True,
+        description="Dia do consolidado (UTC)",
+        title="Dia"
+    )
+
+    interactions: int = Field(default=0, description="Interações iniciadas no dia", title="Interações")
+    unique_clients: int = Field(default=0, description="Clientes distintos no dia", title="Clientes únicos")
+    messages: int = Field(default=0, description="Mensagens respondidas no dia", title="Mensagens")
+    prompt_tokens: int = Field(default=0, description="Tokens de prompt", title="Tokens de prompt")
+    completion_tokens: int = Field(default=0, description="Tokens de resposta", title="Tokens de resposta")
+    total_tokens: int = Field(default=0, description="Total de tokens", title="Total de tokens")
+    sentiment_positive_count: int = Field(default=0, description="Conversas com sentimento final positivo", title="Sentimento positivo")
+    sentiment_negative_count: int = Field(default=0, description="Conversas com sentimento final negativo", title="Sentimento negativo")
+    sentiment_neutral_count: int = Field(default=0, description="Conversas com sentimento final neutro", title="Sentimento neutro")
+    human_handoffs: int = Field(default=0, description="Transferências para humano", title="Transferências")
+
+    last_interaction_at: Optional[datetime] = Field(
+        default=None,
+        description="Último turno registrado no dia",
+        title="Última interação"
+    )
@@ -1,5 +1,5 @@
 from sqlmodel import SQLModel, Field, Relationship
-from sqlalchemy import Enum as SQLEnum, Column, JSON
+from sqlalchemy import Enum as SQLEnum, Column, Index, JSON
 from typing import Optional, Dict, TYPE_CHECKING
 from datetime import datetime, timezone
 
@@ -34,6 +34,12 @@ class Chat(SQLModel, table=True):
         deleted_at: Deleção
     """
     __tablename__ = "tb_chat"
+    __table_args__ = (
+        Index("ix_tb_chat_company_id_chat_code", "company_id", "chat_code"),
+        Index("ix_tb_chat_company_id_whatsapp_id", "company_id", "whatsapp_id"),
+        # Empresas com conversas recentes (warm-up e renovação do cache)
+        Index("ix_tb_chat_last_interaction_at_company_id", "last_interaction_at", "company_id"),
+    )
 
     id: Optional[int] = Field(
         default=None,
@@ -1,5 +1,6 @@
 from datetime import datetime, timezone
 from typing import Optional, Dict, TYPE_CHECKING
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship, SQLModel, JSON
 from app.enums.chat import ChatSentiment, ChatType
 
@@ -35,6 +36,10 @@ class Interaction(SQLModel, table=True):
         ai_generated_insights: Insights gerados por IA
     """
     __tablename__ = "tb_interaction"
+    __table_args__ = (
+        Index("ix_tb_interaction_company_id_created_at", "company_id", "created_at"),
+        Index("ix_tb_interaction_created_at", "created_at"),
+    )
 
     id: Optional[int] = Field(
         default=None,
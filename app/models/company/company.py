@@ -66,6 +66,7 @@ class Company(SQLModel, table=True):
         is_new_company: Se uma empresa é nova
         tutorial_completed: Se o tutorial foi concluído
         feature_flags: Mapa de features
+        data_version: Versão dos dados usados pelo chat (cache)
         created_at: Data de criação
         updated_at: Data de atualização
         deleted_at: Data de desativação
@@ -250,6 +251,14 @@ class Company(SQLModel, table=True):
         title="Features Ativadas"
     )
 
+    # Versão dos dados usados pelo chat; incrementada a cada escrita de agenda, slots, serviços ou cadastro
+    data_version: int = Field(
+        default=0,
+        sa_column_kwargs={"server_default": "0"},
+        description="Versão dos dados da empresa usada para validar o cache",
+        title="Versão dos Dados"
+    )
+
     # Timestamps e auditoria
     created_at: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc),
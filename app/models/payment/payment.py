@@ -103,6 +103,7 @@ class Payment(SQLModel, table=True):
     )
     transaction_code: Optional[str] = Field(
         default=None,
+        index=True,
         description="Código legível da transação",
         max_length=50,
         title="Código"
@@ -1,5 +1,6 @@
 from datetime import datetime, timezone
 from typing import Any, Optional, TYPE_CHECKING, Dict
+from sqlalchemy import Index, text
 from sqlmodel import JSON, Column, Field, Relationship, SQLModel
 from uuid import uuid4
 
@@ -40,6 +41,13 @@ class Schedule(SQLModel, table=True):
         extended_props: Propriedades extras
     """
     __tablename__ = "tb_schedule"
+    __table_args__ = (
+        Index(
+            "ix_tb_schedule_company_id_start", "company_id", "start",
+            postgresql_where=text("deleted_at IS NULL"),
+            sqlite_where=text("deleted_at IS NULL"),
+        ),
+    )
 
     id: Optional[int] = Field(
         default=None,
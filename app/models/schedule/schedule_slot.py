@@ -1,5 +1,6 @@
 from datetime import datetime, timezone
 from typing import Optional, TYPE_CHECKING
+from sqlalchemy import Index, text
 from sqlmodel import Field, Relationship, SQLModel
 from uuid import uuid4
 
@@ -30,6 +31,13 @@ class ScheduleSlot(SQLModel, table=True):
         updated_at: Data de atualização
     """
     __tablename__ = "tb_schedule_slot"
+    __table_args__ = (
+        Index(
+            "ix_tb_schedule_slot_company_id_active", "company_id", "is_active", "schedule_id", "start",
+            postgresql_where=text("deleted_at IS NULL"),
+            sqlite_where=text("deleted_at IS NULL"),
+        ),
+    )
 
     id: Optional[int] = Field(
         default=None,
@@ -1,5 +1,6 @@
 from datetime import datetime, timezone
 from typing import TYPE_CHECKING, List, Optional
+from sqlalchemy import Index, text
 from sqlmodel import Field, Relationship, SQLModel
 
 
@@ -24,6 +25,13 @@ class CategoryService(SQLModel, table=True):
         deleted_at: Data de desativação (soft delete)
     """
     __tablename__ = "tb_category_service"
+    __table_args__ = (
+        Index(
+            "ix_tb_category_service_company_id", "company_id",
+            postgresql_where=text("deleted_at IS NULL"),
+            sqlite_where=text("deleted_at IS NULL"),
+        ),
+    )
 
     id: Optional[int] = Field(
         default=None,
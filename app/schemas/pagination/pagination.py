@@ -0,0 +1,10 @@
+from typing import Generic, List, Optional, TypeVar
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    """Página de uma listagem; next_cursor é None na última página."""
+    items: List[T]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,92 @@
+from datetime import date, datetime
+from typing import Dict, Optional
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.database.connection import dialect_insert
+from app.enums.chat import ChatSentiment
+from app.models.analytics.company_daily_client import CompanyDailyClient
+from app.models.analytics.company_daily_stats import CompanyDailyStats
+
+SENTIMENT_COLUMNS = {
+    ChatSentiment.POSITIVE: "sentiment_positive_count",
+    ChatSentiment.NEUTRAL: "sentiment_neutral_count",
+    ChatSentiment.NEGATIVE: "sentiment_negative_count",
+}
+
+
+def daily_stats_increments(
+    new_interaction: bool,
+    new_client: bool,
+    token_usage: dict,
+    human_handoff: bool,
+) -> Dict[str, int]:
+    """Incrementos de um turno de chat no consolidado diário.
+
+    O sentimento não entra aqui: é contado por conversa, pela mudança do
+    sentimento final do chat no flush (`sentiment_moves`).
+    """
+    return {
+        "interactions": int(new_interaction),
+        "unique_clients": int(new_client),
+        "messages": 1,
+        "prompt_tokens": token_usage.get("prompt_tokens", 0) or 0,
+        "completion_tokens": token_usage.get("completion_tokens", 0) or 0,
+        "total_tokens": token_usage.get("total_tokens", 0) or 0,
+        "human_handoffs": int(human_handoff),
+    }
+
+
+def sentiment_moves(previous: Optional[ChatSentiment], current: ChatSentiment) -> Dict[str, int]:
+    """Incrementos de sentimento quando o sentimento final de uma conversa muda.
+
+    Cada conversa conta uma vez, na coluna do seu sentimento final: ao mudar,
+    sai da coluna anterior e entra na nova. URGENT conta como neutro.
+    """
+    if previous == current:
+        return {}
+    moves = {SENTIMENT_COLUMNS.get(current, "sentiment_neutral_count"): 1}
+    if previous is not None:
+        column = SENTIMENT_COLUMNS.get(previous, "sentiment_neutral_count")
+        moves[column] = moves.get(column, 0) - 1
+    return {column: value for column, value in moves.items() if value}
+
+
+async def upsert_company_daily_stats(
+    session: AsyncSession,
+    company_id: int,
+    day: date,
+    at: Optional[datetime],
+    increments: Dict[str, int],
+) -> None:
+    """Soma os incrementos na linha (company_id, day) com um único INSERT ... ON CONFLICT.
+
+    O upsert é atômico no banco, então turnos concorrentes da mesma empresa não
+    perdem contagens. Roda na transação do turno e só vale após o commit.
+    `at` None (só correção de sentimento de um dia anterior) mantém a última interação do dia.
+    """
+    table = CompanyDailyStats.__table__
+    statement = dialect_insert(session, table).values(
+        company_id=company_id, day=day, last_interaction_at=at, **increments
+    )
+    set_ = {name: table.c[name] + statement.excluded[name] for name in increments}
+    if at is not None:
+        set_["last_interaction_at"] = statement.excluded.last_interaction_at
+    statement = statement.on_conflict_do_update(index_elements=[table.c.company_id, table.c.day], set_=set_)
+    await session.exec(statement)
+
+
+async def record_daily_client(session: AsyncSession, company_id: int, day: date, client_contact: str) -> bool:
+    """Registra o cliente no dia da empresa; True se é a primeira vez dele no dia.
+
+    INSERT ... ON CONFLICT DO NOTHING: workers concorrentes não contam o mesmo
+    cliente duas vezes, e o retorno alimenta `unique_clients` do consolidado.
+    """
+    table = CompanyDailyClient.__table__
+    inserted = (await session.exec(
+        dialect_insert(session, table)
+        .values(company_id=company_id, day=day, client_contact=client_contact)
+        .on_conflict_do_nothing(index_elements=[table.c.company_id, table.c.day, table.c.client_contact])
+        .returning(table.c.company_id)
+    )).first()
+    return inserted is not None
@@ -1,18 +1,24 @@
+import asyncio
 from datetime import datetime, timedelta, timezone
 import logging
 from typing import Any, Dict, Optional
 import uuid
 
-from fastapi import HTTPException
-from sqlmodel import Session, select
+from sqlalchemy import update
+from sqlalchemy.orm import selectinload
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.cache.versions import data_versions
 from app.configuration.settings import Configuration
 from app.gateway.chatbot.handlers.handlers import call_fallback
+from app.gateway.chatbot.nlp.context_classifier import ContextClassifier
 from app.models.chat.chat import Chat
-from app.models.chat.interaction import Interaction
 from app.models.chat.assistant import Assistant
-from app.models.chat.sentiment import Sentiment
 from app.enums.chat import ChatIntent, ChatSentiment, ChatbotStatus
+from app.database.write_behind import ChatTurnWrite, write_behind
+from app.utils.analytics_utils import daily_stats_increments
+from app.utils.date_utils import to_naive_utc, utc_now
 
 Configuration()
 # Construtor de contexto para o chatbot
@@ -44,7 +50,7 @@ async def build_chat_context(data, assistant_data, chatbot, intents, selected_in
 # ================ #
 
 # Função para construir um contexto bloqueado
-async def build_blocked_context(selected_intent: ChatIntent, chatbot: Chat, context: Dict[str, Any], session: Session) -> Optional[Dict[str, Any]]:
+async def build_blocked_context(selected_intent: ChatIntent, chatbot: Chat, context: Dict[str, Any], session: AsyncSession) -> Optional[Dict[str, Any]]:
     if selected_intent == ChatIntent.CLOSE_CHAT:
         reset_chatbot_count(chatbot)
         logging.info(f"CHAT >>> Encerrando chat...")
@@ -82,9 +88,9 @@ async def build_blocked_context(selected_intent: ChatIntent, chatbot: Chat, cont
         assistant = None
         if not assistant:
             # fallback: buscar no banco
-            assistant = session.exec(
+            assistant = (await session.exec(
                 select(Assistant).where(Assistant.company_id == chatbot.company_id)
-            ).first()
+            )).first()
 
         if assistant and assistant.status in [ChatbotStatus.OFFLINE, ChatbotStatus.MAINTENANCE]:
             logging.warning(f"CHAT >>> Indisponível: {assistant.status}")
@@ -99,8 +105,7 @@ async def build_blocked_context(selected_intent: ChatIntent, chatbot: Chat, cont
 
 # Zerador de contagem do chatbot - se passou 24h da última interação
 def reset_chatbot_count(chatbot) -> str:
-    now = datetime.now(timezone.utc)
-    if chatbot.last_interaction_at.replace(tzinfo=timezone.utc) < now - timedelta(hours=24):
+    if to_naive_utc(chatbot.last_interaction_at) < utc_now() - timedelta(hours=24):
         chatbot.interaction_count = 0
         return f"Contagem de interações zerada para {chatbot.company_id}"
     return f"Contagem de interações não zerada para {chatbot.company_id}, última interação foi há menos de 24 horas"
@@ -128,134 +133,113 @@ async def check_chatbot_count(chatbot: Dict[str, Any], context: Dict[str, Any])
 # ================ #
 
 # Atualiza a interação e os dados do assistente
-def update_interaction_and_assistant(
-    session,
+async def update_interaction_and_assistant(
+    session: AsyncSession,
     chatbot,
     company_id: int,
     sentiment_str: str,
     useful_context: dict
 ):
-    """Atualiza a Interaction, Sentiment agregador e dados do Assistant."""
-    now = datetime.now(timezone.utc)
-
-    # Busca ou cria interação
-    interaction = chatbot.interaction
-    if not interaction:
-        interaction = Interaction(
-            company_id=company_id,
-            chat_id=chatbot.id,
-            created_at=now,
-        )
-        session.add(interaction)
-
-    # Atualiza campos padrão da interação
-    interaction.updated_at = now
-    sentiment_enum = ChatSentiment[sentiment_str.upper()] if sentiment_str else ChatSentiment.NEUTRAL
-    interaction.sentiment = sentiment_enum
+    """Grava o estado do chat e enfileira as demais escritas do turno.
 
-    # Popula campos do contexto
-    interaction.client_name = useful_context.get("client_name")
-    interaction.client_contact = useful_context.get("client_contact")
-    interaction.interaction_type = useful_context.get("interaction_type", "standard")
-    interaction.interaction_summary = useful_context.get("summary")
-    interaction.ai_generated_insights = useful_context.get("insights")
+    O Chat (histórico em context_json, contagem de interações, datas e
+    atendimento humano) é gravado já, na sessão do turno: o próximo turno do
+    mesmo chat o lê do banco. Interaction, Sentiment, tokens e consolidado
+    diário vão pelo write-behind em lote, fora do caminho da resposta; o
+    cliente novo no dia é decidido no flush (tb_company_daily_client).
+    """
+    now = utc_now()
 
+    client_contact = useful_context.get("client_contact")
+    sentiment_enum = ChatSentiment[sentiment_str.upper()] if sentiment_str else ChatSentiment.NEUTRAL
     token_usage = useful_context.get("token_usage", {})
-    interaction.prompt_tokens = token_usage.get("prompt_tokens", 0)
-    interaction.completion_tokens = token_usage.get("completion_tokens", 0)
-    interaction.total_tokens = token_usage.get("total_tokens", 0)
-
-    session.add(interaction)
-
-    # === Atualiza sentimento agregado ===
-    sentiment = chatbot.sentiment
-    if not sentiment:
-        sentiment = Sentiment(chat_id=chatbot.id)
-        session.add(sentiment)
-
-    if sentiment_enum == ChatSentiment.POSITIVE:
-        sentiment.sentiment_positive_count += 1
-    elif sentiment_enum == ChatSentiment.NEGATIVE:
-        sentiment.sentiment_negative_count += 1
-    else:
-        sentiment.sentiment_neutral_count += 1
-
-    # Recalcula sentimento predominante
-    counts = {
-        ChatSentiment.POSITIVE: sentiment.sentiment_positive_count,
-        ChatSentiment.NEGATIVE: sentiment.sentiment_negative_count,
-        ChatSentiment.NEUTRAL: sentiment.sentiment_neutral_count
+
+    # Transferência para humano: conta uma vez por conversa, quando o chat passa a ter atendimento humano
+    # (mesma definição do histórico na migração 0003: interações de chats com human_attendance)
+    handoff = useful_context.get("main_intent") == ChatIntent.TRANSFER_HUMAN and not chatbot.human_attendance
+    chat_fields = {
+        "context_json": chatbot.context_json,
+        "interaction_count": chatbot.interaction_count,
+        "updated_at": to_naive_utc(chatbot.updated_at) or now,
+        "last_interaction_at": now,
     }
-    sentiment.final_sentiment = max(counts, key=counts.get)
-    sentiment.updated_at = now
-
-    session.add(sentiment)
-
-    # === Atualiza tokens do assistente ===
-    if token_usage:
-        assistant = session.exec(
-            select(Assistant).where(Assistant.company_id == company_id)
-        ).first()
-
-        if assistant:
-            # Reset mensal se necessário
-            if (
-                assistant.assistant_token_reset_date is None or
-                assistant.assistant_token_reset_date.month != now.month
-            ):
-                assistant.assistant_token_usage = 0
-                assistant.assistant_token_reset_date = now.replace(
-                    day=1, hour=0, minute=0, second=0, microsecond=0
-                )
-
-            total = token_usage.get("total_tokens", 0)
-            limit = assistant.assistant_token_limit or 0
-
-            if limit > 0 and (assistant.assistant_token_usage + total) > limit:
-                raise HTTPException(
-                    status_code=403,
-                    detail="Limite de tokens atingido para este plano."
-                )
-
-            assistant.assistant_token_usage += total
-            assistant.updated_at = now
-            session.add(assistant)
-
-    # Commit geral
-    session.commit()
-
-    # Refresh final
-    session.refresh(chatbot)
-    session.refresh(interaction)
-    session.refresh(sentiment)
+    if handoff:
+        chat_fields["human_attendance"] = True
+    for name, value in chat_fields.items():
+        setattr(chatbot, name, value)
+
+    # O chat vai pelo UPDATE abaixo; fora da sessão o flush não o grava de novo
+    if chatbot in session:
+        session.expunge(chatbot)
+    await session.exec(
+        update(Chat)
+        .where(Chat.id == chatbot.id)
+        .values(**chat_fields, step=chatbot.step)
+        .execution_options(synchronize_session=False)
+    )
+    await session.commit()
+
+    write_behind.submit(ChatTurnWrite(
+        company_id=company_id,
+        chat_id=chatbot.id,
+        at=now,
+        interaction_fields={
+            "updated_at": now,
+            "sentiment": sentiment_enum,
+            "client_name": useful_context.get("client_name"),
+            "client_contact": client_contact,
+            "interaction_type": useful_context.get("interaction_type", "standard"),
+            "interaction_summary": useful_context.get("summary"),
+            "ai_generated_insights": useful_context.get("insights"),
+            "prompt_tokens": token_usage.get("prompt_tokens", 0),
+            "completion_tokens": token_usage.get("completion_tokens", 0),
+            "total_tokens": token_usage.get("total_tokens", 0),
+        },
+        sentiment=sentiment_enum,
+        # Os tokens já foram gastos na IA: sempre contabiliza; o bloqueio fica no pré-check do próximo turno
+        total_tokens=token_usage.get("total_tokens", 0) or 0,
+        client_contact=client_contact,
+        # Interação, cliente novo no dia e sentimento da conversa são contados no flush
+        daily_increments=daily_stats_increments(
+            new_interaction=False,
+            new_client=False,
+            token_usage=token_usage,
+            human_handoff=handoff,
+        ),
+    ))
 
 
 # ================ #
 
 # Retorna um chat existente ou cria um novo
-def get_or_create_chat(
-    session: Session,
+async def get_or_create_chat(
+    session: AsyncSession,
     company_id: int,
     whatsapp_id: Optional[str] = None,
     chat_code: Optional[str] = None
 ) -> Chat:
+    # Interaction e Sentiment são usados no fim do turno; carregados junto para evitar lazy load no async
+    chat_options = (selectinload(Chat.interaction), selectinload(Chat.sentiment))
+
     # Tenta buscar por whatsapp_id primeiro
     if whatsapp_id:
-        chatbot = session.exec(
+        chatbot = (await session.exec(
             select(Chat)
             .where(Chat.company_id == company_id)
             .where(Chat.whatsapp_id == whatsapp_id)
-        ).first()
+            .options(*chat_options)
+        )).first()
         if chatbot:
             return chatbot
 
     # Tenta buscar por chat_code
     if chat_code:
-        chatbot = session.exec(
+        chatbot = (await session.exec(
             select(Chat)
             .where(Chat.company_id == company_id)
             .where(Chat.chat_code == chat_code)
-        ).first()
+            .options(*chat_options)
+        )).first()
         if chatbot:
             return chatbot
         else:
@@ -269,11 +253,11 @@ def get_or_create_chat(
         company_id=company_id,
         whatsapp_id=whatsapp_id,
         chat_code=new_chat_code,
-        last_interaction_at=datetime.now(timezone.utc)
+        last_interaction_at=utc_now()
     )
     session.add(chatbot)
-    session.commit()
-    session.refresh(chatbot)
+    await session.commit()
+    await session.refresh(chatbot, attribute_names=["interaction", "sentiment"])
     return chatbot
 
 # ================ #
@@ -319,24 +303,53 @@ async def check_context_integrity(
 # ================ #
 
 # Carrega todos os dados do cache       
-async def load_all_cached_data(cache_manager, session, company_id: int) -> dict:
-    """Carrega todos os dados relacionados ao company_id de uma vez."""
-    
+async def load_all_cached_data(cache_manager, session, company_id: int, main_intent: Optional[ChatIntent] = None) -> dict:
+    """Carrega os dados do company_id que a intenção usa (todos, sem intenção).
+
+    Os conjuntos são carregados em paralelo: o primeiro usa a sessão da
+    requisição e os demais uma sessão própria cada (a AsyncSession não aceita
+    operações concorrentes; sem falta no cache, a sessão nem abre conexão).
+    Os conjuntos não usados pela intenção ficam None.
+    """
     data_map = {
-        "company_data": cache_manager.get_company_data,
-        "assistant_data": cache_manager.get_assistant_data,
-        "service_data": cache_manager.get_service_data,
-        "schedule_slots_data": cache_manager.get_schedule_slots_data,
-        "schedule_data": cache_manager.get_schedule_data,
+        "company": ("company_data", cache_manager.get_company_data),
+        "assistant": ("assistant_data", cache_manager.get_assistant_data),
+        "services": ("service_data", cache_manager.get_service_data),
+        "schedule_slots": ("schedule_slots_data", cache_manager.get_schedule_slots_data),
+        "schedule": ("schedule_data", cache_manager.get_schedule_data),
     }
+    datasets = ContextClassifier.datasets_for(main_intent)
+
+    # Versão lida uma vez antes das cargas paralelas (que então a encontram em memória)
+    await data_versions.current(session, company_id)
 
-    result = {}
-    for key, method in data_map.items():
-        result[key] = await method(session, company_id)
-        if result[key] is None:
+    async def load(dataset: str, own_session: bool):
+        method = data_map[dataset][1]
+        if not own_session:
+            return await method(session, company_id)
+        async with cache_manager.open_session() as dataset_session:
+            return await method(dataset_session, company_id)
+
+    values = await asyncio.gather(*(load(dataset, index > 0) for index, dataset in enumerate(datasets)))
+
+    result = {key: None for key, _ in data_map.values()}
+    for dataset, value in zip(datasets, values):
+        key = data_map[dataset][0]
+        result[key] = value
+        if value is None:
             log_func = logging.error if "company" in key or "assistant" in key else logging.warning
             log_func(f"CACHE >>> {key} é None")
 
+    # Projeções por intenção montadas uma vez por versão dos dados (ver CompanySnapshot)
+    result["snapshot"] = cache_manager.get_snapshot(
+        company_id,
+        result["company_data"],
+        result["assistant_data"],
+        result["service_data"],
+        result["schedule_data"],
+        result["schedule_slots_data"],
+        variant=ContextClassifier.intent_group(main_intent) or "all",
+    )
     return result
 
 # ================ #
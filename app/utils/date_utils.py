@@ -0,0 +1,19 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+
+def to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Converte para UTC e remove o fuso, como nas colunas DateTime (sem fuso) do banco.
+
+    O asyncpg recusa datetime com fuso em `timestamp without time zone`; todo
+    datetime gravado ou comparado pelo caminho assíncrono passa por aqui.
+    Valores sem fuso já são considerados UTC.
+    """
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def utc_now() -> datetime:
+    """Agora em UTC, sem fuso (ver `to_naive_utc`)."""
+    return to_naive_utc(datetime.now(timezone.utc))
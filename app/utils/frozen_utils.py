@@ -0,0 +1,54 @@
+from typing import Any
+
+
+class FrozenDict(dict):
+    """Dicionário somente leitura para dados compartilhados do cache.
+
+    Continua sendo um `dict` (json/orjson serializam normalmente e `copy()`
+    devolve um dict comum), mas qualquer alteração levanta TypeError em vez de
+    corromper silenciosamente a entrada usada pelos outros turnos do chat.
+    """
+
+    __slots__ = ()
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("FrozenDict é somente leitura; use copy() para obter um dict alterável")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        # deepcopy/pickle reconstroem pelo construtor (que não passa por __setitem__)
+        return (type(self), (dict(self),))
+
+    def __repr__(self) -> str:
+        return f"FrozenDict({dict.__repr__(self)})"
+
+
+class FrozenList(list):
+    """Lista somente leitura (mesma ideia do FrozenDict); compara igual a uma lista comum."""
+
+    __slots__ = ()
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("FrozenList é somente leitura; use copy() para obter uma lista alterável")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly
+    append = clear = extend = insert = pop = remove = reverse = sort = _readonly
+
+    def __reduce__(self):
+        return (type(self), (list(self),))
+
+    def __repr__(self) -> str:
+        return f"FrozenList({list.__repr__(self)})"
+
+
+def freeze(value: Any) -> Any:
+    """Cópia profunda imutável: dicts viram FrozenDict e listas, tuplas e conjuntos viram FrozenList."""
+    if isinstance(value, (FrozenDict, FrozenList)):
+        return value
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return FrozenList(freeze(item) for item in value)
+    return value
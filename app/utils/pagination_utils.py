@@ -0,0 +1,50 @@
+import base64
+import json
+from dataclasses import dataclass
+from typing import Optional
+from fastapi import HTTPException, Query, status
+from sqlmodel import Session
+from app.configuration.settings import Configuration
+
+configuration = Configuration()
+
+
+@dataclass
+class PageParams:
+    cursor: Optional[str]
+    limit: int
+
+
+def get_page_params(
+    cursor: Optional[str] = Query(None, description="Cursor devolvido em next_cursor pela página anterior"),
+    limit: Optional[int] = Query(None, ge=1, description="Itens por página (limitado a PAGE_MAX_LIMIT)"),
+) -> PageParams:
+    """Dependência com os parâmetros de paginação da listagem."""
+    limit = min(limit or configuration.page_default_limit, configuration.page_max_limit)
+    return PageParams(cursor=cursor, limit=limit)
+
+
+def encode_cursor(last_id: int) -> str:
+    raw = json.dumps({"id": last_id}).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        return int(json.loads(raw)["id"])
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor de paginação inválido")
+
+
+def paginate(session: Session, statement, model, page: PageParams) -> dict:
+    """Paginação por keyset usando o id (único e crescente) como chave de ordenação.
+
+    Busca limit + 1 linhas para saber se existe próxima página sem precisar de COUNT.
+    """
+    if page.cursor:
+        statement = statement.where(model.id > decode_cursor(page.cursor))
+    rows = session.exec(statement.order_by(model.id).limit(page.limit + 1)).all()
+
+    next_cursor = encode_cursor(rows[page.limit - 1].id) if len(rows) > page.limit else None
+    return {"items": rows[:page.limit], "next_cursor": next_cursor}
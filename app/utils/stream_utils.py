@@ -0,0 +1,128 @@
+import json
+from typing import Any
+
+
+def sse_event(event: str, data: Any) -> str:
+    """Evento Server-Sent Events com `data` em JSON (uma única linha)."""
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+class JsonStringFieldStream:
+    """Extrai, conforme o JSON chega em pedaços, o valor string de um campo de primeiro nível.
+
+    A IA responde `{"user_response": "...", "system_response": {...}}`; `feed`
+    devolve só o trecho novo de `user_response` já decodificado (escapes e
+    pares surrogate \\uXXXX incluídos), sem esperar o JSON terminar. Escapes
+    incompletos ficam no buffer até o próximo pedaço. Só a chave do objeto de
+    fora conta: um `user_response` dentro de `system_response` é ignorado.
+    """
+
+    _ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+    def __init__(self, field: str = "user_response"):
+        self._field = json.dumps(field)[1:-1]
+        self.buffer = ""
+        self.position = 0
+        self.state = "search"
+        # Estado da varredura até achar a chave: profundidade, string aberta e chave lida
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._key_slot = False
+        self._key = None
+        self._expect = None
+
+    @property
+    def done(self) -> bool:
+        return self.state == "done"
+
+    def feed(self, chunk: str) -> str:
+        self.buffer += chunk
+        if self.state == "search" and not self._search():
+            return ""
+        if self.state != "value":
+            return ""
+
+        out = []
+        buffer, i = self.buffer, self.position
+        while i < len(buffer):
+            char = buffer[i]
+            if char == '"':
+                self.state = "done"
+                i += 1
+                break
+            if char != "\\":
+                out.append(char)
+                i += 1
+                continue
+            if i + 1 >= len(buffer):
+                break
+            code = buffer[i + 1]
+            if code != "u":
+                out.append(self._ESCAPES.get(code, code))
+                i += 2
+                continue
+            # \uXXXX, com o par \uXXXX\uXXXX para caracteres fora do BMP
+            size = 12 if 0xD800 <= self._hex(buffer[i + 2:i + 6]) <= 0xDBFF else 6
+            if i + size > len(buffer):
+                break
+            try:
+                out.append(json.loads(f'"{buffer[i:i + size]}"'))
+            except ValueError:
+                out.append(buffer[i:i + size])
+            i += size
+        self.position = i
+        return "".join(out)
+
+    def _search(self) -> bool:
+        """Avança até o `"` que abre o valor do campo no primeiro nível; False se ainda não chegou."""
+        buffer, i = self.buffer, self.position
+        while i < len(buffer):
+            char = buffer[i]
+            i += 1
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._key is not None and "".join(self._key) == self._field:
+                        self._expect = ":"
+                    self._key = None
+                    continue
+                if self._key is not None:
+                    self._key.append(char)
+                continue
+            if char.isspace():
+                continue
+            if self._expect == ":" and char == ":":
+                self._expect = '"'
+                continue
+            if self._expect == '"' and char == '"':
+                self.position = i
+                self.state = "value"
+                return True
+            self._expect = None
+            if char == '"':
+                self._in_string = True
+                self._key = [] if self._key_slot else None
+                self._key_slot = False
+            elif char in "{[":
+                self._depth += 1
+                self._key_slot = char == "{" and self._depth == 1
+            elif char in "}]":
+                self._depth -= 1
+                self._key_slot = False
+            else:
+                self._key_slot = char == "," and self._depth == 1
+        self.position = i
+        return False
+
+    @staticmethod
+    def _hex(text: str) -> int:
+        try:
+            return int(text, 16) if len(text) == 4 else -1
+        except ValueError:
+            return -1
@@ -0,0 +1,85 @@
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import case, func, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.chat.assistant import Assistant
+from app.utils.date_utils import to_naive_utc
+
+
+def token_period_start(now: datetime) -> datetime:
+    """Início do período de cobrança de tokens (mensal) que contém `now`."""
+    return now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+class TokenBudget:
+    """Último uso/limite de tokens conhecido por empresa, em memória do processo.
+
+    Alimentado pelo RETURNING da contabilização de cada turno (e pelo cache do
+    assistente), permite recusar um turno sem limite disponível antes de chamar
+    a IA, sem consulta extra ao banco.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state: Dict[int, Tuple[int, Optional[int], Optional[datetime]]] = {}
+
+    def record(self, company_id: int, usage: Optional[int], limit: Optional[int], period: Optional[datetime]) -> None:
+        with self._lock:
+            self._state[company_id] = (usage or 0, limit, period)
+
+    def has_budget(self, company_id: int, now: datetime) -> bool:
+        with self._lock:
+            state = self._state.get(company_id)
+        if state is None:
+            return True
+        usage, limit, period = state
+        # Período novo: o contador zera no primeiro turno do mês
+        if period is None or to_naive_utc(period) < token_period_start(to_naive_utc(now)):
+            return True
+        return not limit or usage < limit
+
+
+token_budget = TokenBudget()
+
+
+async def consume_tokens(session: AsyncSession, company_id: int, tokens: int, now: datetime) -> Optional[Tuple[int, Optional[int]]]:
+    """Soma `tokens` ao uso do assistente com um único UPDATE ... RETURNING.
+
+    O incremento é feito no banco (usage = usage + n), então turnos concorrentes
+    não perdem contagem. O reset mensal é parte do mesmo UPDATE: se o período
+    gravado em assistant_token_reset_date é anterior ao atual, o contador
+    recomeça em `tokens`. Retorna (uso, limite) ou None se a empresa não tem assistente.
+    """
+    now = to_naive_utc(now)
+    period = token_period_start(now)
+    same_period = Assistant.assistant_token_reset_date >= period
+    statement = (
+        update(Assistant)
+        .where(Assistant.company_id == company_id)
+        .values(
+            assistant_token_usage=case(
+                (same_period, func.coalesce(Assistant.assistant_token_usage, 0) + tokens),
+                else_=tokens,
+            ),
+            assistant_token_reset_date=case(
+                (same_period, Assistant.assistant_token_reset_date),
+                else_=period,
+            ),
+            updated_at=now,
+        )
+        .returning(Assistant.assistant_token_usage, Assistant.assistant_token_limit)
+        .execution_options(synchronize_session=False)
+    )
+    row = (await session.exec(statement)).first()
+    if row is None:
+        return None
+
+    usage, limit = row
+    token_budget.record(company_id, usage, limit, period)
+    if limit and usage > limit:
+        logging.warning(f"CHAT >>> Limite de tokens excedido para company_id={company_id}: {usage}/{limit}")
+    return usage, limit
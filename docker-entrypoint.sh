@@ -0,0 +1,14 @@
+#!/bin/sh
+# Prepara o banco antes de subir a aplicação: o startup não cria mais tabelas nem faz o seed.
+#   DB_MIGRATE_ON_START=true  aplica as migrações (alembic upgrade head) e o seed inicial (ignorado se já populado)
+#   DB_MIGRATE_ON_START=false pula os dois; use quando a migração roda como etapa de release separada
+#                             (ex.: com várias réplicas: docker run <imagem> python -m app.database migrate)
+set -e
+
+if [ "${DB_MIGRATE_ON_START:-true}" = "true" ]; then
+    echo "BANCO DE DADOS >>> Aplicando migrações"
+    python -m app.database migrate
+    python -m app.database seed
+fi
+
+exec "$@"
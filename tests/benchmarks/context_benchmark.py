@@ -0,0 +1,156 @@
+# tests/benchmarks/context_benchmark.py
+#
+# Mede a latência de montagem do contexto do chat por intenção
+# (load_all_cached_data + build_chat_context + filter_context), com o cache
+# frio (consultas ao banco) e quente, num SQLite temporário com aiosqlite.
+# A linha "todos" carrega os cinco conjuntos, como antes do filtro por intenção.
+#
+#   python -m tests.benchmarks.context_benchmark --runs 50 --services 40 --slots 200
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+os.environ.setdefault("MERCADO_PAGO_ACCESS_TOKEN_TEST", "TEST-token")
+
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+import app.cache.cache_manager as cache_manager_module
+import app.utils.chat_utils as chat_utils_module
+from app.cache.cache import Cache
+from app.cache.cache_manager import CacheManager
+from app.cache.tiered_cache import TieredCache
+from app.cache.versions import DataVersions
+from app.enums.chat import ChatIntent
+from app.gateway.chatbot.nlp.context_classifier import ContextClassifier
+from app.models.chat.assistant import Assistant
+from app.models.company.company import Company
+from app.models.schedule.schedule import Schedule
+from app.models.schedule.schedule_slot import ScheduleSlot
+from app.models.service.category_service import CategoryService
+from app.models.service.service import Service
+from app.utils.chat_utils import build_chat_context, load_all_cached_data
+
+INTENTS = {
+    "WELCOME": ChatIntent.WELCOME,
+    "SERVICE_INFO": ChatIntent.SERVICE_INFO,
+    "SCHEDULE_INFO": ChatIntent.SCHEDULE_INFO,
+    "SCHEDULE_SLOT_INFO": ChatIntent.SCHEDULE_SLOT_INFO,
+    "todos": None,
+}
+
+
+def seed(path: str, services: int, slots: int, schedules: int) -> int:
+    engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(engine)
+    start = datetime(2026, 1, 5, 9)
+    with Session(engine) as session:
+        company = Company(name="Empresa", code="bench", cnpj="1", phone="1")
+        session.add(company)
+        session.commit()
+        session.add(Assistant(company_id=company.id, assistant_name="Ana"))
+        for c in range(max(1, services // 10)):
+            category = CategoryService(name=f"Categoria {c}", company_id=company.id)
+            session.add(category)
+            session.flush()
+            for s in range(10):
+                session.add(Service(
+                    name=f"Serviço {c}-{s}", description="Descrição", price=50, duration=30,
+                    company_id=company.id, category_id=category.id,
+                ))
+        for i in range(slots):
+            slot_start = start + timedelta(minutes=30 * i)
+            session.add(ScheduleSlot(start=slot_start, end=slot_start + timedelta(minutes=30), company_id=company.id))
+        for i in range(schedules):
+            session.add(Schedule(title=f"Agendamento {i}", start=start + timedelta(hours=i), company_id=company.id))
+        session.commit()
+        company_id = company.id
+    engine.dispose()
+    return company_id
+
+
+async def build_context(manager: CacheManager, session: AsyncSession, company_id: int, intent) -> None:
+    cached = await load_all_cached_data(manager, session, company_id, intent)
+    context = await build_chat_context(
+        data=SimpleNamespace(message="Olá"),
+        chatbot=SimpleNamespace(context_json={}, step="START"),
+        intents=[intent],
+        selected_intent=intent,
+        sentiment_str=None,
+        company_data=cached["company_data"],
+        assistant_data=cached["assistant_data"],
+        service_data=cached["service_data"],
+        schedule_data=cached["schedule_data"],
+        schedule_slots_data=cached["schedule_slots_data"],
+    )
+    ContextClassifier.filter_context(context, cached["snapshot"].projections)
+
+
+def fresh_manager(engine) -> CacheManager:
+    manager = CacheManager()
+    manager.cache = TieredCache(Cache(sweep_interval=0))
+    manager.snapshots = Cache(sweep_interval=0)
+    manager.session_factory = lambda: AsyncSession(engine, expire_on_commit=False)
+    return manager
+
+
+async def measure(path: str, company_id: int, runs: int) -> dict:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    results = {}
+    try:
+        for name, intent in INTENTS.items():
+            cold, warm = [], []
+            for _ in range(runs):
+                manager = fresh_manager(engine)
+                async with AsyncSession(engine, expire_on_commit=False) as session:
+                    started = time.perf_counter()
+                    await build_context(manager, session, company_id, intent)
+                    cold.append((time.perf_counter() - started) * 1000)
+
+                    started = time.perf_counter()
+                    await build_context(manager, session, company_id, intent)
+                    warm.append((time.perf_counter() - started) * 1000)
+            results[name] = (cold, warm)
+    finally:
+        await engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de montagem do contexto do chat por intenção")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--services", type=int, default=40)
+    parser.add_argument("--slots", type=int, default=200)
+    parser.add_argument("--schedules", type=int, default=100)
+    args = parser.parse_args()
+    # Os logs INFO por chave do cache dominariam a medição
+    logging.disable(logging.INFO)
+
+    # Versões só em memória: o benchmark não depende de Redis
+    versions = DataVersions(ttl=3600)
+    cache_manager_module.data_versions = versions
+    chat_utils_module.data_versions = versions
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "context.db")
+        company_id = seed(path, args.services, args.slots, args.schedules)
+        results = asyncio.run(measure(path, company_id, args.runs))
+
+    print(f"Execuções por intenção: {args.runs} | serviços {args.services} | slots {args.slots} | agendamentos {args.schedules}")
+    for name, (cold, warm) in results.items():
+        print(
+            f"{name:<20} frio: mediana {statistics.median(cold):7.2f} ms | max {max(cold):7.2f} ms"
+            f"   quente: mediana {statistics.median(warm):6.3f} ms | max {max(warm):6.3f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+# tests/benchmarks/startup_benchmark.py
+#
+# Mede o cold start da aplicação (imports + create_app) em processos novos,
+# como acontece em cada instância criada pelo autoscaling.
+#
+#   python -m tests.benchmarks.startup_benchmark --runs 10
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+SNIPPET = (
+    "import time; started = time.perf_counter(); "
+    "from app import create_app; app = create_app(); "
+    "print(time.perf_counter() - started, app.state.startup_seconds)"
+)
+
+
+def run_once() -> tuple:
+    output = subprocess.run(
+        [sys.executable, "-c", SNIPPET], capture_output=True, text=True, check=True
+    ).stdout.strip().splitlines()[-1]
+    total, create_app = output.split()
+    return float(total), float(create_app)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de cold start da aplicação")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    results = [run_once() for _ in range(args.runs)]
+    totals = [r[0] * 1000 for r in results]
+    create_apps = [r[1] * 1000 for r in results]
+
+    print(f"Execuções: {args.runs}")
+    print(f"Cold start (imports + create_app): mediana {statistics.median(totals):.1f} ms | min {min(totals):.1f} ms | max {max(totals):.1f} ms")
+    print(f"create_app(): mediana {statistics.median(create_apps):.1f} ms | min {min(create_apps):.1f} ms | max {max(create_apps):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+import os
+
+# O SDK do Mercado Pago é criado no import de app.api e exige um token em string
+os.environ.setdefault("MERCADO_PAGO_ACCESS_TOKEN_TEST", "TEST-token")
+os.environ.setdefault("MERCADO_PAGO_ACCESS_TOKEN_PROD", "APP_USR-token")
+
+import asyncio
+import json
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+import app.api.routes.chat.token_status as token_status_module
+import app.gateway.chatbot.providers.IA.deepseek as deepseek_module
+import app.gateway.chatbot.providers.IA.openai as openai_module
+import app.models  # noqa: F401
+from app.gateway.chatbot.providers.IA.deepseek import DeepSeekProvider
+from app.gateway.http_client import SharedHttpClient
+
+
+@contextmanager
+def _count_queries(engine):
+    """Conta os comandos SQL enviados pelo engine (sync ou async) dentro do bloco."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.fixture
+def count_queries():
+    return _count_queries
+
+
+class SqliteDatabase:
+    """Banco SQLite temporário com todas as tabelas, acessível pelo engine sync e pelo aiosqlite.
+
+    `engine` (sync) serve para popular o banco e para as rotas síncronas;
+    `async_engine()` abre um engine aiosqlite sobre o mesmo arquivo e o
+    descarta ao sair, dentro do event loop do teste.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.engine = create_engine(f"sqlite:///{path}")
+        SQLModel.metadata.create_all(self.engine)
+
+    @asynccontextmanager
+    async def async_engine(self):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{self.path}")
+        try:
+            yield engine
+        finally:
+            await engine.dispose()
+
+    @staticmethod
+    def sessions(engine) -> async_sessionmaker:
+        return async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    def dispose(self) -> None:
+        self.engine.dispose()
+
+
+@pytest.fixture
+def sqlite_db(tmp_path):
+    database = SqliteDatabase(tmp_path / "test.db")
+    yield database
+    database.dispose()
+
+
+class FakeRedis:
+    """Redis assíncrono em memória para os testes (subconjunto de comandos usado pelo cache)."""
+
+    def __init__(self):
+        self.data = {}
+        self.fail = False
+        self.commands = []
+
+    def _run(self, command, *args):
+        self.commands.append((command, *args))
+        if self.fail:
+            from redis.exceptions import ConnectionError
+            raise ConnectionError("redis fora do ar")
+
+    async def get(self, key):
+        self._run("get", key)
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self._run("set", key)
+        self.data[key] = value
+        return True
+
+    async def delete(self, *keys):
+        self._run("delete", *keys)
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+
+@pytest.fixture
+def fake_redis():
+    return FakeRedis()
+
+
+class StubAIServer:
+    """Servidor HTTP local que imita a API de chat completions e o /auth/key do OpenRouter.
+
+    Registra cada requisição (caminho e porta de origem, para contar conexões) e
+    os corpos recebidos, e responde após `delay` segundos; `status` força um
+    código de erro. Pedidos com `stream: true` recebem o conteúdo em
+    `stream_chunks` eventos SSE, espaçados por `chunk_delay` segundos.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.payloads = []
+        self.delay = 0.0
+        self.status = 200
+        self.content = {"user_response": "Olá! Como posso ajudar?", "system_response": {}}
+        self.stream_chunks = 8
+        self.chunk_delay = 0.0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, payload):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(stub.status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                stub.requests.append((self.path, self.client_address[1]))
+                self._reply({"data": {"label": "stub", "usage": 1.5, "limit": 10, "is_free_tier": False, "rate_limit": {"requests": 10, "interval": "10s"}}})
+
+            def _stream(self):
+                content = json.dumps(stub.content, ensure_ascii=False)
+                size = max(1, -(-len(content) // stub.stream_chunks))
+                self.send_response(stub.status)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+                for start in range(0, len(content), size):
+                    chunk = {"choices": [{"delta": {"content": content[start:start + size]}}]}
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                    time.sleep(stub.chunk_delay)
+                usage = {"choices": [], "usage": {"prompt_tokens": 40, "completion_tokens": 10, "total_tokens": 50}}
+                self.wfile.write(f"data: {json.dumps(usage)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                stub.requests.append((self.path, self.client_address[1]))
+                stub.payloads.append(json.loads(body or b"{}"))
+                time.sleep(stub.delay)
+                if stub.payloads[-1].get("stream"):
+                    return self._stream()
+                self._reply({
+                    "model": stub.payloads[-1].get("model"),
+                    "choices": [{"message": {"content": json.dumps(stub.content)}}],
+                    "usage": {"prompt_tokens": 40, "completion_tokens": 10, "total_tokens": 50},
+                })
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def connections(self) -> int:
+        return len({port for _, port in self.requests})
+
+
+@pytest.fixture
+def stub_ai_server():
+    server = StubAIServer()
+    server.thread.start()
+    try:
+        yield server
+    finally:
+        server.server.shutdown()
+        server.server.server_close()
+
+
+def _ai_context(message: str = "oi", **assistant) -> dict:
+    """Contexto mínimo de um turno para os provedores de IA (assistente Ana do Salão, sem histórico)."""
+    return {
+        "user_message": message,
+        "step": "start",
+        "history": [],
+        "intents": [],
+        "data": {"assistant": {"name": "Ana", "type": "BOT", **assistant}, "company": {"name": "Salão"}},
+    }
+
+
+@pytest.fixture
+def ai_context():
+    return _ai_context
+
+
+class StubProvider:
+    """Provedores de IA apontados para o `stub_ai_server` por um `SharedHttpClient` do próprio teste.
+
+    O cliente substitui o compartilhado no DeepSeek, no OpenAI e na verificação
+    de token, e as URLs da configuração passam a ser a do stub. Como o cliente
+    pertence ao event loop que o usou, o teste roda as corrotinas por `run()`,
+    no loop da fixture, que fecha o cliente no teardown. Ajustes do pool
+    (ex.: `client.max_per_host`) valem se feitos antes da primeira chamada.
+    """
+
+    def __init__(self, server: StubAIServer, monkeypatch):
+        self.server = server
+        self.loop = asyncio.new_event_loop()
+        self.client = SharedHttpClient(timeout=5, http2=False)
+        for module in (deepseek_module, openai_module, token_status_module):
+            monkeypatch.setattr(module, "http_client", self.client)
+        monkeypatch.setattr(deepseek_module.config, "deepseek_url", server.url)
+        monkeypatch.setattr(openai_module.config, "openai_base_url", server.url)
+        monkeypatch.setattr(token_status_module.configuration, "openai_base_url", server.url)
+
+    def deepseek(self, breaker=None):
+        """DeepSeekProvider novo apontado para o stub; `breaker` troca o circuit breaker padrão."""
+        provider = DeepSeekProvider()
+        provider.model, provider.api_key = "stub-model", "chave"
+        if breaker is not None:
+            provider.breaker = breaker
+        return provider
+
+    def run(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    def close(self) -> None:
+        try:
+            self.run(self.client.aclose())
+        finally:
+            self.loop.close()
+
+
+@pytest.fixture
+def stub_provider(stub_ai_server, monkeypatch):
+    provider = StubProvider(stub_ai_server, monkeypatch)
+    try:
+        yield provider
+    finally:
+        provider.close()
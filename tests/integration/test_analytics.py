@@ -0,0 +1,169 @@
+import asyncio
+from datetime import date, datetime
+from types import SimpleNamespace
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import text
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app.api.routes.analytics.analytics import AnalyticsRouter
+from app.enums.chat import ChatIntent
+from app.models.analytics.company_daily_client import CompanyDailyClient
+from app.models.analytics.company_daily_stats import CompanyDailyStats
+from app.models.chat.chat import Chat
+from app.models.company.company import Company
+
+
+def test_report_metrics_come_from_daily_rollup(tmp_path):
+    """As métricas do relatório são a soma do consolidado diário, com janela de datas; clientes únicos são distintos no período.
+
+    Sentimentos somam as interações (uma por conversa) e a média de tokens é por mensagem.
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'analytics.db'}")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        company = Company(name="Empresa", code="analytics", cnpj="1", phone="1")
+        session.add(company)
+        session.commit()
+        for day, interactions, positive, negative, handoffs in (
+            (date(2026, 3, 1), 2, 1, 1, 1),
+            (date(2026, 3, 2), 1, 0, 1, 0),
+            (date(2026, 3, 5), 1, 1, 0, 1),
+        ):
+            session.add(CompanyDailyStats(
+                company_id=company.id, day=day, interactions=interactions, unique_clients=1, messages=4 * interactions,
+                total_tokens=100 * interactions, sentiment_positive_count=positive,
+                sentiment_negative_count=negative, human_handoffs=handoffs,
+                last_interaction_at=datetime.combine(day, datetime.min.time()),
+            ))
+        # O mesmo cliente em dois dias conta uma vez no período
+        for day, contact in ((date(2026, 3, 1), "A"), (date(2026, 3, 2), "A"), (date(2026, 3, 5), "B")):
+            session.add(CompanyDailyClient(company_id=company.id, day=day, client_contact=contact))
+        session.commit()
+
+        router = AnalyticsRouter()
+        metrics = router._calculate_metrics(session, company.id, assistant=None)
+        assert metrics["total_interactions"] == 4
+        assert metrics["unique_clients"] == 2
+        assert metrics["human_attendances"] == 2
+        assert metrics["sentiments"] == {"POSITIVE": 2, "NEUTRAL": 0, "NEGATIVE": 2}
+        assert sum(metrics["sentiments"].values()) == metrics["total_interactions"]
+        assert metrics["last_interaction"] == datetime(2026, 3, 5)
+
+        window = router._calculate_metrics(session, company.id, None, start=date(2026, 3, 1), end=date(2026, 3, 2))
+        assert window["total_interactions"] == 3
+        assert window["unique_clients"] == 1
+        assert window["sentiments"] == {"POSITIVE": 1, "NEUTRAL": 0, "NEGATIVE": 2}
+
+        assistant = SimpleNamespace(
+            assistant_token_usage=400, assistant_token_limit=1000, assistant_token_reset_date=None,
+            assistant_name="Ana", assistant_type="BOT", assistant_model="deepseek-chat",
+        )
+        assert router._calculate_metrics(session, company.id, assistant)["avg_tokens"] == 25
+
+        daily = router.get_daily_stats(company.id, start=date(2026, 3, 2), end=None, session=session)
+        assert [row.day for row in daily] == [date(2026, 3, 2), date(2026, 3, 5)]
+    engine.dispose()
+
+
+def test_chat_turns_upsert_daily_rollup(sqlite_db, monkeypatch):
+    """Cada turno de chat soma no consolidado do dia, sem duplicar interação ou cliente; o sentimento conta por conversa."""
+    from app.database.write_behind import write_behind
+    from app.utils.chat_utils import get_or_create_chat, update_interaction_and_assistant
+
+    def turn(contact, intent=ChatIntent.WELCOME):
+        return {
+            "client_contact": contact,
+            "main_intent": intent,
+            "token_usage": {"prompt_tokens": 7, "completion_tokens": 3, "total_tokens": 10},
+        }
+
+    async def run():
+        async with sqlite_db.async_engine() as engine:
+            sessions = sqlite_db.sessions(engine)
+            monkeypatch.setattr(write_behind, "session_factory", sessions)
+
+            async with sessions() as session:
+                company = Company(name="Empresa", code="rollup", cnpj="1", phone="1")
+                session.add(company)
+                await session.commit()
+                company_id = company.id
+
+            async def chat_turn(chat_code, sentiment, useful_context):
+                # Como em cada requisição do chat: sessão nova, chat recarregado, escrita na fila
+                async with sessions() as session:
+                    chat = await get_or_create_chat(session, company_id, chat_code=chat_code)
+                    await update_interaction_and_assistant(session, chat, company_id, sentiment, useful_context)
+                await write_behind.flush()
+                return chat.chat_code
+
+            first = await chat_turn(None, "positive", turn(None))
+            await chat_turn(first, "negative", turn("11999990000"))
+            await chat_turn(first, "neutral", turn("11999990000", ChatIntent.TRANSFER_HUMAN))
+            # A conversa já está com humano: pedir de novo não conta outra transferência
+            await chat_turn(first, "neutral", turn("11999990000", ChatIntent.TRANSFER_HUMAN))
+
+            # Outro chat do mesmo cliente no mesmo dia não conta cliente novo
+            await chat_turn(None, "positive", turn("11999990000"))
+            await write_behind.stop()
+
+            async with sessions() as session:
+                chat = (await session.exec(select(Chat).where(Chat.chat_code == first))).one()
+                clients = (await session.exec(select(CompanyDailyClient.client_contact))).all()
+                return (await session.exec(select(CompanyDailyStats))).one(), chat, clients
+
+    stats, chat, clients = asyncio.run(run())
+
+    assert stats.interactions == 2
+    assert stats.unique_clients == 1
+    assert clients == ["11999990000"]
+    assert stats.total_tokens == 50
+    assert stats.prompt_tokens == 35
+    assert stats.messages == 5
+    # Primeiro chat: positivo, negativo e dois neutros -> neutro no fim; o segundo, positivo
+    assert (stats.sentiment_positive_count, stats.sentiment_negative_count, stats.sentiment_neutral_count) == (1, 0, 1)
+    assert stats.human_handoffs == 1
+    assert chat.human_attendance is True
+
+
+def test_daily_stats_backfill_uses_the_rollup_units(tmp_path):
+    """A migração 0003 conta o sentimento final de cada conversa e um turno (com tokens) por interação, como o chat."""
+    db_url = f"sqlite:///{tmp_path / 'backfill.db'}"
+    config = Config("alembic.ini")
+    config.set_main_option("sqlalchemy.url", db_url)
+    command.upgrade(config, "0002")
+
+    engine = create_engine(db_url)
+    with engine.begin() as connection:
+        connection.execute(text(
+            "INSERT INTO tb_company (id, code, name, is_open, status, created_at) "
+            "VALUES (1, 'c', 'Empresa', 'OPEN', 'ACTIVE', '2026-03-01 08:00:00')"
+        ))
+        # Três conversas no dia: a última mensagem da primeira foi positiva, mas no conjunto ela é negativa
+        for chat_id, last_sentiment, final_sentiment, tokens in ((1, "POSITIVE", "NEGATIVE", 30), (2, "NEUTRAL", "POSITIVE", 10), (3, "NEGATIVE", None, 20)):
+            connection.execute(text(
+                "INSERT INTO tb_chat (id, company_id, last_interaction_at, created_at, updated_at) "
+                "VALUES (:id, 1, '2026-03-01 09:00:00', '2026-03-01 09:00:00', '2026-03-01 09:00:00')"
+            ), {"id": chat_id})
+            connection.execute(text(
+                "INSERT INTO tb_interaction (company_id, chat_id, channel, sentiment, total_tokens, created_at) "
+                "VALUES (1, :chat_id, 'CHATBOT', :sentiment, :tokens, '2026-03-01 09:00:00')"
+            ), {"chat_id": chat_id, "sentiment": last_sentiment, "tokens": tokens})
+            if final_sentiment:
+                connection.execute(text(
+                    "INSERT INTO tb_sentiment (id, chat_id, sentiment_positive_count, sentiment_negative_count, "
+                    "sentiment_neutral_count, final_sentiment) VALUES (:id, :chat_id, 0, 0, 0, :sentiment)"
+                ), {"id": str(chat_id), "chat_id": chat_id, "sentiment": final_sentiment})
+    engine.dispose()
+
+    command.upgrade(config, "0003")
+    engine = create_engine(db_url)
+    with engine.connect() as connection:
+        row = connection.execute(text(
+            "SELECT interactions, messages, total_tokens, sentiment_positive_count, "
+            "sentiment_negative_count, sentiment_neutral_count FROM tb_company_daily_stats"
+        )).one()
+    engine.dispose()
+
+    assert tuple(row) == (3, 3, 60, 1, 2, 0)
@@ -0,0 +1,154 @@
+import asyncio
+
+from app.cache.cache import Cache, approximate_size
+from app.cache.cache_manager import CacheManager
+from app.cache.tiered_cache import TieredCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_cache_is_bounded_by_entries_and_bytes():
+    """Acima do limite de entradas ou de bytes, sai a entrada usada há mais tempo."""
+    cache = Cache(max_entries=2, max_bytes=10_000, sweep_interval=0)
+    cache.set("chat_data_company_info_1", {"name": "A"})
+    cache.set("chat_data_company_info_2", {"name": "B"})
+    assert cache.get("chat_data_company_info_1") == {"name": "A"}
+
+    cache.set("chat_data_company_info_3", {"name": "C"})
+    assert cache.get("chat_data_company_info_2") is None
+    assert cache.get("chat_data_company_info_1") is not None
+
+    big = {"services": ["x" * 100] * 20}
+    budget = Cache(max_entries=100, max_bytes=approximate_size(big) + 200, sweep_interval=0)
+    budget.set("chat_data_service_data_1", {"small": 1})
+    budget.set("chat_data_service_data_2", big)
+    assert budget.get("chat_data_service_data_1") is None
+    assert budget.stats()["bytes"] <= budget.max_bytes
+
+    # Valor maior que o orçamento inteiro não é armazenado
+    budget.set("chat_data_service_data_3", {"services": ["x" * 100] * 40})
+    assert budget.get("chat_data_service_data_3") is None
+
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["prefixes"]["chat_data_company_info"] == {"hits": 2, "misses": 1, "expirations": 0, "evictions": 1}
+
+
+def test_cache_expires_on_read_and_on_sweep():
+    clock = FakeClock()
+    cache = Cache(max_entries=10, max_bytes=10_000, sweep_interval=0, clock=clock)
+    cache.set("schedules_1", {"events_data": []}, ttl=60)
+    cache.set("schedules_2", {"events_data": []}, ttl=600)
+
+    clock.now += 61
+    assert cache.get("schedules_1") is None
+    clock.now += 600
+    assert cache.sweep() == 1
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["bytes"] == 0
+    assert cache.stats()["prefixes"]["schedules"]["expirations"] == 2
+
+
+def test_cache_manager_invalidates_schedule_slots():
+    """A invalidação remove a mesma chave que get_schedule_slots_data grava."""
+    manager = CacheManager()
+    manager.cache = TieredCache(Cache(max_entries=10, max_bytes=10_000, sweep_interval=0))
+    cache_key = manager.get_cache_key("schedule_slots_7")
+
+    async def run():
+        await manager.cache_data(cache_key, {"slots": [], "last_updated": "2026-01-01T00:00:00"})
+        assert await manager.load_cached_data(cache_key) is not None
+        await manager.invalidate_schedule_slots_cache(7)
+        return await manager.load_cached_data(cache_key)
+
+    assert asyncio.run(run()) is None
+
+
+def test_workers_share_l2_and_survive_redis_outage(fake_redis):
+    """Um worker preenche o L2 e o outro lê dele; sem Redis, o cache segue só com o L1."""
+    workers = []
+    for _ in range(2):
+        manager = CacheManager()
+        manager.cache = TieredCache(Cache(max_entries=10, max_bytes=10_000, sweep_interval=0), redis=fake_redis, l1_ttl=30)
+        workers.append(manager)
+    first, second = workers
+
+    async def run():
+        company = {"name": "Empresa", "work_days": ["seg", "ter"], "social_media": {}}
+        await first.cache_data("company_info_1", company)
+        assert await second.load_cached_data("company_info_1") == company
+        # Segunda leitura vem do L1 do worker, sem ir ao Redis
+        reads = len(fake_redis.commands)
+        assert await second.load_cached_data("company_info_1") == company
+        assert len(fake_redis.commands) == reads
+
+        await first.cache.delete(first.get_cache_key("company_info_1"))
+        assert await first.load_cached_data("company_info_1") is None
+
+        fake_redis.fail = True
+        await first.cache_data("company_info_2", company)
+        assert await first.load_cached_data("company_info_2") == company
+        assert first.cache.stats()["l2"]["errors"] == 1
+        assert not first.cache.stats()["l2"]["available"]
+
+    asyncio.run(run())
+    assert fake_redis.data.keys() == set()
+
+
+def test_l2_waits_for_a_free_redis_connection_instead_of_failing(monkeypatch):
+    """Mais leituras simultâneas que conexões no pool esperam a vez; o L2 não é desligado."""
+    import redis.asyncio
+
+    from app.configuration.settings import Configuration
+
+    connections, busy, peak = [0], [0], [0]
+
+    async def handle(reader, writer):
+        connections[0] += 1
+        try:
+            while True:
+                header = await reader.readline()
+                if not header:
+                    return
+                args = []
+                for _ in range(int(header[1:])):
+                    size = int((await reader.readline())[1:])
+                    args.append((await reader.readexactly(size + 2))[:-2])
+                if args[0].upper() != b"GET":
+                    writer.write(b"+OK\r\n")
+                    continue
+                busy[0] += 1
+                peak[0] = max(peak[0], busy[0])
+                await asyncio.sleep(0.01)
+                busy[0] -= 1
+                writer.write(b"$-1\r\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def run():
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        monkeypatch.setenv("REDIS_HOST", "127.0.0.1")
+        monkeypatch.setenv("REDIS_PORT", str(server.sockets[0].getsockname()[1]))
+        monkeypatch.setenv("REDIS_MAX_CONNECTIONS", "4")
+        client = redis.asyncio.Redis(connection_pool=Configuration().async_redis_pool())
+        cache = TieredCache(Cache(max_entries=100, max_bytes=100_000, sweep_interval=0), redis=client)
+        try:
+            results = await asyncio.gather(*(cache.get(f"chave_{i}") for i in range(40)))
+        finally:
+            await client.aclose()
+            server.close()
+            await server.wait_closed()
+        return cache, results
+
+    cache, results = asyncio.run(run())
+    assert results == [None] * 40
+    stats = cache.stats()["l2"]
+    assert (stats["misses"], stats["errors"], stats["available"]) == (40, 0, True)
+    assert connections[0] == 4 and peak[0] <= 4
@@ -0,0 +1,136 @@
+import asyncio
+import json
+
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.routes.service.service import ServiceRouter
+from app.cache.cache import Cache
+from app.cache.cache_manager import CacheManager
+from app.cache.invalidation import (
+    ASSISTANT_INFO, COMPANY_INFO, SCHEDULE_SLOTS, SERVICE_DATA, CacheInvalidator, cache_invalidator,
+)
+from app.cache.tiered_cache import TieredCache
+from app.cache.versions import SET_VERSION_IF_GREATER, DataVersions
+from app.models.chat.assistant import Assistant
+from app.models.company.company import Company
+from app.models.service.category_service import CategoryService
+from app.models.service.service import Service
+from app.schemas.service.service import ServiceUpdate
+
+
+class SyncFakeRedis:
+    def __init__(self):
+        self.published = []
+        self.deleted = []
+        self.values = {}
+        self.scripts = []
+
+    def register_script(self, script):
+        # Só o script de versão é usado: reproduz o "grava se maior" do Lua
+        self.scripts.append(script)
+
+        def run(keys, args):
+            current = self.values.get(keys[0])
+            if current is None or current < args[0]:
+                self.values[keys[0]] = args[0]
+            return self.values[keys[0]]
+        return run
+
+    def publish(self, channel, message):
+        self.published.append((channel, message))
+        return 1
+
+    def delete(self, *keys):
+        self.deleted.extend(keys)
+        return len(keys)
+
+
+def test_cache_hits_are_zero_query_until_crud_invalidates(sqlite_db, count_queries):
+    """Acerto de cache não consulta o banco; o CRUD invalida e a próxima leitura vê o dado novo."""
+    sync_engine = sqlite_db.engine
+    with Session(sync_engine) as session:
+        company = Company(name="Empresa", code="invalidation", cnpj="1", phone="1")
+        session.add(company)
+        session.commit()
+        category = CategoryService(name="Cortes", company_id=company.id)
+        session.add(category)
+        session.add(Assistant(company_id=company.id, assistant_name="A"))
+        session.commit()
+        service = Service(name="Corte", description="-", price=10.0, company_id=company.id, category_id=category.id)
+        session.add(service)
+        session.commit()
+        company_id, service_id = company.id, service.id
+
+    # O cache do processo é compartilhado entre testes: começa limpo para esta empresa
+    cache_invalidator.invalidate(company_id, COMPANY_INFO, ASSISTANT_INFO, SERVICE_DATA, SCHEDULE_SLOTS)
+    manager = CacheManager()
+
+    async def read_all(session):
+        return [
+            await manager.get_company_data(session, company_id),
+            await manager.get_assistant_data(session, company_id),
+            await manager.get_service_data(session, company_id),
+            await manager.get_schedule_slots_data(session, company_id),
+        ]
+
+    async def run():
+        async with sqlite_db.async_engine() as engine:
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                await read_all(session)
+                with count_queries(engine) as statements:
+                    cached = await read_all(session)
+                assert statements == []
+
+                with Session(sync_engine) as crud_session:
+                    ServiceRouter().update_service(company_id, service_id, ServiceUpdate(price=25.0), session=crud_session)
+                with count_queries(engine) as statements:
+                    services = await manager.get_service_data(session, company_id)
+                assert statements
+                return cached, services
+
+    cached, services = asyncio.run(run())
+    assert cached[2][0]["services"][0]["price"] == 10.0
+    assert services[0]["services"][0]["price"] == 25.0
+
+
+def test_invalidation_fans_out_to_other_workers():
+    """O evento publicado apaga o L1 dos outros workers e registra a latência."""
+    redis = SyncFakeRedis()
+    workers = [
+        CacheInvalidator(TieredCache(Cache(max_entries=10, max_bytes=10_000, sweep_interval=0)), redis=redis)
+        for _ in range(2)
+    ]
+    first, second = workers
+    key = CacheManager().company_cache_key(SERVICE_DATA, 3)
+    for worker in workers:
+        worker.cache.l1.set(key, [{"category_id": 1}])
+
+    first.invalidate(3, SERVICE_DATA)
+    assert first.cache.l1.get(key) is None
+    assert second.cache.l1.get(key) is not None
+    assert redis.deleted == [first.cache.namespace + key]
+
+    _, message = redis.published[0]
+    first.handle_message(message)  # o próprio evento é ignorado
+    second.handle_message(message)
+    assert second.cache.l1.get(key) is None
+    assert first.stats()["received"] == 0
+    stats = second.stats()
+    assert stats["received"] == 1
+    assert stats["latency_ms_max"] >= stats["latency_ms_last"] >= 0
+
+
+def test_redis_version_never_goes_back_when_publishes_finish_out_of_order():
+    """A escrita N pode publicar antes da N-1: o Redis fica com N, como DataVersions.observe em memória."""
+    redis = SyncFakeRedis()
+    versions = DataVersions(ttl=60)
+    invalidator = CacheInvalidator(TieredCache(Cache(max_entries=10, max_bytes=10_000, sweep_interval=0)), redis=redis, versions=versions)
+
+    invalidator.invalidate(3, COMPANY_INFO, version=5)
+    invalidator.invalidate(3, COMPANY_INFO, version=4)
+
+    assert redis.scripts == [SET_VERSION_IF_GREATER]
+    assert redis.values == {f"{versions.namespace}3": 5}
+    assert versions.known(3) == 5
+    assert [json.loads(message)["version"] for _, message in redis.published] == [5, 4]
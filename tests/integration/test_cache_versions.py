@@ -0,0 +1,106 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+import app.api.routes.company.company as company_routes
+import app.cache.cache_manager as cache_manager_module
+from app.api.routes.admin.company import CompanyRouter as AdminCompanyRouter
+from app.api.routes.company.company import CompanyRouter
+from app.api.routes.schedule.schedule import ScheduleRouter
+from app.cache.cache import Cache
+from app.cache.cache_manager import CacheManager
+from app.cache.invalidation import cache_invalidator
+from app.cache.tiered_cache import TieredCache
+from app.cache.versions import DataVersions
+from app.models.company.company import Company
+from app.models.plan.plan import Plan
+from app.schemas.schedule.schedule import ScheduleCreate
+
+
+def test_schedule_cache_is_validated_by_data_version(sqlite_db, monkeypatch, count_queries):
+    """O acerto compara a versão em memória (sem consulta); a escrita incrementa a versão e o cache é remontado."""
+    versions = DataVersions(ttl=60)
+    monkeypatch.setattr(cache_manager_module, "data_versions", versions)
+    monkeypatch.setattr(cache_invalidator, "versions", versions)
+    manager = CacheManager()
+    manager.cache = TieredCache(Cache(max_entries=10, max_bytes=100_000, sweep_interval=0))
+
+    sync_engine = sqlite_db.engine
+    with Session(sync_engine) as session:
+        company = Company(name="Empresa", code="versions", cnpj="1", phone="1")
+        session.add(company)
+        session.commit()
+        company_id = company.id
+
+    def book(title: str) -> None:
+        with Session(sync_engine) as session:
+            ScheduleRouter().create_schedule(
+                ScheduleCreate(title=title, start=datetime(2026, 5, 10, 9), company_id=company_id),
+                session=session,
+            )
+
+    async def run():
+        async with sqlite_db.async_engine() as engine:
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                book("Corte")
+                # Worker que ainda não viu a versão lê uma vez do banco e depois da memória
+                cold = DataVersions(ttl=60)
+                assert [await cold.current(session, company_id) for _ in range(2)] == [1, 1]
+                assert cold.stats()["db_reads"] == 1
+
+                first = await manager.get_schedule_data(session, company_id)
+                with count_queries(engine) as statements:
+                    cached = await manager.get_schedule_data(session, company_id)
+                assert statements == []
+                assert cached == first
+
+                book("Barba")
+                with count_queries(engine) as statements:
+                    refreshed = await manager.get_schedule_data(session, company_id)
+                assert len(statements) == 1  # só a consulta da agenda; a versão já está em memória
+                return first, refreshed
+
+    first, refreshed = asyncio.run(run())
+    with Session(sync_engine) as session:
+        assert session.get(Company, company_id).data_version == 2
+
+    assert [event["title"] for event in first["events_data"]] == ["Corte"]
+    assert [event["title"] for event in refreshed["events_data"]] == ["Corte", "Barba"]
+    assert versions.stats() == {"memory_reads": 3, "redis_reads": 0, "db_reads": 0, "companies": 1}
+
+
+def test_company_writes_bump_the_data_version(sqlite_db, monkeypatch):
+    """Logo, plano e exclusão da empresa também incrementam a versão e a divulgam ao invalidar o cache."""
+    versions = DataVersions(ttl=60)
+    monkeypatch.setattr(cache_invalidator, "versions", versions)
+    monkeypatch.setattr(company_routes, "remove_logo_company", lambda url: None)
+
+    with Session(sqlite_db.engine) as session:
+        company = Company(name="Empresa", code="writes", cnpj="1", phone="1", logo_url="logo.png")
+        other = Company(name="Outra", code="writes-2", cnpj="2", phone="2")
+        plan = Plan(name="Plano", price=10.0)
+        session.add_all([company, other, plan])
+        session.commit()
+        company_id, other_id, plan_id = company.id, other.id, plan.id
+
+    def version_of(company_id: int) -> int:
+        with Session(sqlite_db.engine) as session:
+            return session.get(Company, company_id).data_version
+
+    router = CompanyRouter()
+    with Session(sqlite_db.engine) as session:
+        router.remove_logo(company_id, session=session)
+    assert version_of(company_id) == versions.known(company_id) == 1
+    with Session(sqlite_db.engine) as session:
+        router.associate_plan(company_id, plan_id, session=session)
+    assert version_of(company_id) == versions.known(company_id) == 2
+
+    admin = SimpleNamespace(is_admin=True)
+    with Session(sqlite_db.engine) as session:
+        router.delete_company(company_id, session=session, current_user=admin)
+    with Session(sqlite_db.engine) as session:
+        AdminCompanyRouter().delete_company(other_id, session=session, current_user=admin)
+    assert (versions.known(company_id), versions.known(other_id)) == (3, 1)
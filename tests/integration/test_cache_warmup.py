@@ -0,0 +1,118 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlmodel import Session
+
+import app.cache.cache_manager as cache_manager_module
+from app.api.routes.company import home as home_module
+from app.api.routes.company.home import HomeRouter
+from app.cache.cache import Cache
+from app.cache.cache_manager import CacheManager
+from app.cache.single_flight import SingleFlight
+from app.cache.tiered_cache import TieredCache
+from app.cache.versions import DataVersions
+from app.cache.warmup import CacheWarmer
+from app.models.chat.chat import Chat
+from app.models.company.company import Company
+
+
+def test_warmup_loads_recent_tenants_with_bounded_concurrency(sqlite_db, monkeypatch, count_queries):
+    """Só as empresas com conversa recente são aquecidas; /ready libera ao fim e a renovação só remonta o que vence."""
+    monkeypatch.setattr(cache_manager_module, "data_versions", DataVersions(ttl=60))
+    monkeypatch.setattr(cache_manager_module, "single_flight", SingleFlight())
+    manager = CacheManager()
+    manager.cache = TieredCache(Cache(max_entries=100, max_bytes=1_000_000, sweep_interval=0))
+
+    now = datetime.now(timezone.utc)
+    with Session(sqlite_db.engine) as session:
+        companies = [Company(name=f"Empresa {i}", code=f"warm-{i}", cnpj=str(i), phone=str(i)) for i in range(4)]
+        session.add_all(companies)
+        session.commit()
+        for i, company in enumerate(companies):
+            # A última empresa só conversou há três dias
+            last = now - (timedelta(days=3) if i == 3 else timedelta(minutes=i))
+            session.add(Chat(company_id=company.id, chat_code=f"chat-{i}", last_interaction_at=last))
+        session.commit()
+        company_ids = [company.id for company in companies]
+
+    warmer = CacheWarmer(manager, window_minutes=60, max_companies=10, concurrency=2, refresh_interval=0, enabled=True)
+    monkeypatch.setattr(home_module, "cache_warmer", warmer)
+    with pytest.raises(HTTPException) as exc:
+        HomeRouter().ready()
+    assert exc.value.status_code == 503
+
+    running, peak = [0], [0]
+    warm_company = warmer.warm_company
+
+    async def tracked(company_id):
+        running[0] += 1
+        peak[0] = max(peak[0], running[0])
+        try:
+            await asyncio.sleep(0.01)
+            await warm_company(company_id)
+        finally:
+            running[0] -= 1
+
+    monkeypatch.setattr(warmer, "warm_company", tracked)
+
+    async def run():
+        async with sqlite_db.async_engine() as engine:
+            manager.session_factory = sqlite_db.sessions(engine)
+            warmer.start()
+            await warmer._task
+            with count_queries(engine) as fresh_statements:
+                await warmer.refresh()
+            manager.refresh_ahead = 10 * 3600
+            with count_queries(engine) as expiring_statements:
+                await warmer.refresh()
+        return fresh_statements, expiring_statements
+
+    fresh_statements, expiring_statements = asyncio.run(run())
+
+    assert warmer.ready and HomeRouter().ready() == {"ready": True}
+    assert warmer.stats()["warmed_companies"] == 3
+    assert peak[0] == 2
+    warmed = [manager.cache.l1.get(manager.company_cache_key("company_info", company_id)) is not None for company_id in company_ids]
+    assert warmed == [True, True, True, False]
+
+    # Entradas ainda longe de vencer: a renovação só lista as empresas
+    assert len(fresh_statements) == 1
+    # Todas vencendo dentro do prazo: cada empresa recente é remontada
+    assert sum("FROM tb_company" in s for s in expiring_statements) == 3
+
+
+def test_new_turn_in_an_old_chat_makes_the_company_recent(sqlite_db, monkeypatch):
+    """O turno atualiza Chat.last_interaction_at, que é o que a seleção do aquecimento consulta."""
+    from app.database.write_behind import write_behind
+    from app.utils.chat_utils import get_or_create_chat, update_interaction_and_assistant
+
+    with Session(sqlite_db.engine) as session:
+        company = Company(name="Empresa", code="warm-old", cnpj="1", phone="1")
+        session.add(company)
+        session.commit()
+        chat = Chat(company_id=company.id, chat_code="chat-old", last_interaction_at=datetime.now(timezone.utc) - timedelta(days=3))
+        session.add(chat)
+        session.commit()
+        company_id = company.id
+
+    warmer = CacheWarmer(CacheManager(), window_minutes=60, enabled=False)
+
+    async def run():
+        async with sqlite_db.async_engine() as engine:
+            sessions = sqlite_db.sessions(engine)
+            monkeypatch.setattr(write_behind, "session_factory", sessions)
+            async with sessions() as session:
+                before = await warmer.recent_companies(session)
+            async with sessions() as session:
+                chat = await get_or_create_chat(session, company_id, chat_code="chat-old")
+                await update_interaction_and_assistant(session, chat, company_id, "neutral", {"token_usage": {}})
+            await write_behind.flush()
+            async with sessions() as session:
+                after = await warmer.recent_companies(session)
+        return before, after
+
+    before, after = asyncio.run(run())
+    assert company_id not in before
+    assert company_id in after
@@ -0,0 +1,81 @@
+import asyncio
+import json
+import time
+
+import app.gateway.chatbot.engine.generate_response as engine_module
+from app.gateway.chatbot.engine.generate_response import stream_generated, stream_response
+from app.gateway.chatbot.providers.chatbot_provider_factory import ProviderRegistry
+from app.utils.stream_utils import JsonStringFieldStream, sse_event
+
+
+def test_json_field_stream_decodes_user_response_across_chunks():
+    """O user_response é liberado conforme chega, com escapes partidos entre pedaços."""
+    text = 'Olá "Ana"\nPreço: R$ 30 😀'
+    document = json.dumps({"system_response": {"function": "no_action"}, "user_response": text, "x": 1})
+    for size in (1, 2, 5):
+        fields = JsonStringFieldStream("user_response")
+        pieces = [fields.feed(document[i:i + size]) for i in range(0, len(document), size)]
+        assert "".join(pieces) == text
+        assert fields.done
+    assert sse_event("token", {"text": "Olá"}) == 'event: token\ndata: {"text": "Olá"}\n\n'
+
+
+def test_json_field_stream_ignores_nested_keys_with_the_same_name():
+    """Só o user_response do objeto de fora é liberado, mesmo com a chave repetida dentro de outro objeto ou string."""
+    document = json.dumps({
+        "note": '"user_response": "não"',
+        "system_response": {"function": "no_action", "user_response": "aninhado", "items": [{"user_response": "x"}]},
+        "user_response": "real",
+    })
+    for size in (1, 3, len(document)):
+        fields = JsonStringFieldStream("user_response")
+        pieces = [fields.feed(document[i:i + size]) for i in range(0, len(document), size)]
+        assert "".join(pieces) == "real"
+        assert fields.done
+
+
+def test_stream_emits_tokens_before_the_completion_finishes(monkeypatch, stub_ai_server, stub_provider, ai_context):
+    """Os trechos de user_response chegam antes do fim da geração; o system_response vem no evento final."""
+    monkeypatch.setattr(engine_module, "provider_registry", ProviderRegistry(default="deepseek"))
+    stub_ai_server.content = {
+        "user_response": "Temos corte e escova. Quer ver os horários?",
+        "system_response": {"function": "no_action"},
+    }
+    stub_ai_server.stream_chunks = 10
+    stub_ai_server.chunk_delay = 0.05
+
+    async def run():
+        started = time.perf_counter()
+        events = []
+        async for event in stream_response(ai_context("Quais serviços vocês têm?")):
+            events.append((time.perf_counter() - started, event))
+        return events
+
+    events = stub_provider.run(run())
+
+    tokens = [(at, event["text"]) for at, event in events if event["type"] == "token"]
+    done_at, done = events[-1]
+    assert done["type"] == "done" and [e for _, e in events].count(done) == 1
+    assert "".join(text for _, text in tokens) == "Temos corte e escova. Quer ver os horários?"
+    assert len(tokens) > 3
+    # Primeiro trecho bem antes do fim da geração (10 pedaços de 50ms)
+    assert tokens[0][0] < done_at - 0.2
+
+    useful_context = done["response"]["useful_context"]
+    assert useful_context["user_response"] == "Temos corte e escova. Quer ver os horários?"
+    assert useful_context["system_response"] == {"function": "no_action"}
+    assert useful_context["token_usage"]["total_tokens"] == 50
+    assert stub_ai_server.payloads[0]["stream"] is True
+
+
+def test_ready_responses_stream_as_a_single_chunk():
+    """Respostas do cache (ou do gerador fake) viram um único trecho seguido do evento final."""
+    response = {"useful_context": {"user_response": "Abrimos às 9h."}, "status": 200, "cached": True}
+
+    async def run():
+        return [event async for event in stream_generated(response)]
+
+    assert asyncio.run(run()) == [
+        {"type": "token", "text": "Abrimos às 9h."},
+        {"type": "done", "response": response},
+    ]
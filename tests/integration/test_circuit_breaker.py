@@ -0,0 +1,82 @@
+import time
+
+from app.gateway.circuit_breaker import CircuitBreaker
+
+
+def fallback_reason(response: dict) -> str:
+    return response["useful_context"]["useful_context"]["metadata"]["reason"]
+
+
+def test_breaker_opens_on_error_rate_and_adapts_timeout_to_p95():
+    """Falhas e chamadas lentas abrem o circuito; após o intervalo, uma chamada de teste decide se ele fecha."""
+    clock = [0.0]
+    breaker = CircuitBreaker(
+        "teste", window=60, min_calls=4, error_rate=0.5, slow_call=5, open_seconds=30,
+        min_timeout=1, max_timeout=15, timeout_factor=2, retries=0, backoff=0, clock=lambda: clock[0],
+    )
+
+    # Sem amostras suficientes vale o timeout máximo
+    assert breaker.timeout() == 15
+    for latency in (0.4, 0.5, 0.6, 2.0):
+        breaker.record(True, latency)
+    assert breaker.timeout() == 4.0
+
+    breaker.record(True, 6.0)  # lenta: conta como falha
+    breaker.record(False)
+    breaker.record(False)
+    assert breaker.state == "closed"
+    breaker.record(False)
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    clock[0] = 31
+    assert breaker.state == "half_open"
+    assert breaker.allow() and not breaker.allow()
+    breaker.record(True, 0.3)
+    assert breaker.state == "closed" and breaker.allow()
+
+    stats = breaker.stats()
+    assert (stats["opened"], stats["rejected"], stats["failures"]) == (1, 2, 4)
+    assert stats["state"] == "closed" and stats["window_calls"] == 0
+
+
+def test_provider_retries_transient_errors_then_fails_fast_while_open(stub_ai_server, stub_provider, ai_context):
+    """503 é repetido com backoff; com o circuito aberto a resposta padrão sai na hora, sem chamar o provedor."""
+    provider = stub_provider.deepseek(CircuitBreaker("deepseek", min_calls=3, error_rate=0.5, open_seconds=60, max_timeout=5, retries=2, backoff=0.01))
+    stub_ai_server.status = 503
+
+    async def run():
+        failed = await provider.generate_response(ai_context())
+        requests_after_failure = len(stub_ai_server.requests)
+
+        started = time.perf_counter()
+        rejected = await provider.generate_response(ai_context())
+        streamed = [event async for event in provider.stream_response(ai_context())]
+        elapsed = time.perf_counter() - started
+        return failed, requests_after_failure, rejected, streamed, elapsed
+
+    failed, requests_after_failure, rejected, streamed, elapsed = stub_provider.run(run())
+
+    # Uma chamada e dois retries, todas 503: o circuito abre
+    assert requests_after_failure == 3
+    assert fallback_reason(failed) == "internal_error"
+    assert provider.breaker.state == "open"
+
+    # Aberto: nenhuma requisição nova e fallback de indisponibilidade imediato
+    assert len(stub_ai_server.requests) == 3
+    assert elapsed < 0.1
+    assert fallback_reason(rejected) == "chatbot_unavailable"
+    assert [event["type"] for event in streamed] == ["done"]
+    assert fallback_reason(streamed[0]["response"]) == "chatbot_unavailable"
+    stats = provider.breaker.stats()
+    assert (stats["retries"], stats["rejected"], stats["opened"]) == (2, 2, 1)
+
+
+def test_client_errors_are_not_retried(stub_ai_server, stub_provider, ai_context):
+    """Erros do pedido (4xx) falham sem retry: repetir não mudaria a resposta."""
+    provider = stub_provider.deepseek(CircuitBreaker("deepseek", retries=2, backoff=0.01))
+    stub_ai_server.status = 400
+
+    assert fallback_reason(stub_provider.run(provider.generate_response(ai_context()))) == "internal_error"
+    assert len(stub_ai_server.requests) == 1
+    assert provider.breaker.stats()["retries"] == 0
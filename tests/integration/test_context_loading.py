@@ -0,0 +1,67 @@
+import asyncio
+
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+import app.cache.cache_manager as cache_manager_module
+import app.utils.chat_utils as chat_utils_module
+from app.cache.cache import Cache
+from app.cache.cache_manager import CacheManager
+from app.cache.single_flight import SingleFlight
+from app.cache.tiered_cache import TieredCache
+from app.cache.versions import DataVersions
+from app.enums.chat import ChatIntent
+from app.models.chat.assistant import Assistant
+from app.models.company.company import Company
+from app.models.service.category_service import CategoryService
+from app.models.service.service import Service
+from app.utils.chat_utils import load_all_cached_data
+
+
+def test_context_loading_fetches_only_what_the_intent_uses(sqlite_db, monkeypatch, count_queries):
+    """WELCOME carrega só empresa e assistente; os conjuntos da intenção vêm em paralelo, com sessões próprias."""
+    versions = DataVersions(ttl=60)
+    monkeypatch.setattr(cache_manager_module, "data_versions", versions)
+    monkeypatch.setattr(chat_utils_module, "data_versions", versions)
+    monkeypatch.setattr(cache_manager_module, "single_flight", SingleFlight())
+    manager = CacheManager()
+    manager.cache = TieredCache(Cache(max_entries=50, max_bytes=1_000_000, sweep_interval=0))
+    manager.snapshots = Cache(max_entries=50, max_bytes=1_000_000, sweep_interval=0)
+
+    with Session(sqlite_db.engine) as session:
+        company = Company(name="Empresa", code="context", cnpj="1", phone="1")
+        session.add(company)
+        session.commit()
+        category = CategoryService(name="Cabelo", company_id=company.id)
+        session.add(category)
+        session.commit()
+        session.add(Service(name="Corte", description="Corte simples", price=30, duration=30, company_id=company.id, category_id=category.id))
+        session.add(Assistant(company_id=company.id, assistant_name="Ana"))
+        session.commit()
+        company_id = company.id
+
+    async def run():
+        async with sqlite_db.async_engine() as engine:
+            manager.session_factory = sqlite_db.sessions(engine)
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                with count_queries(engine) as welcome_statements:
+                    welcome = await load_all_cached_data(manager, session, company_id, ChatIntent.WELCOME)
+                with count_queries(engine) as service_statements:
+                    services = await load_all_cached_data(manager, session, company_id, ChatIntent.SERVICE_INFO)
+                with count_queries(engine) as cached_statements:
+                    again = await load_all_cached_data(manager, session, company_id, ChatIntent.SERVICE_INFO)
+            return welcome, welcome_statements, services, service_statements, again, cached_statements
+
+    welcome, welcome_statements, services, service_statements, again, cached_statements = asyncio.run(run())
+
+    assert welcome["company_data"]["name"] == "Empresa" and welcome["assistant_data"]["name"] == "Ana"
+    assert welcome["service_data"] is None and welcome["schedule_data"] is None and welcome["schedule_slots_data"] is None
+    assert not any("tb_category_service" in s or "tb_schedule" in s for s in welcome_statements)
+
+    assert services["service_data"][0]["services"][0]["name"] == "Corte"
+    assert any("tb_category_service" in s for s in service_statements)
+    assert not any("tb_company" in s for s in service_statements)
+
+    assert cached_statements == []
+    assert again["snapshot"] is services["snapshot"]
+    assert welcome["snapshot"] is not services["snapshot"]
@@ -0,0 +1,71 @@
+import asyncio
+import json
+
+import pytest
+
+from app.cache.cache import Cache
+from app.cache.cache_manager import CacheManager
+from app.cache.tiered_cache import TieredCache
+from app.enums.chat import ChatIntent
+from app.gateway.chatbot.nlp.context_classifier import ContextClassifier
+
+
+def test_snapshot_projections_are_shared_and_never_mutate_the_cache():
+    """As projeções são montadas uma vez por snapshot; filtrar o contexto não altera o que está no cache."""
+    manager = CacheManager()
+    manager.cache = TieredCache(Cache(max_entries=20, max_bytes=100_000, sweep_interval=0))
+    manager.snapshots = Cache(max_entries=20, max_bytes=100_000, sweep_interval=0)
+
+    async def fill():
+        company = await manager.cache_data("company_info_1", {"name": "Empresa", "is_open": "OPEN", "status": "ACTIVE"})
+        assistant = await manager.cache_data("assistant_info_1", {"name": "Ana", "status": "ONLINE", "type": "BOT", "model": "x"})
+        services = await manager.cache_data("service_data_1", [
+            {"category_id": 1, "category_name": "Cabelo", "services": [{"id": 7, "name": "Corte", "price": 30, "image": "a.png"}]},
+            {"category_id": 2, "category_name": "Vazia", "services": []},
+        ])
+        schedule = await manager.cache_data("schedules_1", {"events_data": [{
+            "id": "abc", "title": "Corte", "start": "2026-05-10T09:00:00", "end": None, "color": None, "allDay": False,
+            "extendedProps": {"status": "CONFIRMED", "customerName": "João", "companyId": 1},
+        }]})
+        slots = (await manager.cache_data("schedule_slots_1", {"slots": [{"public_id": "s1", "start": "a", "end": "b", "company_id": 1}]}))["slots"]
+        return company, assistant, services, schedule, slots
+
+    parts = asyncio.run(fill())
+    before = json.dumps(parts)
+    snapshot = manager.get_snapshot(1, *parts)
+    assert manager.get_snapshot(1, *parts) is snapshot
+
+    services_context = ContextClassifier.filter_context({"main_intent": ChatIntent.SERVICE_INFO, "data": dict(snapshot.data)}, snapshot.projections)
+    assert services_context["data"] == {
+        "company": {"name": "Empresa", "is_open": "OPEN"},
+        "assistant": {"name": "Ana", "status": "ONLINE", "type": "BOT", "model": "x"},
+        "services": [{"category_name": "Cabelo", "services": [{"id": 7, "name": "Corte", "price": 30}]}],
+    }
+    assert services_context["data"]["services"] is snapshot.projections[ContextClassifier.SERVICES]["services"]
+
+    schedule_context = ContextClassifier.filter_context({"main_intent": ChatIntent.SCHEDULE_INFO, "data": {}}, snapshot.projections)
+    assert schedule_context["data"]["schedule"][0]["public_id"] == "abc"
+    assert schedule_context["data"]["schedule"][0]["customer_name"] == "João"
+    assert "schedule_slots" not in schedule_context["data"]
+
+    basic_context = ContextClassifier.filter_context(
+        {"main_intent": ChatIntent.WELCOME, "data": {}, "profanity_analysis": {}}, snapshot.projections
+    )
+    assert set(basic_context["data"]) == {"company", "assistant"} and "profanity_analysis" not in basic_context
+
+    # Os providers podem completar campos no nível de cima; os dados compartilhados são imutáveis
+    basic_context["data"]["services"] = {}
+    with pytest.raises(TypeError):
+        services_context["data"]["company"]["name"] = "Outra"
+    assert "services" not in snapshot.projections[ContextClassifier.BASIC]
+    assert json.dumps(parts) == before
+
+    # Sem projeções, o mesmo resultado é calculado a partir de context["data"]
+    fallback = ContextClassifier.filter_context({"main_intent": ChatIntent.SERVICE_INFO, "data": dict(snapshot.data)})
+    assert fallback["data"] == services_context["data"]
+
+    # Uma parte remontada pelo cache gera outro snapshot
+    company = asyncio.run(manager.cache_data("company_info_1", {"name": "Nova", "is_open": "OPEN"}))
+    rebuilt = manager.get_snapshot(1, company, *parts[1:])
+    assert rebuilt is not snapshot
+    assert rebuilt.for_intent(ChatIntent.WELCOME)["company"]["name"] == "Nova"
@@ -0,0 +1,151 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import Depends, FastAPI, Request
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlmodel import Session, SQLModel, create_engine, select
+
+import app.database.connection as connection_module
+import app.middleware.db_session as db_session_module
+from app.database.connection import (
+    ReplicaHealth, SessionTracker, async_pool_stats, get_async_engine, get_async_session, get_db, get_engine, get_pool_status, get_session,
+    pool_stats, session_scope,
+)
+from app.middleware.db_session import SessionLeakMiddleware
+from app.models.company.company import Company
+
+
+@pytest.fixture
+def primary_db(sqlite_db, monkeypatch):
+    """Engine do processo (get_engine) apontando para o SQLite do teste, recriado e descartado a cada teste."""
+    monkeypatch.setattr(connection_module.configuration, "get_database_url", lambda: f"sqlite:///{sqlite_db.path}")
+    monkeypatch.setattr(connection_module, "_engine", None)
+    tracker = SessionTracker(hold_threshold=10)
+    monkeypatch.setattr(connection_module, "session_tracker", tracker)
+    monkeypatch.setattr(db_session_module, "session_tracker", tracker)
+    yield sqlite_db
+    if connection_module._engine is not None:
+        connection_module._engine.dispose()
+
+
+def test_engine_is_built_once_and_pool_counters_follow_checkouts(primary_db):
+    """get_engine devolve sempre o mesmo engine; o checkout aparece no status do pool e é devolvido ao fechar a sessão."""
+    engine = get_engine()
+    assert get_engine() is engine
+    assert isinstance(engine.pool, connection_module.InstrumentedQueuePool)
+
+    checkouts = pool_stats.snapshot()["checkouts_total"]
+    with session_scope("teste") as session:
+        session.exec(text("SELECT 1"))
+        during = get_pool_status()
+    after = get_pool_status()
+
+    assert (during["checked_out"], during["sessions_open"]) == (1, 1)
+    assert (after["checked_out"], after["sessions_open"]) == (0, 0)
+    assert after["checked_in"] == 1
+    assert after["checkouts_total"] == checkouts + 1
+    assert after["wait_max_ms"] >= after["wait_avg_ms"] >= 0
+
+
+def test_request_sessions_are_closed_and_leaks_are_reported(primary_db):
+    """A sessão do Depends(get_session) fecha com a resposta; uma sessão deixada aberta é contada como vazada."""
+    app = FastAPI()
+    app.add_middleware(SessionLeakMiddleware)
+
+    @app.get("/ok")
+    def ok(session=Depends(get_session)):
+        return {"value": session.exec(text("SELECT 1")).scalar()}
+
+    @app.get("/vaza")
+    def leak(request: Request):
+        # Sessão aberta fora do get_session e nunca fechada
+        session = connection_module.SessionLocal()
+        connection_module._track_request_session(request, session)
+        return {"value": session.exec(text("SELECT 1")).scalar()}
+
+    tracker = connection_module.session_tracker
+    with TestClient(app) as client:
+        assert client.get("/ok").json() == {"value": 1}
+        assert tracker.snapshot()["sessions_leaked"] == 0
+        assert client.get("/vaza").json() == {"value": 1}
+
+    status = get_pool_status()
+    assert status["sessions_leaked"] == 1
+    assert status["sessions_open"] == 1
+
+    # Retenção acima do limite é contada ao fechar
+    tracker.hold_threshold = 0
+    with session_scope("lenta"):
+        pass
+    assert tracker.snapshot()["sessions_long_held"] == 1
+
+
+def test_async_session_dependency_uses_the_shared_async_engine(primary_db, monkeypatch):
+    """Depends(get_async_session) abre a sessão no engine assíncrono do processo e a fecha com a resposta."""
+    monkeypatch.setattr(connection_module.configuration, "get_async_database_url", lambda: f"sqlite+aiosqlite:///{primary_db.path}")
+    monkeypatch.setattr(connection_module, "_async_engine", None)
+    app = FastAPI()
+    app.add_middleware(SessionLeakMiddleware)
+
+    @app.get("/async")
+    async def read(session=Depends(get_async_session)):
+        return {"value": (await session.exec(text("SELECT 1"))).scalar()}
+
+    async def run():
+        checkouts = async_pool_stats.snapshot()["checkouts_total"]
+        engine = get_async_engine()
+        try:
+            assert get_async_engine() is engine
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://teste") as client:
+                responses = [(await client.get("/async")).json() for _ in range(3)]
+            return responses, checkouts, get_pool_status()
+        finally:
+            await engine.dispose()
+
+    responses, checkouts, status = asyncio.run(run())
+    assert responses == [{"value": 1}] * 3
+    assert status["async"]["checked_out"] == 0
+    assert status["async"]["checkouts_total"] == checkouts + 3
+    assert (status["sessions_open"], status["sessions_leaked"]) == (0, 0)
+
+
+def test_readonly_sessions_fall_back_to_primary_when_replica_lags_or_is_down(primary_db, tmp_path, monkeypatch):
+    """Réplica em dia atende a leitura; atrasada além do limite ou inacessível, a leitura vai para o primário."""
+    replica_path = tmp_path / "replica.db"
+    for path, name in ((primary_db.path, "primario"), (replica_path, "replica")):
+        engine = create_engine(f"sqlite:///{path}")
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as session:
+            session.add(Company(name=name, code=name, cnpj="1", phone="1"))
+            session.commit()
+        engine.dispose()
+
+    health = ReplicaHealth(max_lag=5, check_interval=0)
+    monkeypatch.setattr(connection_module.configuration, "db_replica_url", f"sqlite:///{replica_path}")
+    monkeypatch.setattr(connection_module, "_replica_engine", None)
+    monkeypatch.setattr(connection_module, "replica_health", health)
+    app = FastAPI()
+
+    @app.get("/leitura")
+    def read(session=Depends(get_db(readonly=True))):
+        return session.exec(select(Company.name)).one()
+
+    def read_with_lag(query):
+        health.LAG_QUERY = query
+        return client.get("/leitura").json()
+
+    try:
+        with TestClient(app) as client:
+            assert read_with_lag(text("SELECT 0.5")) == "replica"
+            assert read_with_lag(text("SELECT 30")) == "primario"
+            lagging = health.snapshot()
+            # SQLite não tem pg_is_in_recovery: a consulta original falha como uma réplica fora do ar
+            assert read_with_lag(ReplicaHealth.LAG_QUERY) == "primario"
+            down = get_pool_status()["replica"]
+    finally:
+        connection_module._replica_engine.dispose()
+
+    assert (lagging["healthy"], lagging["lag_s"]) == (False, 30)
+    assert (down["healthy"], down["lag_s"], down["fallbacks_to_primary"]) == (False, None, 2)
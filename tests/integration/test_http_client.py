@@ -0,0 +1,61 @@
+import asyncio
+import time
+
+from app.api.routes.chat.token_status import TokenStatusRouter
+
+
+def test_provider_calls_share_one_pooled_connection(stub_ai_server, stub_provider, ai_context):
+    """Chamadas seguidas reaproveitam a mesma conexão keep-alive; as simultâneas não bloqueiam o event loop."""
+    client = stub_provider.client
+    client.max_per_host = 10
+    provider = stub_provider.deepseek()
+
+    async def run():
+        sequential = [await provider.generate_response(ai_context(f"oi {i}")) for i in range(3)]
+        status = await TokenStatusRouter().check_deepseek_status("chave")
+        connections = stub_ai_server.connections()
+
+        stub_ai_server.delay = 0.2
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticking = asyncio.create_task(ticker())
+        started = time.perf_counter()
+        await asyncio.gather(*(provider.generate_response(ai_context()) for _ in range(3)))
+        elapsed = time.perf_counter() - started
+        ticking.cancel()
+        return sequential, status, connections, elapsed, ticks
+
+    sequential, status, connections, elapsed, ticks = stub_provider.run(run())
+
+    assert [r["useful_context"]["user_response"] for r in sequential] == ["Olá! Como posso ajudar?"] * 3
+    assert sequential[0]["useful_context"]["token_usage"]["total_tokens"] == 50
+    assert status["credits_used"] == 1.5
+    assert [path for path, _ in stub_ai_server.requests[:4]] == ["/chat/completions"] * 3 + ["/auth/key"]
+    # Três chamadas à IA e a verificação de token pela mesma conexão
+    assert connections == 1
+    # As três chamadas de 0.2s correm juntas e o loop segue atendendo outras tarefas
+    assert elapsed < 0.5
+    assert ticks >= 10
+    assert client.stats()["clients_created"] == 1
+    assert client.stats()["requests"] == 7
+
+
+def test_per_host_limit_queues_extra_requests(stub_ai_server, stub_provider, ai_context):
+    """Acima de HTTP_MAX_PER_HOST chamadas simultâneas ao mesmo host, as excedentes esperam vaga."""
+    stub_provider.client.max_per_host = 1
+    stub_ai_server.delay = 0.1
+    provider = stub_provider.deepseek()
+
+    async def run():
+        started = time.perf_counter()
+        await asyncio.gather(*(provider.generate_response(ai_context()) for _ in range(3)))
+        return time.perf_counter() - started
+
+    assert stub_provider.run(run()) >= 0.3
+    assert stub_ai_server.connections() == 1
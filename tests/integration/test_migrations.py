@@ -0,0 +1,23 @@
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine
+from sqlmodel import SQLModel
+
+import app.models  # noqa: F401
+
+
+def test_migrations_match_models(tmp_path):
+    """As migrações do Alembic devem gerar exatamente o schema dos modelos."""
+    db_url = f"sqlite:///{tmp_path / 'migrations.db'}"
+    config = Config("alembic.ini")
+    config.set_main_option("sqlalchemy.url", db_url)
+
+    command.upgrade(config, "head")
+
+    engine = create_engine(db_url)
+    with engine.connect() as connection:
+        diff = compare_metadata(MigrationContext.configure(connection), SQLModel.metadata)
+
+    assert diff == []
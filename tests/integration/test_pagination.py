@@ -0,0 +1,39 @@
+import pytest
+from fastapi import HTTPException
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app.models.company.company import Company
+from app.utils.pagination_utils import PageParams, paginate
+
+
+@pytest.fixture
+def session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pagination.db'}")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        for i in range(7):
+            session.add(Company(name=f"Empresa {i}", code=f"code-{i}", cnpj=str(i), phone=str(i)))
+        session.commit()
+        yield session
+    engine.dispose()
+
+
+def test_paginate_walks_all_rows_once(session):
+    """Seguindo next_cursor, cada linha aparece exatamente uma vez, em ordem de id."""
+    seen, cursor = [], None
+    while True:
+        page = paginate(session, select(Company), Company, PageParams(cursor=cursor, limit=3))
+        assert len(page["items"]) <= 3
+        seen.extend(company.id for company in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == sorted(seen)
+    assert len(seen) == len(set(seen)) == 7
+
+
+def test_paginate_rejects_invalid_cursor(session):
+    with pytest.raises(HTTPException) as error:
+        paginate(session, select(Company), Company, PageParams(cursor="não-é-cursor", limit=3))
+    assert error.value.status_code == 400
@@ -0,0 +1,89 @@
+import asyncio
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.cache.warmup import CacheWarmer
+from app.database.write_behind import WriteBehindQueue
+from app.enums.chat import ChatIntent
+from app.models.analytics.company_daily_stats import CompanyDailyStats
+from app.models.chat.assistant import Assistant
+from app.models.chat.chat import Chat
+from app.models.chat.interaction import Interaction
+from app.models.company.company import Company
+from app.utils.chat_utils import get_or_create_chat, reset_chatbot_count, update_interaction_and_assistant
+from app.utils.date_utils import to_naive_utc, utc_now
+from app.utils.token_utils import consume_tokens
+
+
+def test_to_naive_utc_converts_offsets_and_keeps_naive_values():
+    """Datetimes com fuso viram UTC sem tzinfo; os sem fuso (já UTC) passam direto."""
+    brasilia = timezone(timedelta(hours=-3))
+    assert to_naive_utc(datetime(2026, 5, 10, 9, tzinfo=brasilia)) == datetime(2026, 5, 10, 12)
+    assert to_naive_utc(datetime(2026, 5, 10, 12)) == datetime(2026, 5, 10, 12)
+    assert to_naive_utc(None) is None
+    assert utc_now().tzinfo is None
+
+
+def test_chat_turn_runs_against_postgres(monkeypatch):
+    """Um turno completo pelo asyncpg: o asyncpg recusa datetime com fuso em coluna sem fuso."""
+    db_url = os.getenv("TEST_POSTGRES_URL")
+    if not db_url:
+        pytest.skip("TEST_POSTGRES_URL não definida")
+
+    config = Config("alembic.ini")
+    config.set_main_option("sqlalchemy.url", db_url)
+    command.upgrade(config, "head")
+
+    from app.database.write_behind import write_behind
+
+    async def run():
+        engine = create_async_engine(db_url.replace("postgresql://", "postgresql+asyncpg://", 1))
+        sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        queue = WriteBehindQueue(flush_interval=60, max_batch=100, max_retries=0)
+        queue.session_factory = sessions
+        monkeypatch.setattr(write_behind, "submit", queue.submit)
+        try:
+            async with sessions() as session:
+                company = Company(name="Empresa", code=f"pg-{uuid.uuid4().hex[:8]}", cnpj="1", phone="1")
+                session.add(company)
+                await session.commit()
+                session.add(Assistant(company_id=company.id, assistant_name="A", assistant_token_reset_date=datetime(2026, 1, 1)))
+                await session.commit()
+                company_id = company.id
+
+            async with sessions() as session:
+                chat = await get_or_create_chat(session, company_id)
+                reset_chatbot_count(chat)
+                chat.interaction_count += 1
+                chat.updated_at = utc_now()
+                await update_interaction_and_assistant(session, chat, company_id, "positive", {
+                    "client_contact": "11999990000",
+                    "main_intent": ChatIntent.WELCOME,
+                    "token_usage": {"prompt_tokens": 7, "completion_tokens": 3, "total_tokens": 10},
+                })
+            assert await queue.flush() == 1
+
+            async with sessions() as session:
+                assert await consume_tokens(session, company_id, 5, datetime.now(timezone.utc)) is not None
+                await session.commit()
+                recent = await CacheWarmer(None, window_minutes=60, enabled=False).recent_companies(session)
+                interaction = (await session.exec(select(Interaction).where(Interaction.chat_id == chat.id))).one()
+                stats = (await session.exec(select(CompanyDailyStats).where(CompanyDailyStats.company_id == company_id))).one()
+                saved = await session.get(Chat, chat.id)
+                return company_id, recent, interaction, stats, saved
+        finally:
+            await engine.dispose()
+
+    company_id, recent, interaction, stats, chat = asyncio.run(run())
+    assert company_id in recent
+    assert interaction.total_tokens == 10 and interaction.created_at.tzinfo is None
+    assert stats.interactions == 1 and stats.total_tokens == 10
+    assert chat.interaction_count == 1
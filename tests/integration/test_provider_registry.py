@@ -0,0 +1,48 @@
+import app.gateway.chatbot.engine.generate_response as engine_module
+import app.gateway.chatbot.providers.IA.deepseek as deepseek_module
+from app.gateway.chatbot.providers.chatbot_provider_factory import ProviderRegistry
+from app.gateway.chatbot.providers.IA.deepseek import DeepSeekProvider
+from app.gateway.chatbot.providers.IA.gemini import GeminiProvider
+from app.gateway.chatbot.providers.IA.openai import OpenaiProvider
+
+
+def test_registry_builds_each_provider_once_and_selects_per_assistant(monkeypatch, stub_ai_server, stub_provider, ai_context):
+    """Provedores são criados uma vez; o modelo do assistente escolhe provedor e modelo a cada turno, sem recriar nada."""
+    monkeypatch.setattr(deepseek_module.config, "deepseek_model", "deepseek/deepseek-chat")
+
+    built = []
+    for cls in (DeepSeekProvider, OpenaiProvider):
+        init = cls.__init__
+        monkeypatch.setattr(cls, "__init__", lambda self, init=init, cls=cls: (built.append(cls.__name__), init(self))[1])
+
+    registry = ProviderRegistry(default="mock")
+    monkeypatch.setattr(engine_module, "provider_registry", registry)
+
+    assert registry.default == "deepseek"
+    assert registry.select("receptionist", "GPT-3.5") == ("openai", "gpt-3.5-turbo")
+    assert registry.select("receptionist", "gemini-1.5-pro") == ("gemini", "gemini-1.5-pro")
+    assert registry.select("receptionist", "deepseek/deepseek-r1") == ("deepseek", "deepseek/deepseek-r1")
+    assert registry.select("gemini", "modelo-desconhecido") == ("gemini", None)
+    assert registry.select("receptionist", None) == ("deepseek", None)
+
+    assistants = [
+        {"type": "receptionist", "model": "GPT-3.5"},
+        {"type": "receptionist", "model": None},
+        {"type": "receptionist", "model": "deepseek/deepseek-r1"},
+        {"type": "receptionist", "model": "GPT-3.5"},
+    ]
+
+    async def run():
+        return [await engine_module.generate_response(ai_context("Quais serviços vocês têm?", **assistant)) for assistant in assistants]
+
+    responses = stub_provider.run(run())
+
+    assert all(r["useful_context"]["user_response"] == "Olá! Como posso ajudar?" for r in responses)
+    assert [payload["model"] for payload in stub_ai_server.payloads] == [
+        "gpt-3.5-turbo", "deepseek/deepseek-chat", "deepseek/deepseek-r1", "gpt-3.5-turbo",
+    ]
+    # Quatro turnos, dois provedores criados uma única vez cada
+    assert built == ["OpenaiProvider", "DeepSeekProvider"]
+    assert registry.get("openai") is registry.get("openai")
+    assert isinstance(registry.get("gemini"), GeminiProvider)
+    assert registry.stats()["instances"] == ["deepseek", "gemini", "openai"]
@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+from fastapi.responses import FileResponse
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.routes.analytics.analytics import AnalyticsRouter
+from app.auth.auth import AuthRouter
+import app.cache.cache_manager as cache_manager_module
+from app.cache.cache_manager import CacheManager
+from app.cache.invalidation import SERVICE_DATA, cache_invalidator
+from app.cache.versions import DataVersions
+from app.models.chat.chat import Chat
+from app.models.chat.interaction import Interaction
+from app.models.company.address import Address
+from app.models.company.company import Company
+from app.models.service.category_service import CategoryService
+from app.models.service.service import Service
+from app.models.user.user import User
+
+
+def create_company(session: Session, code: str) -> Company:
+    company = Company(name=f"Empresa {code}", code=code, cnpj=code, phone=code)
+    session.add(company)
+    session.commit()
+    return company
+
+
+@pytest.fixture
+def engine(sqlite_db):
+    return sqlite_db.engine
+
+
+def test_report_query_count_is_constant(engine, count_queries):
+    """O custo do relatório em consultas não cresce com o número de interações."""
+    counts = []
+    for size in (2, 20):
+        with Session(engine) as session:
+            company = create_company(session, f"report-{size}")
+            for i in range(size):
+                chat = Chat(company_id=company.id, chat_code=f"chat-{size}-{i}", human_attendance=i % 2 == 0)
+                session.add(chat)
+                session.flush()
+                session.add(Interaction(company_id=company.id, chat_id=chat.id))
+            session.commit()
+            company_id = company.id
+            session.expunge_all()
+
+            with count_queries(engine) as statements:
+                response = asyncio.run(AnalyticsRouter().generate_report(company_id, start=None, end=None, session=session))
+            assert isinstance(response, FileResponse)
+            counts.append(len(statements))
+
+    assert counts[0] == counts[1]
+
+
+def test_me_query_count_is_constant(engine, count_queries):
+    """/me carrega os endereços da empresa em uma única consulta."""
+    router = AuthRouter()
+    counts = []
+    for size in (1, 10):
+        with Session(engine) as session:
+            company = create_company(session, f"me-{size}")
+            user = User(username=f"user-{size}", email=f"user-{size}@teste.com", password_hash="x", company_id=company.id)
+            session.add(user)
+            for i in range(size):
+                session.add(Address(
+                    street="Rua", number=str(i), complement="", neighborhood="Centro",
+                    zip_code="00000-000", company_id=company.id,
+                ))
+            session.commit()
+            token = router.generate_jwt(user.id)
+            session.expunge_all()
+
+            with count_queries(engine) as statements:
+                data = router.me(authorization=f"Bearer {token}", session=session)
+            assert len(data["company"]["addresses"]) == size
+            counts.append(len(statements))
+
+    assert counts[0] == counts[1]
+
+
+def test_service_cache_fill_query_count_is_constant(sqlite_db, monkeypatch, count_queries):
+    """O preenchimento do cache de serviços não pode fazer uma consulta por categoria."""
+    # Registro de versões próprio: cada empresa nova custa a mesma leitura de versão
+    monkeypatch.setattr(cache_manager_module, "data_versions", DataVersions())
+
+    async def run() -> list:
+        counts = []
+        async with sqlite_db.async_engine() as engine:
+            for size in (5, 50):
+                async with AsyncSession(engine, expire_on_commit=False) as session:
+                    company = Company(name=f"Empresa {size}", code=f"services-{size}", cnpj=str(size), phone=str(size))
+                    session.add(company)
+                    await session.commit()
+                    for i in range(size):
+                        category = CategoryService(name=f"Categoria {i}", company_id=company.id)
+                        session.add(category)
+                        await session.flush()
+                        session.add(Service(
+                            name=f"Serviço {i}", description="-", price=10.0,
+                            company_id=company.id, category_id=category.id,
+                        ))
+                    await session.commit()
+                    company_id = company.id
+                    session.expunge_all()
+                    # Acerto de cache não consulta o banco: mede o preenchimento
+                    cache_invalidator.invalidate(company_id, SERVICE_DATA)
+
+                    with count_queries(engine) as statements:
+                        data = await CacheManager().get_service_data(session, company_id)
+                    assert len(data) == size
+                    counts.append(len(statements))
+        return counts
+
+    counts = asyncio.run(run())
+    assert counts[0] == counts[1]
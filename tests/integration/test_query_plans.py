@@ -0,0 +1,92 @@
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, text
+from sqlmodel import select
+
+from app.models.chat.chat import Chat
+from app.models.chat.interaction import Interaction
+from app.models.payment.payment import Payment
+from app.models.schedule.schedule import Schedule
+from app.models.schedule.schedule_slot import ScheduleSlot
+from app.models.service.category_service import CategoryService
+
+DAY = datetime(2026, 1, 1)
+
+# Consultas quentes por empresa; todas devem ser atendidas por índice
+HOT_QUERIES = {
+    "interactions_by_company": select(Interaction).where(Interaction.company_id == 1),
+    "interactions_by_date": select(Interaction).where(
+        Interaction.created_at >= DAY, Interaction.created_at < DAY + timedelta(days=1)
+    ),
+    "chat_by_code": select(Chat).where(Chat.company_id == 1).where(Chat.chat_code == "chat_1_abc"),
+    "chat_by_whatsapp": select(Chat).where(Chat.company_id == 1).where(Chat.whatsapp_id == "5511999999999"),
+    "schedules_by_company": select(Schedule)
+        .where(Schedule.company_id == 1)
+        .where(Schedule.deleted_at.is_(None))
+        .order_by(Schedule.start),
+    "available_slots": select(ScheduleSlot)
+        .where(ScheduleSlot.company_id == 1)
+        .where(ScheduleSlot.is_active == True)  # noqa: E712
+        .where(ScheduleSlot.schedule_id.is_(None))
+        .where(ScheduleSlot.deleted_at.is_(None))
+        .order_by(ScheduleSlot.start),
+    "categories_by_company": select(CategoryService)
+        .where(CategoryService.company_id == 1)
+        .where(CategoryService.deleted_at.is_(None)),
+    "payment_by_transaction_code": select(Payment).where(Payment.transaction_code == "TX-1"),
+}
+
+
+@pytest.fixture(scope="module", params=["sqlite", "postgresql"])
+def engine(request, tmp_path_factory):
+    if request.param == "sqlite":
+        db_url = f"sqlite:///{tmp_path_factory.mktemp('plans') / 'plans.db'}"
+    else:
+        db_url = os.getenv("TEST_POSTGRES_URL")
+        if not db_url:
+            pytest.skip("TEST_POSTGRES_URL não definida")
+
+    config = Config("alembic.ini")
+    config.set_main_option("sqlalchemy.url", db_url)
+    command.upgrade(config, "head")
+
+    engine = create_engine(db_url)
+    yield engine
+    engine.dispose()
+
+
+def explain(connection, statement) -> str:
+    compiled = statement.compile(dialect=connection.dialect)
+    if connection.dialect.name == "sqlite":
+        params = tuple(compiled.params[name] for name in compiled.positiontup)
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).all()
+        return "\n".join(row[-1] for row in rows)
+
+    # Tabelas de teste estão vazias; sem isso o planner prefere seq scan por custo
+    connection.execute(text("SET LOCAL enable_seqscan = off"))
+    rows = connection.exec_driver_sql(f"EXPLAIN {compiled}", compiled.params).all()
+    return "\n".join(row[0] for row in rows)
+
+
+def is_sequential_scan(plan: str) -> bool:
+    for line in plan.splitlines():
+        line = line.strip()
+        if "Seq Scan" in line:
+            return True
+        # No SQLite, "SCAN tabela" sem índice é varredura completa
+        if line.startswith("SCAN ") and "INDEX" not in line:
+            return True
+    return False
+
+
+@pytest.mark.parametrize("name", HOT_QUERIES)
+def test_hot_query_uses_index(engine, name):
+    """Consultas quentes não podem cair em varredura sequencial."""
+    with engine.begin() as connection:
+        plan = explain(connection, HOT_QUERIES[name])
+
+    assert not is_sequential_scan(plan), f"{name} fez varredura sequencial:\n{plan}"
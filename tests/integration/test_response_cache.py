@@ -0,0 +1,152 @@
+import asyncio
+
+import app.cache.response_cache as response_cache_module
+from app.cache.cache import Cache
+from app.cache.response_cache import ResponseCache, normalize_message
+from app.cache.tiered_cache import TieredCache
+from app.cache.versions import DataVersions
+from app.enums.chat import ChatIntent
+from app.gateway.chatbot.engine.generate_response import build_turn_response
+from app.gateway.circuit_breaker import CircuitBreaker
+
+
+def make_context(message: str, intent=ChatIntent.COMPANY_INFO) -> dict:
+    return {
+        "user_message": message,
+        "main_intent": intent,
+        "intents": [intent],
+        "sentiment": "NEUTRAL",
+        "history": [],
+        "data": {"assistant": {"name": "Ana", "type": "BOT"}},
+    }
+
+
+def test_repeated_questions_reuse_the_response_until_the_data_version_changes(monkeypatch):
+    """A mesma pergunta normalizada é respondida do cache; uma escrita no catálogo (nova versão) volta a chamar a IA."""
+    versions = DataVersions(ttl=60)
+    versions.observe(1, 3)
+    monkeypatch.setattr(response_cache_module, "data_versions", versions)
+    cache = ResponseCache(TieredCache(Cache(max_entries=10, max_bytes=100_000, sweep_interval=0)), ttl=60, enabled=True)
+    calls = []
+
+    async def generate(context):
+        calls.append(context["user_message"])
+        tokens = 0 if context["user_message"] == "erro" else 120
+        return {
+            "useful_context": {
+                "user_response": "Abrimos às 9h.",
+                "system_response": {"function": "no_action"},
+                "history": context["history"] + ["turno"],
+                "token_usage": {"total_tokens": tokens},
+            },
+            "status": 200,
+        }
+
+    async def run():
+        first = await cache.get_or_generate(None, 1, make_context("Qual o horário?"), generate)
+        repeated_context = make_context("  qual o HORARIO ")
+        repeated = await cache.get_or_generate(None, 1, repeated_context, generate)
+        # Pedidos que dependem do cliente não passam pelo cache
+        await cache.get_or_generate(None, 1, make_context("Qual o horário?", ChatIntent.SCHEDULE_INFO), generate)
+        # Respostas sem tokens (fallback/erro) não são guardadas
+        await cache.get_or_generate(None, 1, make_context("erro"), generate)
+        versions.observe(1, 4)
+        await cache.get_or_generate(None, 1, make_context("Qual o horário?"), generate)
+        return first, repeated, repeated_context
+
+    first, repeated, repeated_context = asyncio.run(run())
+
+    assert normalize_message("  Qual o HORÁRIO?! ") == "qual o horario"
+    assert calls == ["Qual o horário?", "Qual o horário?", "erro", "Qual o horário?"]
+    assert "cached" not in first
+    assert repeated["cached"] is True
+    assert repeated["useful_context"]["user_response"] == "Abrimos às 9h."
+    assert repeated["useful_context"]["user_message"] == "  qual o HORARIO "
+    assert repeated["useful_context"]["token_usage"]["total_tokens"] == 0
+    assert repeated["useful_context"]["history"] is repeated_context["history"]
+    assert repeated_context["history"][-1]["ia_response"] == "Abrimos às 9h."
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["stored"], stats["skipped"]) == (1, 3, 2, 1)
+    assert stats["tokens_saved"] == 120
+    assert stats["hit_rate"] == 0.25
+
+
+def test_follow_up_questions_are_answered_for_each_conversation(monkeypatch):
+    """A chave não inclui o histórico: com turnos anteriores a pergunta vai à IA; só a saudação não conta."""
+    versions = DataVersions(ttl=60)
+    versions.observe(1, 1)
+    monkeypatch.setattr(response_cache_module, "data_versions", versions)
+    cache = ResponseCache(TieredCache(Cache(max_entries=10, max_bytes=100_000, sweep_interval=0)), ttl=60, enabled=True)
+
+    async def generate(context):
+        # A resposta depende do que foi oferecido antes na conversa
+        offered = [turn["ia_response"] for turn in context["history"] if turn["intent"] != ChatIntent.WELCOME.value]
+        return {
+            "useful_context": {
+                "user_response": f"O mais barato é {offered[-1].split(' e ')[0]}." if offered else "Abrimos às 9h.",
+                "system_response": {"function": "no_action"},
+                "token_usage": {"total_tokens": 80},
+            },
+            "status": 200,
+        }
+
+    def with_history(message, intent, *turns):
+        context = make_context(message, intent)
+        context["history"] = [{"user_message": "...", "ia_response": answer, "intent": turn_intent} for turn_intent, answer in turns]
+        return context
+
+    async def run():
+        follow_ups = [
+            await cache.get_or_generate(None, 1, with_history(
+                "Qual desses é mais barato?", ChatIntent.DOUBT, (ChatIntent.SERVICE_INFO.value, offered),
+            ), generate)
+            for offered in ("corte e escova", "manicure e pedicure")
+        ]
+        greeted = await cache.get_or_generate(None, 1, with_history(
+            "Qual o horário?", ChatIntent.COMPANY_INFO, (ChatIntent.WELCOME.value, "Olá!"),
+        ), generate)
+        opening = await cache.get_or_generate(None, 1, make_context("Qual o horário?"), generate)
+        return follow_ups, greeted, opening
+
+    follow_ups, greeted, opening = asyncio.run(run())
+
+    assert [r["useful_context"]["user_response"] for r in follow_ups] == ["O mais barato é corte.", "O mais barato é manicure."]
+    assert not any(r.get("cached") for r in follow_ups)
+    assert "cached" not in greeted and opening["cached"] is True
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["stored"]) == (1, 1, 1)
+
+
+def test_fallback_answers_are_not_cached_even_when_tokens_were_spent(monkeypatch, stub_ai_server, stub_provider, ai_context):
+    """Resposta da IA sem user_response vira fallback com status de erro (e tokens gastos) e não entra no cache."""
+    versions = DataVersions(ttl=60)
+    versions.observe(1, 1)
+    monkeypatch.setattr(response_cache_module, "data_versions", versions)
+    provider = stub_provider.deepseek(CircuitBreaker("deepseek", retries=0))
+    stub_ai_server.content = {"system_response": {"function": "no_action"}}
+    cache = ResponseCache(TieredCache(Cache(max_entries=10, max_bytes=100_000, sweep_interval=0)), ttl=60, enabled=True)
+
+    async def generate(context):
+        return build_turn_response(context, await provider.generate_response(context))
+
+    async def run():
+        responses = []
+        for _ in range(2):
+            context = {**ai_context("Qual o horário?"), "main_intent": ChatIntent.COMPANY_INFO, "intents": [ChatIntent.COMPANY_INFO]}
+            responses.append(await cache.get_or_generate(None, 1, context, generate))
+        return responses
+
+    first, second = stub_provider.run(run())
+
+    assert first["status"] == 500
+    assert first["useful_context"]["user_response"]
+    assert first["useful_context"]["metadata"]["reason"] == "internal_error"
+    assert first["useful_context"]["token_usage"]["total_tokens"] == 50
+    assert "cached" not in second
+    assert len(stub_ai_server.payloads) == 2
+    assert (cache.stats()["stored"], cache.stats()["skipped"]) == (0, 2)
+    assert ResponseCache.entry_for({
+        "useful_context": {"user_response": "", "system_response": {}, "token_usage": {"total_tokens": 50}},
+        "status": 200,
+    }) is None
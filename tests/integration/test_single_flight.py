@@ -0,0 +1,102 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import app.cache.cache_manager as cache_manager_module
+from app.cache.cache import Cache
+from app.cache.cache_manager import CacheManager
+from app.cache.single_flight import SingleFlight
+from app.cache.tiered_cache import TieredCache
+
+
+class DummySession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def make_manager(monkeypatch) -> CacheManager:
+    monkeypatch.setattr(cache_manager_module, "single_flight", SingleFlight())
+    manager = CacheManager()
+    manager.cache = TieredCache(Cache(max_entries=20, max_bytes=100_000, sweep_interval=0))
+    manager.session_factory = DummySession
+    return manager
+
+
+def test_concurrent_misses_run_the_loader_once(monkeypatch):
+    """Requisições simultâneas para a mesma chave aguardam uma única carga."""
+    manager = make_manager(monkeypatch)
+    calls = []
+
+    async def loader(session, company_id):
+        calls.append(company_id)
+        await asyncio.sleep(0.05)
+        return {"name": "Empresa"}
+
+    async def run():
+        return await asyncio.gather(*[
+            manager.load_or_build(DummySession(), "company_info_1", 1, loader, versioned=False) for _ in range(20)
+        ])
+
+    results = asyncio.run(run())
+    assert calls == [1]
+    assert all(result is results[0] for result in results)
+    assert cache_manager_module.single_flight.stats()["coalesced"] == 19
+    assert cache_manager_module.single_flight.in_flight() == 0
+
+
+def test_loader_error_reaches_every_waiter_and_is_not_cached(monkeypatch):
+    manager = make_manager(monkeypatch)
+    calls = []
+
+    async def failing(session, company_id):
+        calls.append(company_id)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("banco indisponível")
+
+    async def run():
+        return await asyncio.gather(*[
+            manager.load_or_build(DummySession(), "company_info_1", 1, failing, versioned=False) for _ in range(5)
+        ], return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert calls == [1]
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert asyncio.run(manager.load_cached_data("company_info_1")) is None
+
+
+def test_expired_entry_is_served_stale_and_revalidated_in_background(monkeypatch):
+    """Entrada vencida é devolvida sem esperar o banco; uma única revalidação atualiza o cache."""
+    manager = make_manager(monkeypatch)
+    monkeypatch.setattr(cache_manager_module.configuration, "cache_ttl_jitter", 0.1)
+    clock = [time.time()]
+    monkeypatch.setattr(cache_manager_module, "time", SimpleNamespace(time=lambda: clock[0]))
+    calls = []
+
+    async def loader(session, company_id):
+        calls.append(company_id)
+        await asyncio.sleep(0.01)
+        return {"name": f"Empresa {len(calls)}"}
+
+    async def run():
+        first = await manager.load_or_build(DummySession(), "company_info_1", 1, loader, versioned=False)
+        entry = await manager.load_cached_entry("company_info_1")
+        # A validade recebe a variação de ±10% sobre CACHE_TTL_SECONDS
+        ttl = cache_manager_module.configuration.cache_ttl
+        assert 0.9 * ttl <= entry["fresh_until"] - clock[0] <= 1.1 * ttl
+
+        clock[0] = entry["fresh_until"] + 1
+        stale = await asyncio.gather(*[
+            manager.load_or_build(DummySession(), "company_info_1", 1, loader, versioned=False) for _ in range(5)
+        ])
+        assert all(result is first for result in stale)
+        assert cache_manager_module.single_flight.stats()["background"] == 1
+
+        await asyncio.sleep(0.05)
+        return await manager.load_cached_data("company_info_1")
+
+    refreshed = asyncio.run(run())
+    assert calls == [1, 1]
+    assert refreshed == {"name": "Empresa 2"}
@@ -0,0 +1,49 @@
+import asyncio
+from datetime import datetime, timezone
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.chat.assistant import Assistant
+from app.models.company.company import Company
+from app.utils.token_utils import consume_tokens, token_budget
+
+
+def test_token_usage_is_atomic_and_resets_monthly(sqlite_db):
+    """Incrementos concorrentes não se perdem, o mês novo zera o uso e o pré-check bloqueia acima do limite."""
+    now = datetime(2026, 5, 10, 12, tzinfo=timezone.utc)
+
+    async def run():
+        async with sqlite_db.async_engine() as engine:
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                company = Company(name="Empresa", code="tokens", cnpj="1", phone="1")
+                session.add(company)
+                await session.commit()
+                company_id = company.id
+                session.add(Assistant(
+                    company_id=company_id, assistant_name="A", assistant_token_limit=200,
+                    assistant_token_usage=900, assistant_token_reset_date=datetime(2026, 4, 1),
+                ))
+                await session.commit()
+
+            async def turn(tokens: int):
+                async with AsyncSession(engine, expire_on_commit=False) as session:
+                    result = await consume_tokens(session, company_id, tokens, now)
+                    await session.commit()
+                    return result
+
+            # Período anterior: o primeiro turno do mês recomeça a contagem
+            assert await turn(10) == (10, 200)
+            await asyncio.gather(*(turn(5) for _ in range(20)))
+
+            async with AsyncSession(engine) as session:
+                assistant = await session.get(Assistant, 1)
+                usage, reset_date = assistant.assistant_token_usage, assistant.assistant_token_reset_date
+            assert usage == 110
+            assert reset_date == datetime(2026, 5, 1)
+            assert token_budget.has_budget(company_id, now)
+
+            await turn(100)
+            assert not token_budget.has_budget(company_id, now)
+            assert token_budget.has_budget(company_id, datetime(2026, 6, 1, tzinfo=timezone.utc))
+
+    asyncio.run(run())
@@ -0,0 +1,174 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from sqlmodel import select
+
+import app.utils.chat_utils as chat_utils
+from app.database.write_behind import ChatTurnWrite, WriteBehindQueue
+from app.enums.chat import ChatSentiment
+from app.models.analytics.company_daily_stats import CompanyDailyStats
+from app.models.chat.assistant import Assistant
+from app.models.chat.chat import Chat
+from app.models.chat.interaction import Interaction
+from app.models.chat.sentiment import Sentiment
+from app.models.company.company import Company
+from app.utils.analytics_utils import daily_stats_increments
+
+
+def test_write_behind_coalesces_turns_and_drains(sqlite_db):
+    """Turnos do mesmo chat viram um lote só; contadores somam entre lotes e falhas voltam para a fila."""
+    start = datetime(2026, 5, 10, 12, tzinfo=timezone.utc)
+
+    def write(chat_id, company_id, minute, sentiment):
+        usage = {"prompt_tokens": 4, "completion_tokens": 1, "total_tokens": 5}
+        return ChatTurnWrite(
+            company_id=company_id,
+            chat_id=chat_id,
+            at=start + timedelta(minutes=minute),
+            interaction_fields={"client_name": f"Cliente {minute}", "total_tokens": 5},
+            sentiment=sentiment,
+            total_tokens=5,
+            daily_increments=daily_stats_increments(False, False, usage, False),
+        )
+
+    async def run():
+        async with sqlite_db.async_engine() as engine:
+            sessions = sqlite_db.sessions(engine)
+            queue = WriteBehindQueue(flush_interval=60, max_batch=100, max_retries=3)
+            queue.session_factory = sessions
+            async with sessions() as session:
+                company = Company(name="Empresa", code="wb", cnpj="1", phone="1")
+                session.add(company)
+                await session.commit()
+                session.add(Assistant(
+                    company_id=company.id, assistant_name="A", assistant_token_usage=0,
+                    assistant_token_reset_date=datetime(2026, 5, 1),
+                ))
+                chat = Chat(company_id=company.id, chat_code="wb_1", last_interaction_at=start)
+                session.add(chat)
+                await session.commit()
+                company_id, chat_id = company.id, chat.id
+
+            # Três turnos antes do flush: uma linha por tabela, último valor vence
+            queue.submit(write(chat_id, company_id, 0, ChatSentiment.NEGATIVE))
+            queue.submit(write(chat_id, company_id, 1, ChatSentiment.NEGATIVE))
+            queue.submit(write(chat_id, company_id, 2, ChatSentiment.POSITIVE))
+            assert queue.snapshot()["pending_chats"] == 1
+            assert await queue.flush() == 3
+
+            # Falha no flush: o lote volta para a fila junto com o turno novo
+            queue.session_factory = lambda: (_ for _ in ()).throw(RuntimeError("banco fora"))
+            queue.submit(write(chat_id, company_id, 3, ChatSentiment.POSITIVE))
+            assert await queue.flush() == 0
+            queue.submit(write(chat_id, company_id, 4, ChatSentiment.POSITIVE))
+            assert queue.snapshot()["pending_turns"] == 2
+
+            queue.session_factory = sessions
+            await queue.stop()
+            assert queue.snapshot() == {
+                "pending_turns": 0, "pending_chats": 0, "flushed_batches": 2,
+                "flushed_turns": 5, "failures": 1, "dropped_turns": 0,
+            }
+
+            async with sessions() as session:
+                interaction = (await session.exec(select(Interaction))).one()
+                sentiment = (await session.exec(select(Sentiment))).one()
+                stats = (await session.exec(select(CompanyDailyStats))).one()
+                assistant = (await session.exec(select(Assistant))).one()
+                return interaction, sentiment, stats, assistant
+
+    interaction, sentiment, stats, assistant = asyncio.run(run())
+    assert interaction.client_name == "Cliente 4"
+    assert interaction.created_at == datetime(2026, 5, 10, 12)
+    assert (sentiment.sentiment_positive_count, sentiment.sentiment_negative_count) == (3, 2)
+    assert sentiment.final_sentiment == ChatSentiment.POSITIVE
+    assert assistant.assistant_token_usage == 25
+    assert (stats.interactions, stats.messages, stats.total_tokens) == (1, 5, 25)
+    # Negativa no primeiro lote, positiva depois do segundo: a conversa muda de coluna, não soma outra
+    assert (stats.sentiment_positive_count, stats.sentiment_negative_count) == (1, 0)
+
+
+def test_sentiment_change_moves_the_conversation_on_the_day_it_started(sqlite_db):
+    """Quando o sentimento final muda num dia seguinte, a conversa troca de coluna no dia em que começou."""
+    day_one = datetime(2026, 5, 10, 23, 50)
+    usage = {"prompt_tokens": 4, "completion_tokens": 1, "total_tokens": 5}
+
+    def write(chat_id, company_id, at, sentiment):
+        return ChatTurnWrite(
+            company_id=company_id, chat_id=chat_id, at=at, interaction_fields={"total_tokens": 5},
+            sentiment=sentiment, total_tokens=0, daily_increments=daily_stats_increments(False, False, usage, False),
+        )
+
+    async def run():
+        async with sqlite_db.async_engine() as engine:
+            sessions = sqlite_db.sessions(engine)
+            queue = WriteBehindQueue(flush_interval=60, max_batch=100, max_retries=3)
+            queue.session_factory = sessions
+            async with sessions() as session:
+                company = Company(name="Empresa", code="wb-days", cnpj="1", phone="1")
+                session.add(company)
+                await session.commit()
+                chat = Chat(company_id=company.id, chat_code="wb_days", last_interaction_at=day_one)
+                session.add(chat)
+                await session.commit()
+                company_id, chat_id = company.id, chat.id
+
+            queue.submit(write(chat_id, company_id, day_one, ChatSentiment.NEGATIVE))
+            await queue.flush()
+            for minutes in (20, 30):
+                queue.submit(write(chat_id, company_id, day_one + timedelta(minutes=minutes), ChatSentiment.POSITIVE))
+            await queue.flush()
+
+            async with sessions() as session:
+                return (await session.exec(select(CompanyDailyStats).order_by(CompanyDailyStats.day))).all()
+
+    first, second = asyncio.run(run())
+    assert (first.interactions, first.messages, first.sentiment_positive_count, first.sentiment_negative_count) == (1, 1, 1, 0)
+    assert first.last_interaction_at == day_one
+    assert (second.interactions, second.messages, second.sentiment_positive_count, second.sentiment_negative_count) == (0, 2, 0, 0)
+
+def test_chat_state_is_visible_to_the_next_turn_before_the_flush(sqlite_db, monkeypatch):
+    """Histórico e contagem do chat são gravados no turno; só Interaction, Sentiment e consolidados esperam o flush."""
+    queue = WriteBehindQueue(flush_interval=60, max_batch=100, max_retries=3)
+    monkeypatch.setattr(chat_utils, "write_behind", queue)
+
+    async def turn(sessions, company_id, message):
+        # Como em cada requisição do chat: sessão nova e chat recarregado do banco
+        async with sessions() as session:
+            chat = await chat_utils.get_or_create_chat(session, company_id, chat_code="wb_turns")
+            history = list(chat.context_json.get("history", [])) if chat.context_json else []
+            seen = (history, chat.interaction_count)
+            chat.context_json = {"history": history + [message]}
+            chat.interaction_count += 1
+            chat.updated_at = chat_utils.utc_now()
+            await chat_utils.update_interaction_and_assistant(session, chat, company_id, "neutral", {"token_usage": {}})
+            return seen
+
+    async def run():
+        async with sqlite_db.async_engine() as engine:
+            sessions = sqlite_db.sessions(engine)
+            queue.session_factory = sessions
+            async with sessions() as session:
+                company = Company(name="Empresa", code="wb-turns", cnpj="1", phone="1")
+                session.add(company)
+                await session.commit()
+                session.add(Chat(company_id=company.id, chat_code="wb_turns", last_interaction_at=datetime(2026, 5, 10)))
+                await session.commit()
+                company_id = company.id
+
+            seen = [await turn(sessions, company_id, message) for message in ("Oi", "Tem horário?")]
+            async with sessions() as session:
+                pending = (await session.exec(select(Interaction))).all()
+            assert queue.snapshot()["pending_turns"] == 2
+            await queue.stop()
+            async with sessions() as session:
+                chat = (await session.exec(select(Chat))).one()
+                interaction = (await session.exec(select(Interaction))).one()
+            return seen, pending, chat, interaction
+
+    seen, pending, chat, interaction = asyncio.run(run())
+    assert seen == [([], 0), (["Oi"], 1)]
+    assert pending == []
+    assert (chat.context_json, chat.interaction_count) == ({"history": ["Oi", "Tem horário?"]}, 2)
+    assert chat.last_interaction_at > datetime(2026, 5, 10)
+    assert interaction.chat_id == chat.id